@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark do agrupamento de sinais em operações
+
+Gera sinais sintéticos e compara:
+- varredura para trás (implementação anterior, referência);
+- dois ponteiros por ativo (collector.operations.group_operations);
+- vetorizado com NumPy (collector.operations.group_operations_frame).
+
+As três saídas são conferidas entre si antes de imprimir os tempos.
+
+Uso:
+python benchmark_grouping.py                       # 10^5 e 10^6 sinais
+python benchmark_grouping.py --sizes 100000 --gap 1
+python benchmark_grouping.py --skip-reference      # Sem a varredura para trás
+"""
+
+import sys
+import os
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Adicionar diretório do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from collector.parser import Signal
+from collector.operations import group_operations, group_operations_frame
+
+
+def backward_scan(signals):
+    """Agrupamento anterior: para cada LOSS, volta sinal a sinal até 600s."""
+    operations = []
+    signals_by_asset = {}
+
+    for signal in sorted(signals, key=lambda x: x.timestamp):
+        signals_by_asset.setdefault(signal.asset, []).append(signal)
+
+    for asset, asset_signals in signals_by_asset.items():
+        for i, current_signal in enumerate(asset_signals):
+            if current_signal.result == 'W':
+                attempts = current_signal.attempt if current_signal.attempt else 1
+                operations.append({'asset': asset, 'timestamp': current_signal.timestamp,
+                                   'result': 'W', 'attempts': attempts})
+            elif current_signal.result == 'L':
+                attempts = 1
+                j = i - 1
+                while j >= 0 and (current_signal.timestamp - asset_signals[j].timestamp).total_seconds() <= 600:
+                    attempts += 1
+                    j -= 1
+                operations.append({'asset': asset, 'timestamp': current_signal.timestamp,
+                                   'result': 'L', 'attempts': min(attempts, 3)})
+
+    return operations
+
+
+def generate_frame(size: int, assets: int, gap: float, seed: int) -> pd.DataFrame:
+    """Sinais sintéticos (timestamps em segundos, ~80% WIN)."""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64('2025-06-27T17:00:00')
+    offsets = np.cumsum(rng.exponential(gap, size)).astype(np.int64)
+    results = np.where(rng.random(size) < 0.8, 'W', 'L')
+
+    return pd.DataFrame({
+        'timestamp': start + offsets.astype('timedelta64[s]'),
+        'asset': rng.choice([f"ASSET{i:02d}" for i in range(assets)], size),
+        'result': results,
+        'attempt': np.where(results == 'W', rng.integers(1, 4, size), 0).astype(np.int8)
+    })
+
+
+def timed(fn, *args):
+    """Executa e devolve (resultado, segundos)."""
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Benchmark do agrupamento de sinais em operações")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000], help="Quantidades de sinais")
+    parser.add_argument("--assets", type=int, default=20, help="Número de ativos")
+    parser.add_argument("--gap", type=float, default=2.0, help="Intervalo médio entre sinais (segundos)")
+    parser.add_argument("--seed", type=int, default=42, help="Semente dos dados sintéticos")
+    parser.add_argument("--skip-reference", action="store_true", help="Não rodar a varredura para trás")
+    args = parser.parse_args()
+
+    print(f"{'sinais':>10} {'referência':>12} {'2 ponteiros':>12} {'numpy':>10}")
+
+    for size in args.sizes:
+        df = generate_frame(size, args.assets, args.gap, args.seed)
+        signals = [
+            Signal(timestamp=ts, asset=asset, result=result, attempt=int(attempt) or None)
+            for ts, asset, result, attempt in zip(df['timestamp'].dt.to_pydatetime(), df['asset'],
+                                                  df['result'], df['attempt'])
+        ]
+
+        two_pointer, two_pointer_s = timed(group_operations, signals)
+        frame, frame_s = timed(group_operations_frame, df)
+
+        expected = pd.DataFrame(two_pointer)
+        if not (expected['attempts'].to_numpy() == frame['attempts'].to_numpy()).all():
+            raise SystemExit("❌ Vetorizado diverge dos dois ponteiros")
+
+        reference_s = None
+        if not args.skip_reference:
+            reference, reference_s = timed(backward_scan, signals)
+            if reference != two_pointer:
+                raise SystemExit("❌ Dois ponteiros diverge da referência")
+
+        reference_str = f"{reference_s:.3f}s" if reference_s is not None else "-"
+        print(f"{size:>10} {reference_str:>12} {two_pointer_s:>11.3f}s {frame_s:>9.3f}s")
+
+
+if __name__ == "__main__":
+    main()
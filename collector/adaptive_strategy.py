@@ -5,14 +5,18 @@ a melhor estratégia (Martingale Premium Conservative vs Infinity Conservative)
 """
 
 import logging
+from collections import deque
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Deque, List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+import numpy as np
 import pandas as pd
 
 from .parser import Signal
 from .config import Config
+from .market_window import DEFAULT_HORIZON, MarketWindow, SignalCounts, SignalTally
+from .operations import group_operations
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +54,8 @@ class MarketConditions:
     win_rate: float
     recommended_strategy: StrategyType
     analysis_period: str
+    g2_plus_stop_rate: float = 0.0
+    confidence_level: float = 0.0
     
     def __str__(self) -> str:
         return (f"🔍 {self.analysis_period}: {self.total_operations} ops | "
@@ -61,6 +67,174 @@ class MarketConditions:
                 f"Estratégia: {self.recommended_strategy.value.upper()}")
 
 
+# Configurações das estratégias
+STRATEGY_METRICS = {
+    StrategyType.MARTINGALE_CONSERVATIVE: StrategyMetrics(
+        win_rate=78.7,
+        roi_monthly=56.0,
+        risk_per_session=36.0,
+        max_attempts=2,
+        profit_per_win=4.0
+    ),
+    StrategyType.INFINITY_CONSERVATIVE: StrategyMetrics(
+        win_rate=92.3,
+        roi_monthly=45.1,
+        risk_per_session=49.0,
+        max_attempts=7,
+        profit_per_win=6.0
+    )
+}
+
+# Critérios de decisão padrão
+DECISION_THRESHOLDS = {
+    'pause_threshold': 30.0,  # Se G2+STOP > 30%, pausar
+    'martingale_threshold': 65.0,  # Se G1 recovery > 65%, usar Martingale
+    'infinity_threshold': 60.0,  # Se 1ª tentativa > 60%, usar Infinity
+    'min_operations': 10,  # Mínimo de operações para análise confiável
+    'confidence_threshold': 70.0  # Confiança mínima para mudança
+}
+
+# Códigos de estratégia usados nas versões vetorizadas (recommend)
+STRATEGY_CODES = {
+    StrategyType.PAUSE: 0,
+    StrategyType.MARTINGALE_CONSERVATIVE: 1,
+    StrategyType.INFINITY_CONSERVATIVE: 2
+}
+STRATEGY_ORDER = list(STRATEGY_CODES)
+
+
+def compute_rates(total, first_attempt, g1, g2, stops) -> Dict[str, np.ndarray]:
+    """
+    Taxas (%) de `AdaptiveStrategy._conditions_from_counts` para arrays de contadores.
+    
+    Returns:
+        first_rate, g1_rate (recuperação relativa), g2_rate, stop_rate,
+        g2_stop_rate e win_rate (1ª tentativa + G1)
+    """
+    total = np.asarray(total, dtype=np.float64)
+    first_attempt = np.asarray(first_attempt, dtype=np.float64)
+    not_first = total - first_attempt
+    safe_total = np.where(total > 0, total, 1.0)
+    
+    first_rate = np.where(total > 0, first_attempt / safe_total * 100, 0.0)
+    g1_rate = np.where(not_first > 0, np.asarray(g1) / np.maximum(1.0, not_first) * 100, 0.0)
+    g2_rate = np.where(total > 0, np.asarray(g2) / safe_total * 100, 0.0)
+    stop_rate = np.where(total > 0, np.asarray(stops) / safe_total * 100, 0.0)
+    win_rate = np.where(total > 0, (first_attempt + np.asarray(g1)) / safe_total * 100, 0.0)
+    
+    return {
+        'first_rate': first_rate,
+        'g1_rate': g1_rate,
+        'g2_rate': g2_rate,
+        'stop_rate': stop_rate,
+        'g2_stop_rate': g2_rate + stop_rate,
+        'win_rate': win_rate
+    }
+
+
+def recommend_arrays(total, first_rate, g1_rate, g2_stop_rate,
+                     thresholds: Optional[Dict[str, float]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Árvore de decisão de `AdaptiveStrategy._determine_strategy` (com os scores
+    de `_calculate_strategy_score` no caso intermediário) em arrays de qualquer forma.
+    
+    Returns:
+        (códigos de STRATEGY_CODES, confiança)
+    """
+    thresholds = DECISION_THRESHOLDS if thresholds is None else thresholds
+    total, first_rate, g1_rate, g2_stop_rate = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (total, first_rate, g1_rate, g2_stop_rate))
+    )
+    
+    martingale_roi = STRATEGY_METRICS[StrategyType.MARTINGALE_CONSERVATIVE].roi_monthly
+    infinity_roi = STRATEGY_METRICS[StrategyType.INFINITY_CONSERVATIVE].roi_monthly
+    martingale_score = np.maximum(0.0, martingale_roi * ((first_rate + g1_rate * 0.7) / 100) - g2_stop_rate * 0.5)
+    infinity_score = np.maximum(0.0, infinity_roi * ((first_rate * 1.2) / 100) - g2_stop_rate * 0.3)
+    score_confidence = np.minimum(75.0, np.abs(martingale_score - infinity_score) * 10 + 50)
+    
+    pause = STRATEGY_CODES[StrategyType.PAUSE]
+    martingale = STRATEGY_CODES[StrategyType.MARTINGALE_CONSERVATIVE]
+    infinity = STRATEGY_CODES[StrategyType.INFINITY_CONSERVATIVE]
+    
+    conditions = [
+        total < thresholds['min_operations'],
+        g2_stop_rate > thresholds['pause_threshold'],
+        g1_rate > thresholds['martingale_threshold'],
+        first_rate > thresholds['infinity_threshold'],
+        martingale_score > infinity_score
+    ]
+    codes = np.select(conditions, [pause, pause, martingale, infinity, martingale], infinity)
+    confidence = np.select(conditions, [
+        np.full(total.shape, 30.0),
+        np.minimum(95.0, g2_stop_rate * 2),
+        np.minimum(90.0, g1_rate + 20),
+        np.minimum(85.0, first_rate + 15),
+        score_confidence
+    ], score_confidence)
+    return codes, confidence
+
+
+def rates_frame(counts: pd.DataFrame) -> pd.DataFrame:
+    """
+    Acrescenta as taxas a uma tabela de contadores (total, first_attempt, g1, g2, stops).
+    """
+    rates = compute_rates(counts['total'], counts['first_attempt'], counts['g1'], counts['g2'], counts['stops'])
+    return counts.assign(**rates)
+
+
+def recommend(rates: pd.DataFrame, thresholds: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """
+    Estratégia recomendada para cada linha de uma tabela de taxas, de uma vez.
+    
+    Args:
+        rates: Colunas total, first_rate, g1_rate e g2_stop_rate (ver `rates_frame`),
+            uma linha por janela (ex.: cada (data, hora) do histórico)
+        thresholds: Critérios de decisão (padrão: DECISION_THRESHOLDS)
+        
+    Returns:
+        Cópia da tabela com strategy (StrategyType), strategy_code e confidence
+    """
+    codes, confidence = recommend_arrays(rates['total'], rates['first_rate'], rates['g1_rate'],
+                                         rates['g2_stop_rate'], thresholds)
+    return rates.assign(
+        strategy=np.array(STRATEGY_ORDER, dtype=object)[codes],
+        strategy_code=codes,
+        confidence=confidence
+    )
+
+
+@dataclass
+class AssetConditions:
+    """Condições de um ativo na mesma janela da análise geral."""
+    asset: str
+    total_operations: int
+    first_attempt_success_rate: float
+    g1_recovery_rate: float
+    g2_rate: float
+    stop_rate: float
+    win_rate: float
+    g2_plus_stop_rate: float
+    recommended_strategy: StrategyType
+    confidence_level: float
+    streak: int  # + wins / - losses seguidos (mais recentes)
+    paused: bool = False
+    
+    def __str__(self) -> str:
+        streak = f"+{self.streak}W" if self.streak > 0 else f"{-self.streak}L" if self.streak < 0 else "-"
+        return (f"{self.asset}: {self.total_operations} ops | "
+                f"Win Rate: {self.win_rate:.1f}% | "
+                f"G2+STOP: {self.g2_plus_stop_rate:.1f}% | "
+                f"Sequência: {streak}"
+                f"{' | ⏸️ PAUSADO' if self.paused else ''}")
+
+
+# Losses seguidos (G2/STOP) que pausam um ativo
+ASSET_PAUSE_LOSS_STREAK = 3
+
+# Mudanças de estratégia mantidas em memória (o histórico completo fica em collector/analysis_log.py)
+ANALYSIS_HISTORY_SIZE = 100
+
+
 class AdaptiveStrategy:
     """Sistema adaptativo de seleção de estratégias."""
     
@@ -69,41 +243,96 @@ class AdaptiveStrategy:
         self.timezone = config.timezone
         
         # Configurações das estratégias
-        self.strategies = {
-            StrategyType.MARTINGALE_CONSERVATIVE: StrategyMetrics(
-                win_rate=78.7,
-                roi_monthly=56.0,
-                risk_per_session=36.0,
-                max_attempts=2,
-                profit_per_win=4.0
-            ),
-            StrategyType.INFINITY_CONSERVATIVE: StrategyMetrics(
-                win_rate=92.3,
-                roi_monthly=45.1,
-                risk_per_session=49.0,
-                max_attempts=7,
-                profit_per_win=6.0
-            )
-        }
+        self.strategies = dict(STRATEGY_METRICS)
         
-        # Critérios de decisão
-        self.decision_thresholds = {
-            'pause_threshold': 30.0,  # Se G2+STOP > 30%, pausar
-            'martingale_threshold': 65.0,  # Se G1 recovery > 65%, usar Martingale
-            'infinity_threshold': 60.0,  # Se 1ª tentativa > 60%, usar Infinity
-            'min_operations': 10,  # Mínimo de operações para análise confiável
-            'confidence_threshold': 70.0  # Confiança mínima para mudança
-        }
+        # Critérios de decisão (ver optimize_thresholds.py)
+        self.decision_thresholds = dict(DECISION_THRESHOLDS)
         
         # Estado atual
         self.current_strategy: Optional[StrategyType] = None
+        self.asset_conditions: Dict[str, AssetConditions] = {}
         self.last_analysis_time: Optional[datetime] = None
-        self.analysis_history: List[MarketConditions] = []
+        self.analysis_history: Deque[MarketConditions] = deque(maxlen=ANALYSIS_HISTORY_SIZE)
+        
+        # Janelas deslizantes (15/30/60/120 min e sessão) alimentadas sinal a sinal
+        self.market_window = MarketWindow()
+        
+    def observe(self, signal: Signal) -> None:
+        """
+        Adiciona um sinal recebido a todos os horizontes da janela deslizante.
+        
+        Args:
+            signal: Sinal recebido
+        """
+        self.market_window.add(signal)
+    
+    def current_conditions(self, now: Optional[datetime] = None, horizon: str = DEFAULT_HORIZON) -> MarketConditions:
+        """
+        Condições de mercado de um horizonte, sem reescanear os sinais.
         
+        Args:
+            now: Momento atual; sinais mais antigos que cada horizonte são expirados
+            horizon: Nome do horizonte ('15min', '30min', '60min', '120min', 'session')
+            
+        Returns:
+            Condições do mercado e estratégia recomendada
+        """
+        if now is not None:
+            self.market_window.expire(now)
+        
+        window = self.market_window
+        first_timestamp = window.first_timestamp(horizon)
+        if first_timestamp is None:
+            return self._empty_conditions()
+        
+        period = f"{first_timestamp.strftime('%H:%M')}-{window.last_timestamp.strftime('%H:%M')}"
+        return self._conditions_from_counts(window.counts(horizon), period)
+    
+    def conditions_by_horizon(self, now: Optional[datetime] = None) -> Dict[str, MarketConditions]:
+        """
+        Condições de todos os horizontes de uma vez.
+        
+        Args:
+            now: Momento atual; sinais mais antigos que cada horizonte são expirados
+            
+        Returns:
+            Condições por nome de horizonte
+        """
+        if now is not None:
+            self.market_window.expire(now)
+        return {horizon: self.current_conditions(horizon=horizon) for horizon in self.market_window.horizons}
+    
+    def current_asset_conditions(self, now: Optional[datetime] = None,
+                                 horizon: str = DEFAULT_HORIZON) -> Dict[str, AssetConditions]:
+        """
+        Condições de cada ativo no horizonte, dos contadores por ativo da janela
+        (sem reescanear os sinais). Também atualiza `asset_conditions`.
+        
+        Args:
+            now: Momento atual; sinais mais antigos que cada horizonte são expirados
+            horizon: Nome do horizonte
+            
+        Returns:
+            Condições por ativo
+        """
+        if now is not None:
+            self.market_window.expire(now)
+        
+        window = self.market_window
+        self.asset_conditions = self._asset_conditions_from_counts(window.asset_counts(horizon), window.streaks())
+        return self.asset_conditions
+    
+    def paused_assets(self) -> List[str]:
+        """Ativos pausados na última análise por ativo."""
+        return sorted(asset for asset, conditions in self.asset_conditions.items() if conditions.paused)
+    
     def analyze_market_conditions(self, signals: List[Signal]) -> MarketConditions:
         """
         Analisa condições do mercado baseado nos sinais coletados.
         
+        A mesma passada conta as operações de cada ativo e suas sequências,
+        disponíveis depois em `asset_conditions`.
+        
         Args:
             signals: Lista de sinais para análise
             
@@ -111,53 +340,108 @@ class AdaptiveStrategy:
             Condições do mercado e estratégia recomendada
         """
         if not signals:
-            return MarketConditions(
-                total_operations=0,
-                first_attempt_success_rate=0.0,
-                g1_recovery_rate=0.0,
-                g2_rate=0.0,
-                stop_rate=0.0,
-                win_rate=0.0,
-                recommended_strategy=StrategyType.PAUSE,
-                analysis_period="Sem dados"
-            )
+            self.asset_conditions = {}
+            return self._empty_conditions()
         
-        # Agrupar sinais por operação (mesmo asset + tempo próximo)
-        operations = self._group_signals_into_operations(signals)
+        # Cada sinal W/L é uma operação: contar por desfecho (geral e por ativo) em uma passada
+        tally = SignalTally.from_signals(signals)
+        self.asset_conditions = self._asset_conditions_from_counts(tally.by_asset, tally.streaks)
         
-        # Calcular métricas
-        total_ops = len(operations)
-        first_attempt_wins = sum(1 for op in operations if op['result'] == 'W' and op['attempts'] == 1)
-        g1_recoveries = sum(1 for op in operations if op['result'] == 'W' and op['attempts'] == 2)
-        g2_wins = sum(1 for op in operations if op['result'] == 'W' and op['attempts'] == 3)
-        stops = sum(1 for op in operations if op['result'] == 'L')
+        # Período de análise
+        period = f"{tally.first_timestamp.strftime('%H:%M')}-{tally.last_timestamp.strftime('%H:%M')}"
+        
+        return self._conditions_from_counts(tally.counts, period)
+    
+    def _asset_conditions_from_counts(self, by_asset: Dict[str, SignalCounts],
+                                      streaks: Dict[str, int]) -> Dict[str, AssetConditions]:
+        """
+        Taxas e recomendação de todos os ativos de uma vez (ver `recommend`).
+        
+        Um ativo é pausado quando acumula ASSET_PAUSE_LOSS_STREAK losses
+        seguidos ou quando, com operações suficientes, seu G2+STOP passa do
+        limite de pausa.
+        
+        Args:
+            by_asset: Contadores por ativo
+            streaks: Sequência atual por ativo
+            
+        Returns:
+            Condições por ativo
+        """
+        if not by_asset:
+            return {}
+        
+        assets = list(by_asset)
+        rows = recommend(rates_frame(pd.DataFrame([vars(by_asset[asset]) for asset in assets])),
+                         self.decision_thresholds)
+        
+        conditions = {}
+        for asset, row in zip(assets, rows.itertuples(index=False)):
+            streak = streaks.get(asset, 0)
+            unfavorable = (row.total >= self.decision_thresholds['min_operations'] and
+                           row.g2_stop_rate > self.decision_thresholds['pause_threshold'])
+            conditions[asset] = AssetConditions(
+                asset=asset,
+                total_operations=int(row.total),
+                first_attempt_success_rate=float(row.first_rate),
+                g1_recovery_rate=float(row.g1_rate),
+                g2_rate=float(row.g2_rate),
+                stop_rate=float(row.stop_rate),
+                win_rate=float(row.win_rate),
+                g2_plus_stop_rate=float(row.g2_stop_rate),
+                recommended_strategy=row.strategy,
+                confidence_level=float(row.confidence),
+                streak=streak,
+                paused=bool(unfavorable or streak <= -ASSET_PAUSE_LOSS_STREAK)
+            )
+        return conditions
+    
+    @staticmethod
+    def _empty_conditions() -> MarketConditions:
+        """Condições sem dados (estratégia PAUSE)."""
+        return MarketConditions(
+            total_operations=0,
+            first_attempt_success_rate=0.0,
+            g1_recovery_rate=0.0,
+            g2_rate=0.0,
+            stop_rate=0.0,
+            win_rate=0.0,
+            recommended_strategy=StrategyType.PAUSE,
+            analysis_period="Sem dados"
+        )
+    
+    def _conditions_from_counts(self, counts: SignalCounts, period: str) -> MarketConditions:
+        """
+        Calcula taxas e estratégia recomendada a partir dos contadores.
+        
+        Args:
+            counts: Contadores de operações por desfecho
+            period: Descrição do período analisado
+            
+        Returns:
+            Condições do mercado
+        """
+        total_ops = counts.total
+        first_attempt_wins = counts.first_attempt
         
         # Calcular taxas
         first_attempt_rate = (first_attempt_wins / total_ops * 100) if total_ops > 0 else 0
-        g1_recovery_rate = (g1_recoveries / max(1, total_ops - first_attempt_wins) * 100) if total_ops > first_attempt_wins else 0
-        g2_rate = (g2_wins / total_ops * 100) if total_ops > 0 else 0
-        stop_rate = (stops / total_ops * 100) if total_ops > 0 else 0
+        g1_recovery_rate = (counts.g1 / max(1, total_ops - first_attempt_wins) * 100) if total_ops > first_attempt_wins else 0
+        g2_rate = (counts.g2 / total_ops * 100) if total_ops > 0 else 0
+        stop_rate = (counts.stops / total_ops * 100) if total_ops > 0 else 0
         
         # Win rate (1ª tentativa + G1)
-        total_wins = first_attempt_wins + g1_recoveries
+        total_wins = first_attempt_wins + counts.g1
         win_rate = (total_wins / total_ops * 100) if total_ops > 0 else 0
         
         # Taxa de G2+STOP para tomada de decisão
         g2_plus_stop_rate = g2_rate + stop_rate
         
         # Determinar estratégia recomendada
-        recommended_strategy, _ = self._determine_strategy(
+        recommended_strategy, confidence = self._determine_strategy(
             total_ops, first_attempt_rate, g1_recovery_rate, g2_plus_stop_rate
         )
         
-        # Período de análise
-        if signals:
-            start_time = min(signal.timestamp for signal in signals)
-            end_time = max(signal.timestamp for signal in signals)
-            period = f"{start_time.strftime('%H:%M')}-{end_time.strftime('%H:%M')}"
-        else:
-            period = "N/A"
-        
         return MarketConditions(
             total_operations=total_ops,
             first_attempt_success_rate=first_attempt_rate,
@@ -166,12 +450,14 @@ class AdaptiveStrategy:
             stop_rate=stop_rate,
             win_rate=win_rate,
             recommended_strategy=recommended_strategy,
-            analysis_period=period
+            analysis_period=period,
+            g2_plus_stop_rate=g2_plus_stop_rate,
+            confidence_level=confidence
         )
     
     def _group_signals_into_operations(self, signals: List[Signal]) -> List[Dict[str, Any]]:
         """
-        Agrupa sinais em operações completas.
+        Agrupa sinais em operações completas (ver collector/operations.py).
         
         Args:
             signals: Lista de sinais
@@ -179,58 +465,7 @@ class AdaptiveStrategy:
         Returns:
             Lista de operações com resultado final
         """
-        operations = []
-        signals_by_asset = {}
-        
-        # Agrupar por ativo
-        for signal in sorted(signals, key=lambda x: x.timestamp):
-            if signal.asset not in signals_by_asset:
-                signals_by_asset[signal.asset] = []
-            signals_by_asset[signal.asset].append(signal)
-        
-        # Processar cada ativo
-        for asset, asset_signals in signals_by_asset.items():
-            i = 0
-            while i < len(asset_signals):
-                current_signal = asset_signals[i]
-                
-                # Se é um WIN, determinar em qual tentativa
-                if current_signal.result == 'W':
-                    attempts = current_signal.attempt if current_signal.attempt else 1
-                    operations.append({
-                        'asset': asset,
-                        'timestamp': current_signal.timestamp,
-                        'result': 'W',
-                        'attempts': attempts
-                    })
-                    i += 1
-                
-                # Se é um LOSS, contar quantas tentativas foram feitas
-                elif current_signal.result == 'L':
-                    # Procurar tentativas anteriores próximas
-                    attempts = 1
-                    j = i - 1
-                    
-                    # Verificar sinais anteriores no mesmo ativo
-                    while j >= 0 and (current_signal.timestamp - asset_signals[j].timestamp).total_seconds() <= 600:  # 10 minutos
-                        if asset_signals[j].asset == asset:
-                            attempts += 1
-                        j -= 1
-                    
-                    # Máximo de 3 tentativas
-                    attempts = min(attempts, 3)
-                    
-                    operations.append({
-                        'asset': asset,
-                        'timestamp': current_signal.timestamp,
-                        'result': 'L',
-                        'attempts': attempts
-                    })
-                    i += 1
-                else:
-                    i += 1
-        
-        return operations
+        return group_operations(signals)
     
     def _determine_strategy(self, total_ops: int, first_rate: float, g1_rate: float, g2_stop_rate: float) -> Tuple[StrategyType, float]:
         """
@@ -401,7 +636,7 @@ class AdaptiveStrategy:
         if not self.analysis_history:
             return "📊 Nenhuma análise realizada ainda"
         
-        recent = self.analysis_history[-5:]  # Últimas 5 análises
+        recent = list(self.analysis_history)[-5:]  # Últimas 5 análises
         
         summary = ["📊 Resumo das Análises Recentes:", ""]
         
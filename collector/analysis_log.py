@@ -0,0 +1,341 @@
+"""
+Histórico persistente das análises do modo live
+
+Cada análise vira um bloco de registros de largura fixa: um por horizonte
+(condições do mercado) e um por ativo. Os blocos são acrescentados ao arquivo
+do dia `data/analysis/analysis_YYYY-MM-DD.bin` (63 bytes por registro,
+little-endian, mesma ideia do log binário de sinais):
+
+    epoch       int64    horário da análise (µs desde 1970-01-01 UTC)
+    total       int32    operações na janela
+    asset       uint16   id do ativo (data/analysis/meta.json); MARKET = mercado
+    streak      int16    sequência atual do ativo (0 no mercado)
+    horizon     uint8    índice em HORIZON_NAMES
+    strategy    int8     código em STRATEGY_CODES
+    paused      int8     ativo pausado
+    first_rate .. confidence   float32 (taxas em %, ver MarketConditions)
+    period      S16      período analisado ("HH:MM-HH:MM")
+
+O arquivo do dia fica aberto durante a sessão (nada de reabrir a cada
+análise). As últimas análises ficam também num anel em memória de tamanho
+fixo, então "últimas N" não lê disco; consultas por intervalo mapeiam os
+arquivos dos dias envolvidos e cortam por busca binária no epoch.
+"""
+
+import logging
+from collections import deque
+from datetime import date as date_type, datetime, timedelta, tzinfo
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .adaptive_strategy import STRATEGY_CODES, STRATEGY_ORDER, AssetConditions, MarketConditions
+from .binlog import META_NAME, AssetRegistry, _map_records
+from .catalog import DATA_ROOT
+from .market_window import DEFAULT_HORIZON, HORIZONS
+from .signal_window import to_epoch_us
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_DTYPE = np.dtype([
+    ('epoch', '<i8'),
+    ('total', '<i4'),
+    ('asset', '<u2'),
+    ('streak', '<i2'),
+    ('horizon', 'u1'),
+    ('strategy', 'i1'),
+    ('paused', 'i1'),
+    ('first_rate', '<f4'),
+    ('g1_rate', '<f4'),
+    ('g2_rate', '<f4'),
+    ('stop_rate', '<f4'),
+    ('win_rate', '<f4'),
+    ('g2_stop_rate', '<f4'),
+    ('confidence', '<f4'),
+    ('period', 'S16'),
+])
+
+ANALYSIS_DIR = 'analysis'
+ANALYSIS_SUFFIX = '.bin'
+MARKET = np.iinfo(np.uint16).max  # Linha do mercado (não é de um ativo)
+
+HORIZON_NAMES = list(HORIZONS)
+HORIZON_CODES = {name: code for code, name in enumerate(HORIZON_NAMES)}
+
+# Colunas do registro -> campos de MarketConditions/AssetConditions
+RATE_FIELDS = {
+    'first_rate': 'first_attempt_success_rate',
+    'g1_rate': 'g1_recovery_rate',
+    'g2_rate': 'g2_rate',
+    'stop_rate': 'stop_rate',
+    'win_rate': 'win_rate',
+    'g2_stop_rate': 'g2_plus_stop_rate',
+    'confidence': 'confidence_level',
+}
+
+PathLike = Union[str, Path]
+Conditions = Union[MarketConditions, AssetConditions]
+
+
+def _fill_row(record: np.void, conditions: Conditions) -> None:
+    """Copia as taxas e a recomendação de um conjunto de condições."""
+    record['total'] = conditions.total_operations
+    record['strategy'] = STRATEGY_CODES[conditions.recommended_strategy]
+    for column, attribute in RATE_FIELDS.items():
+        record[column] = getattr(conditions, attribute)
+
+
+def _analysis_starts(records: np.ndarray) -> np.ndarray:
+    """Posição do primeiro registro de cada análise (blocos com o mesmo epoch)."""
+    epochs = records['epoch']
+    if len(epochs) == 0:
+        return np.empty(0, dtype=np.intp)
+    return np.concatenate(([0], np.flatnonzero(epochs[1:] != epochs[:-1]) + 1))
+
+
+class AnalysisLog:
+    """
+    Arquivos diários de análises + anel com as mais recentes.
+
+    Args:
+        root: Pasta de dados
+        timezone: Timezone local (nomeia os arquivos diários)
+        directory: Pasta dos arquivos (padrão: <root>/analysis)
+        max_recent: Análises mantidas em memória
+    """
+
+    def __init__(
+        self,
+        root: PathLike = DATA_ROOT,
+        timezone: Optional[tzinfo] = None,
+        directory: Optional[PathLike] = None,
+        max_recent: int = 256
+    ):
+        self.dir = Path(directory) if directory is not None else Path(root) / ANALYSIS_DIR
+        self.registry = AssetRegistry(self.dir / META_NAME)
+        if timezone is not None:
+            self.registry.timezone_name = timezone.zone
+        self.timezone = self.registry.timezone
+
+        self._recent: Deque[np.ndarray] = deque(maxlen=max(1, max_recent))
+        self._file = None
+        self._file_day: Optional[date_type] = None
+
+    def path_for(self, day: Union[date_type, datetime, str]) -> Path:
+        """Arquivo de um dia (data local)."""
+        if not isinstance(day, str):
+            day = day.strftime('%Y-%m-%d')
+        return self.dir / f"analysis_{day}{ANALYSIS_SUFFIX}"
+
+    def days(self) -> List[str]:
+        """Datas (YYYY-MM-DD) com arquivo de análises, em ordem."""
+        if not self.dir.exists():
+            return []
+        prefix = len('analysis_')
+        return sorted(p.stem[prefix:] for p in self.dir.glob(f"analysis_*{ANALYSIS_SUFFIX}"))
+
+    def _local_day(self, timestamp: datetime) -> date_type:
+        """Data local de um timestamp (sem fuso = horário local)."""
+        if timestamp.tzinfo is None:
+            return timestamp.date()
+        return timestamp.astimezone(self.timezone).date()
+
+    def _epoch(self, timestamp: datetime) -> int:
+        """Epoch (µs) de um timestamp (sem fuso = horário local)."""
+        if timestamp.tzinfo is None:
+            timestamp = self.timezone.localize(timestamp)
+        return to_epoch_us(timestamp)
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def encode(
+        self,
+        timestamp: datetime,
+        horizons: Dict[str, MarketConditions],
+        assets: Optional[Dict[str, AssetConditions]] = None,
+        asset_horizon: str = DEFAULT_HORIZON
+    ) -> np.ndarray:
+        """
+        Registros de uma análise.
+
+        Args:
+            timestamp: Horário da análise
+            horizons: Condições do mercado por horizonte
+            assets: Condições por ativo
+            asset_horizon: Horizonte das condições por ativo
+
+        Returns:
+            Array com um registro por horizonte e um por ativo
+        """
+        assets = assets or {}
+        unknown = [name for name in [*horizons, asset_horizon] if name not in HORIZON_CODES]
+        if unknown:
+            raise ValueError(f"Horizonte sem código no histórico de análises: {unknown[0]}")
+
+        records = np.zeros(len(horizons) + len(assets), dtype=ANALYSIS_DTYPE)
+        records['epoch'] = self._epoch(timestamp)
+        records['asset'] = MARKET
+
+        for record, (name, conditions) in zip(records, horizons.items()):
+            _fill_row(record, conditions)
+            record['horizon'] = HORIZON_CODES[name]
+            record['period'] = conditions.analysis_period.encode('utf-8')[:16]
+
+        asset_records = records[len(horizons):]
+        asset_records['asset'] = self.registry.ids_for(assets)
+        asset_records['horizon'] = HORIZON_CODES[asset_horizon]
+        for record, conditions in zip(asset_records, assets.values()):
+            _fill_row(record, conditions)
+            record['streak'] = conditions.streak
+            record['paused'] = conditions.paused
+
+        return records
+
+    def append(
+        self,
+        timestamp: datetime,
+        horizons: Dict[str, MarketConditions],
+        assets: Optional[Dict[str, AssetConditions]] = None,
+        asset_horizon: str = DEFAULT_HORIZON
+    ) -> np.ndarray:
+        """
+        Registra uma análise no anel em memória e no arquivo do dia.
+
+        Args:
+            timestamp: Horário da análise
+            horizons: Condições do mercado por horizonte
+            assets: Condições por ativo
+            asset_horizon: Horizonte das condições por ativo
+
+        Returns:
+            Registros gravados
+        """
+        records = self.encode(timestamp, horizons, assets, asset_horizon)
+        self._recent.append(records)
+        self._write(self._local_day(timestamp), records)
+        return records
+
+    def _write(self, day: date_type, records: np.ndarray) -> None:
+        """Acrescenta registros ao arquivo do dia (aberto uma vez por dia)."""
+        if self._file is None or self._file_day != day:
+            self.close()
+            self.dir.mkdir(parents=True, exist_ok=True)
+            path = self.path_for(day)
+            self._file = open(path, 'ab')
+            self._file_day = day
+
+            # Descarta registro incompleto deixado por gravação interrompida
+            torn = self._file.tell() % ANALYSIS_DTYPE.itemsize
+            if torn:
+                self._file.truncate(self._file.tell() - torn)
+                logger.warning(f"Registro incompleto descartado em {path}")
+
+        self._file.write(records.tobytes())
+        self._file.flush()
+
+    def close(self) -> None:
+        """Fecha o arquivo do dia aberto para escrita."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._file_day = None
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def read_day(self, day: Union[date_type, datetime, str]) -> np.ndarray:
+        """Registros de um dia (array mapeado, sem cópia; vazio se não existir)."""
+        path = self.path_for(day)
+        if not path.exists():
+            return np.empty(0, dtype=ANALYSIS_DTYPE)
+        return _map_records(path, ANALYSIS_DTYPE)
+
+    def last(self, count: int) -> np.ndarray:
+        """
+        Registros das últimas `count` análises, da mais antiga para a mais recente.
+
+        Vêm do anel em memória; só as análises anteriores a ele (ex.: depois de
+        reiniciar o processo) são lidas dos arquivos, do dia mais recente para trás.
+        """
+        if count <= 0:
+            return np.empty(0, dtype=ANALYSIS_DTYPE)
+
+        chunks = list(self._recent)[-count:]
+        missing = count - len(chunks)
+        if missing > 0:
+            before = int(chunks[0]['epoch'][0]) if chunks else None
+            chunks = self._last_on_disk(missing, before) + chunks
+
+        if not chunks:
+            return np.empty(0, dtype=ANALYSIS_DTYPE)
+        return np.concatenate(chunks)
+
+    def _last_on_disk(self, count: int, before: Optional[int]) -> List[np.ndarray]:
+        """Últimas `count` análises gravadas antes do epoch `before`."""
+        chunks: List[np.ndarray] = []
+        for day in reversed(self.days()):
+            records = self.read_day(day)
+            if before is not None:
+                records = records[:np.searchsorted(records['epoch'], before, side='left')]
+
+            starts = _analysis_starts(records)
+            if len(starts) >= count:
+                chunks.insert(0, records[starts[-count]:])
+                break
+            if len(starts):
+                chunks.insert(0, records)
+                count -= len(starts)
+        return chunks
+
+    def between(self, start: datetime, end: datetime) -> np.ndarray:
+        """Registros das análises com start <= horário < end."""
+        start_us, end_us = self._epoch(start), self._epoch(end)
+        day, last_day = self._local_day(start), self._local_day(end)
+
+        chunks = []
+        while day <= last_day:
+            records = self.read_day(day)
+            if len(records):
+                epochs = records['epoch']
+                chunks.append(records[np.searchsorted(epochs, start_us, side='left'):
+                                      np.searchsorted(epochs, end_us, side='left')])
+            day += timedelta(days=1)
+
+        if not chunks:
+            return np.empty(0, dtype=ANALYSIS_DTYPE)
+        return np.concatenate(chunks)
+
+    def to_frame(self, records: np.ndarray) -> pd.DataFrame:
+        """
+        Registros como tabela com os nomes de campo de MarketConditions.
+
+        Colunas: timestamp (horário local sem fuso), horizon, asset (None nas
+        linhas do mercado), total_operations, taxas, recommended_strategy,
+        confidence_level, analysis_period, streak e paused.
+        """
+        timestamps = pd.to_datetime(records['epoch'], unit='us', utc=True).tz_convert(self.timezone)
+
+        assets = np.full(len(records), None, dtype=object)
+        is_asset = records['asset'] != MARKET
+        if is_asset.any():
+            assets[is_asset] = self.registry.names()[records['asset'][is_asset]]
+
+        strategies = np.array([strategy.value for strategy in STRATEGY_ORDER], dtype=object)
+        frame = pd.DataFrame({
+            'timestamp': timestamps.tz_localize(None),
+            'horizon': np.array(HORIZON_NAMES, dtype=object)[records['horizon']],
+            'asset': assets,
+            'total_operations': records['total'].astype(np.int64),
+        })
+        for column, attribute in RATE_FIELDS.items():
+            frame[attribute] = records[column].astype(np.float64)
+        frame['recommended_strategy'] = strategies[records['strategy']]
+        frame['analysis_period'] = np.char.decode(records['period'], 'utf-8')
+        frame['streak'] = records['streak'].astype(np.int64)
+        frame['paused'] = records['paused'].astype(bool)
+        return frame
@@ -0,0 +1,134 @@
+"""
+Fachada assíncrona do Storage para o modo live
+
+Os handlers de eventos do Telethon apenas enfileiram o sinal (`save`); a
+gravação em disco (log binário + CSV) e no PostgreSQL acontece em tarefas
+gravadoras próprias, em lotes, fora do event loop (ver SignalWriteBuffer).
+Cada destino grava na ordem de chegada, e `close` descarrega tudo o que está
+pendente antes de sincronizar os CSVs.
+"""
+
+import asyncio
+import logging
+from itertools import groupby
+from typing import Callable, Dict, List, Optional, TypeVar
+
+from .config import Config
+from .parser import Signal
+from .storage import Storage
+from .write_buffer import SignalWriteBuffer
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class AsyncStorage:
+    """
+    Gravação não bloqueante de sinais recebidos ao vivo.
+
+    Destinos:
+    - "files": log binário e CSV do dia (append barato quando há journal,
+      senão regravação deduplicada do CSV);
+    - "postgres": inserção em lote, se o formato incluir PostgreSQL.
+    """
+
+    def __init__(self, storage: Storage, config: Config, export_format: str = 'csv',
+                 append_csv: bool = False):
+        """
+        Args:
+            storage: Storage síncrono usado pelas tarefas gravadoras
+            config: Configuração (tamanhos de lote, intervalos e filas)
+            export_format: Formato ('csv', 'pg', ou 'both')
+            append_csv: Usar append no CSV (durabilidade garantida pelo journal)
+        """
+        self.storage = storage
+        self.export_format = export_format
+        self.append_csv = append_csv
+
+        self._files = SignalWriteBuffer(
+            self._write_files,
+            batch_size=config.storage_batch_size,
+            flush_interval_ms=config.storage_flush_interval_ms,
+            max_queue=config.storage_queue_size,
+            name="files"
+        )
+
+        self._postgres: Optional[SignalWriteBuffer] = None
+        if export_format in ['pg', 'both']:
+            self._postgres = SignalWriteBuffer(
+                storage.save_to_postgres,
+                batch_size=config.pg_batch_size,
+                flush_interval_ms=config.pg_flush_interval_ms,
+                max_queue=config.pg_queue_size,
+                name="postgres"
+            )
+
+    @property
+    def buffers(self) -> List[SignalWriteBuffer]:
+        """Buffers ativos, na ordem de gravação."""
+        return [buffer for buffer in (self._files, self._postgres) if buffer is not None]
+
+    @property
+    def failed_signals(self) -> int:
+        """Sinais cuja gravação falhou em algum destino."""
+        return sum(buffer.failed_signals for buffer in self.buffers)
+
+    def start(self) -> None:
+        """Inicia as tarefas gravadoras no event loop atual."""
+        for buffer in self.buffers:
+            buffer.start()
+
+    async def save(self, signal: Signal) -> None:
+        """
+        Enfileira um sinal para todos os destinos.
+
+        Retorna assim que o sinal está na fila; só espera se alguma fila
+        estiver cheia (backpressure).
+        """
+        for buffer in self.buffers:
+            await buffer.put(signal)
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """Executa uma operação síncrona do Storage fora do event loop."""
+        return await asyncio.to_thread(fn, *args)
+
+    async def close(self) -> None:
+        """Descarrega as filas e sincroniza os CSVs abertos para append."""
+        for buffer in self.buffers:
+            await buffer.close()
+
+        await asyncio.to_thread(self.storage.sync_csv_appends)
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        """Métricas de cada destino (ver SignalWriteBuffer.stats)."""
+        return {buffer.name: buffer.stats() for buffer in self.buffers}
+
+    def _write_files(self, batch: List[Signal]) -> None:
+        """
+        Grava um lote no log binário e no CSV do dia (executado em thread).
+
+        Uma falha no log binário não impede o CSV, mas é repassada no final:
+        o lote conta como falho e o journal não recebe checkpoint.
+        """
+        binlog_error = None
+        try:
+            self.storage.save_to_binlog(batch)
+        except Exception as e:
+            binlog_error = e
+
+        if self.export_format in ['csv', 'both']:
+            self._write_csv(batch)
+
+        if binlog_error is not None:
+            raise binlog_error
+
+    def _write_csv(self, batch: List[Signal]) -> None:
+        """Grava um lote no CSV do dia (append ou regravação deduplicada)."""
+        if self.append_csv:
+            self.storage.append_to_csv(batch)
+            return
+
+        # save_to_csv nomeia o arquivo pela data do primeiro sinal: um lote por dia
+        for _, day_signals in groupby(batch, key=lambda signal: signal.timestamp.date()):
+            self.storage.save_to_csv(list(day_signals))
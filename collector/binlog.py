@@ -0,0 +1,317 @@
+"""
+Log binário de sinais com registros de largura fixa
+
+Cada dia é um arquivo `data/binlog/signals_YYYY-MM-DD.bin` com registros de
+20 bytes (little-endian):
+
+    epoch       int64   segundos desde 1970-01-01 UTC
+    asset       uint16  id do ativo (data/binlog/meta.json)
+    result      int8    1 = W, 0 = L
+    attempt     int8    1-3, ou 0 para STOP
+    message_id  int64   id da mensagem no Telegram (0 se desconhecido)
+
+O modo live acrescenta registros ao final do arquivo do dia; a leitura mapeia
+o arquivo com `mmap` e o expõe como array estruturado NumPy sem cópia.
+"""
+
+import os
+import json
+import mmap
+import logging
+from datetime import date as date_type, datetime, tzinfo
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from .parser import Signal
+from .loader import (
+    ATTEMPT_NULL, BINLOG_SUFFIX, RESULT_LOSS, RESULT_WIN, SignalBatch, load_signals_batch
+)
+from .catalog import DATA_ROOT, atomic_open
+
+logger = logging.getLogger(__name__)
+
+RECORD_DTYPE = np.dtype([
+    ('epoch', '<i8'),
+    ('asset', '<u2'),
+    ('result', 'i1'),
+    ('attempt', 'i1'),
+    ('message_id', '<i8'),
+])
+
+BINLOG_DIR = 'binlog'
+META_NAME = 'meta.json'
+DEFAULT_TIMEZONE = 'America/Sao_Paulo'
+
+PathLike = Union[str, Path]
+
+
+class AssetRegistry:
+    """
+    Tabela persistente de ids de ativos (nome -> uint16).
+
+    Ids só são acrescentados, nunca reaproveitados, então arquivos antigos
+    continuam válidos. O arquivo guarda também o timezone local usado para
+    nomear os arquivos diários.
+    """
+
+    def __init__(self, path: PathLike):
+        self.path = Path(path)
+        self.timezone_name = DEFAULT_TIMEZONE
+        self._assets: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._loaded_mtime: Optional[float] = None
+        self._load()
+
+    def _load(self) -> None:
+        """Carrega (ou recarrega, se outro processo alterou) a tabela."""
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            return
+
+        if mtime == self._loaded_mtime:
+            return
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        self.timezone_name = meta.get('timezone', DEFAULT_TIMEZONE)
+        self._assets = list(meta.get('assets', []))
+        self._ids = {name: idx for idx, name in enumerate(self._assets)}
+        self._loaded_mtime = mtime
+
+    def _save(self) -> None:
+        """Grava a tabela de forma atômica."""
+        with atomic_open(self.path, encoding='utf-8') as f:
+            json.dump({'timezone': self.timezone_name, 'assets': self._assets}, f, indent=2)
+        self._loaded_mtime = self.path.stat().st_mtime
+
+    @property
+    def timezone(self) -> tzinfo:
+        return pytz.timezone(self.timezone_name)
+
+    @property
+    def assets(self) -> List[str]:
+        self._load()
+        return list(self._assets)
+
+    def ids_for(self, names: Iterable[str]) -> np.ndarray:
+        """
+        Ids dos ativos, registrando os que ainda não existem.
+
+        Args:
+            names: Nomes dos ativos
+
+        Returns:
+            Array uint16 com os ids
+        """
+        self._load()
+        names = list(names)
+
+        missing = [name for name in dict.fromkeys(names) if name not in self._ids]
+        if missing:
+            for name in missing:
+                if len(self._assets) > np.iinfo(np.uint16).max:
+                    raise OverflowError("Limite de ativos do log binário atingido")
+                self._ids[name] = len(self._assets)
+                self._assets.append(name)
+            self._save()
+
+        return np.fromiter((self._ids[name] for name in names), dtype=np.uint16, count=len(names))
+
+    def names(self) -> np.ndarray:
+        """Array de nomes indexável pelo id."""
+        self._load()
+        return np.array(self._assets, dtype=object)
+
+
+def _map_records(path: PathLike, dtype: np.dtype = RECORD_DTYPE) -> np.ndarray:
+    """
+    Mapeia um arquivo de registros de largura fixa como array estruturado (sem cópia).
+
+    Um registro incompleto no final (gravação interrompida) é ignorado.
+    """
+    size = os.path.getsize(path)
+    count = size // dtype.itemsize
+    if count == 0:
+        return np.empty(0, dtype=dtype)
+
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # O array mantém referência ao mmap; o mapeamento vive enquanto o array viver
+    return np.frombuffer(mapped, dtype=dtype, count=count)
+
+
+class BinaryLog:
+    """Arquivos diários do log binário de sinais."""
+
+    def __init__(
+        self,
+        root: PathLike = DATA_ROOT,
+        timezone: Optional[tzinfo] = None,
+        directory: Optional[PathLike] = None
+    ):
+        self.dir = Path(directory) if directory is not None else Path(root) / BINLOG_DIR
+        self.registry = AssetRegistry(self.dir / META_NAME)
+        if timezone is not None:
+            self.registry.timezone_name = timezone.zone
+        self.timezone = self.registry.timezone
+
+    def path_for(self, day: Union[date_type, datetime, str]) -> Path:
+        """Arquivo de um dia (data local)."""
+        if not isinstance(day, str):
+            day = day.strftime('%Y-%m-%d')
+        return self.dir / f"signals_{day}{BINLOG_SUFFIX}"
+
+    def _localize(self, timestamp: datetime) -> datetime:
+        """Assume o timezone local para timestamps sem fuso."""
+        if timestamp.tzinfo is None:
+            return self.timezone.localize(timestamp)
+        return timestamp
+
+    # ------------------------------------------------------------------
+    # Codificação
+    # ------------------------------------------------------------------
+
+    def encode_signals(self, signals: List[Signal]) -> np.ndarray:
+        """Converte sinais em registros binários."""
+        records = np.zeros(len(signals), dtype=RECORD_DTYPE)
+        if not signals:
+            return records
+
+        records['epoch'] = [int(self._localize(signal.timestamp).timestamp()) for signal in signals]
+        records['asset'] = self.registry.ids_for(signal.asset for signal in signals)
+        records['result'] = [RESULT_WIN if signal.result == 'W' else RESULT_LOSS for signal in signals]
+        records['attempt'] = [signal.attempt or ATTEMPT_NULL for signal in signals]
+        records['message_id'] = [signal.message_id or 0 for signal in signals]
+        return records
+
+    def encode_batch(self, batch: SignalBatch) -> np.ndarray:
+        """Converte um lote colunar do loader em registros binários."""
+        records = np.zeros(len(batch), dtype=RECORD_DTYPE)
+        records['epoch'] = batch.epoch
+        records['asset'] = self.registry.ids_for(batch.assets)[batch.asset_code]
+        records['result'] = batch.result
+        records['attempt'] = batch.attempt
+        if batch.message_id is not None:
+            records['message_id'] = batch.message_id
+        return records
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def append(self, signals: List[Signal]) -> int:
+        """
+        Acrescenta sinais aos arquivos dos respectivos dias.
+
+        Args:
+            signals: Sinais a gravar
+
+        Returns:
+            Número de registros gravados
+        """
+        if not signals:
+            return 0
+
+        records = self.encode_signals(signals)
+        days = [self._localize(signal.timestamp).astimezone(self.timezone).date() for signal in signals]
+
+        self.dir.mkdir(parents=True, exist_ok=True)
+        for day in sorted(set(days)):
+            mask = np.fromiter((d == day for d in days), dtype=bool, count=len(days))
+            with open(self.path_for(day), 'ab') as f:
+                # Descarta registro incompleto deixado por gravação interrompida
+                torn = f.tell() % RECORD_DTYPE.itemsize
+                if torn:
+                    f.truncate(f.tell() - torn)
+                    logger.warning(f"Registro incompleto descartado em {self.path_for(day)}")
+                f.write(records[mask].tobytes())
+
+        return len(records)
+
+    def write_day(self, day: Union[date_type, datetime, str], records: np.ndarray) -> Path:
+        """Substitui (de forma atômica) o arquivo de um dia."""
+        path = self.path_for(day)
+        with atomic_open(path, 'wb') as f:
+            f.write(np.ascontiguousarray(records, dtype=RECORD_DTYPE).tobytes())
+        return path
+
+    def convert_csv(self, csv_path: PathLike, day: Union[date_type, datetime, str]) -> Path:
+        """
+        Converte um CSV de sinais no arquivo binário do dia.
+
+        Args:
+            csv_path: CSV de origem
+            day: Data do arquivo
+
+        Returns:
+            Caminho do arquivo .bin gravado
+        """
+        batch = load_signals_batch(csv_path, self.timezone)
+        records = self.encode_batch(batch)
+        records = records[np.argsort(records['epoch'], kind='stable')]
+        return self.write_day(day, records)
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def read_day(self, day: Union[date_type, datetime, str]) -> np.ndarray:
+        """Registros de um dia (array mapeado, sem cópia; vazio se não existir)."""
+        path = self.path_for(day)
+        if not path.exists():
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return _map_records(path)
+
+    def to_signals(self, records: np.ndarray) -> List[Signal]:
+        """Converte registros binários em objetos Signal (timestamps locais)."""
+        names = self.registry.names()
+        timestamps = pd.to_datetime(records['epoch'], unit='s', utc=True).tz_convert(self.timezone)
+
+        return [
+            Signal(
+                timestamp=timestamp,
+                asset=names[asset],
+                result='W' if result == RESULT_WIN else 'L',
+                attempt=int(attempt) if attempt != ATTEMPT_NULL else None,
+                message_id=int(message_id) or None
+            )
+            for timestamp, asset, result, attempt, message_id in zip(
+                timestamps.to_pydatetime(), records['asset'], records['result'], records['attempt'],
+                records['message_id']
+            )
+        ]
+
+    def to_frame(self, records: np.ndarray) -> pd.DataFrame:
+        """
+        Converte registros binários nas colunas lidas do CSV pelo loader.
+
+        Timestamps ficam em horário local sem fuso, como no CSV.
+        """
+        names = self.registry.names()
+        timestamps = pd.to_datetime(records['epoch'], unit='s', utc=True).tz_convert(self.timezone)
+
+        return pd.DataFrame({
+            'timestamp': timestamps.tz_localize(None),
+            'asset': names[records['asset']] if len(records) else np.array([], dtype=object),
+            'result': np.where(records['result'] == RESULT_WIN, 'W', 'L'),
+            'attempt': records['attempt'].astype(np.int8),
+            'message_id': pd.Series(records['message_id'], dtype='Int64').replace(0, pd.NA)
+        })
+
+
+def read_binlog_frame(path: PathLike) -> pd.DataFrame:
+    """
+    Lê um arquivo .bin nas colunas básicas do loader.
+
+    A tabela de ativos e o timezone vêm do meta.json da mesma pasta.
+    """
+    path = Path(path)
+    log = BinaryLog(directory=path.parent)
+    return log.to_frame(_map_records(path))
@@ -0,0 +1,293 @@
+"""
+Grafo de artefatos derivados com reconstrução incremental
+
+Cada artefato declara seus arquivos de entrada, seus arquivos de saída e a
+função que o constrói. O estado da última construção fica em
+`data/build_state.json` (checksum SHA-256 de cada entrada e saída); um
+artefato só é reconstruído se:
+
+- alguma saída não existe ou foi alterada desde a última construção;
+- alguma entrada mudou (ou a lista de entradas mudou);
+- a receita (função + versão) mudou.
+
+Artefatos cujas entradas são saídas de outros rodam depois deles (ordem
+topológica); os independentes rodam em paralelo num pool de processos. As
+funções de construção precisam ser funções de módulo (serializáveis) com a
+assinatura `fn(inputs, outputs, *args)` e não devem alterar o catálogo.
+"""
+
+import json
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .catalog import DATA_ROOT, atomic_open, file_checksum
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = 'build_state.json'
+
+PathLike = Union[str, Path]
+
+
+@dataclass
+class Artifact:
+    """Artefato derivado: entradas -> função -> saídas."""
+    name: str
+    inputs: List[str]
+    outputs: List[str]
+    func: Callable[..., object]
+    args: Tuple = ()
+    version: str = '1'
+    deps: List[str] = field(default_factory=list)  # preenchido pelo grafo
+
+    @property
+    def recipe(self) -> str:
+        """Identidade da receita: função e versão."""
+        return f"{self.func.__module__}.{self.func.__qualname__}:{self.version}"
+
+
+class BuildState:
+    """Checksums da última construção de cada artefato (data/build_state.json)."""
+
+    def __init__(self, path: PathLike):
+        self.path = Path(path)
+        self._artifacts: Dict[str, Dict[str, object]] = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._artifacts = json.load(f).get('artifacts', {})
+
+        # Cache de checksums por (tamanho, mtime) para não reler arquivos iguais
+        self._digests: Dict[str, Tuple[int, float, str]] = {}
+        for record in self._artifacts.values():
+            for files in (record.get('inputs', {}), record.get('outputs', {})):
+                for path, info in files.items():
+                    self._digests[path] = (info['bytes'], info['mtime'], info['sha256'])
+
+    def fingerprint(self, path: str) -> Optional[Dict[str, object]]:
+        """Tamanho, mtime e checksum de um arquivo (None se não existe)."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        cached = self._digests.get(path)
+        if cached is not None and cached[0] == stat.st_size and cached[1] == stat.st_mtime:
+            digest = cached[2]
+        else:
+            digest = file_checksum(path)
+            self._digests[path] = (stat.st_size, stat.st_mtime, digest)
+
+        return {'bytes': stat.st_size, 'mtime': stat.st_mtime, 'sha256': digest}
+
+    def stale_reason(self, artifact: Artifact) -> Optional[str]:
+        """Motivo para reconstruir o artefato, ou None se está atualizado."""
+        record = self._artifacts.get(artifact.name)
+        if record is None:
+            return "nunca construído"
+
+        if record.get('recipe') != artifact.recipe:
+            return "receita alterada"
+
+        for path in artifact.outputs:
+            current = self.fingerprint(path)
+            if current is None:
+                return f"saída ausente: {path}"
+            if current['sha256'] != record['outputs'].get(path, {}).get('sha256'):
+                return f"saída alterada: {path}"
+
+        if sorted(record['inputs']) != sorted(artifact.inputs):
+            return "entradas diferentes"
+
+        for path in artifact.inputs:
+            current = self.fingerprint(path)
+            if current is None or current['sha256'] != record['inputs'][path]['sha256']:
+                return f"entrada alterada: {path}"
+
+        return None
+
+    def mark_built(self, artifact: Artifact) -> None:
+        """Registra os checksums atuais de entradas e saídas."""
+        self._artifacts[artifact.name] = {
+            'recipe': artifact.recipe,
+            'built_at': datetime.now().isoformat(timespec='seconds'),
+            'inputs': {path: self.fingerprint(path) for path in artifact.inputs},
+            'outputs': {path: self.fingerprint(path) for path in artifact.outputs}
+        }
+
+    def save(self) -> None:
+        """Grava o estado de forma atômica."""
+        with atomic_open(self.path, encoding='utf-8') as f:
+            json.dump({'artifacts': self._artifacts}, f, indent=2, sort_keys=True)
+
+
+def _run_artifact(func: Callable[..., object], inputs: List[str], outputs: List[str], args: Tuple) -> None:
+    """Executa a função de um artefato (no processo do pool)."""
+    for path in outputs:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+    func(inputs, outputs, *args)
+
+
+class BuildGraph:
+    """Conjunto de artefatos e execução incremental em paralelo."""
+
+    def __init__(self, root: PathLike = DATA_ROOT, state_path: Optional[PathLike] = None):
+        self.state = BuildState(state_path or Path(root) / STATE_NAME)
+        self.artifacts: Dict[str, Artifact] = {}
+
+    def add(self, name: str, inputs: Sequence[PathLike], outputs: Sequence[PathLike],
+            func: Callable[..., object], *args, version: str = '1') -> Artifact:
+        """
+        Declara um artefato.
+
+        Args:
+            name: Nome único (ex.: 'report/2025-06-27')
+            inputs: Arquivos lidos
+            outputs: Arquivos gravados
+            func: Função de módulo `fn(inputs, outputs, *args)`
+            *args: Argumentos extras (serializáveis)
+            version: Mudar a versão força a reconstrução
+
+        Returns:
+            Artefato declarado
+        """
+        if name in self.artifacts:
+            raise ValueError(f"Artefato duplicado: {name}")
+
+        artifact = Artifact(
+            name=name,
+            inputs=[Path(p).as_posix() for p in inputs],
+            outputs=[Path(p).as_posix() for p in outputs],
+            func=func,
+            args=tuple(args),
+            version=version
+        )
+        self.artifacts[name] = artifact
+        return artifact
+
+    def _resolve_deps(self) -> List[str]:
+        """Liga entradas às saídas de outros artefatos e devolve a ordem topológica."""
+        producers = {}
+        for artifact in self.artifacts.values():
+            for path in artifact.outputs:
+                if path in producers:
+                    raise ValueError(f"Saída produzida por dois artefatos: {path}")
+                producers[path] = artifact.name
+
+        for artifact in self.artifacts.values():
+            artifact.deps = sorted({producers[p] for p in artifact.inputs if p in producers} - {artifact.name})
+
+        # Kahn: ordem estável por nome entre artefatos independentes
+        pending = {name: set(artifact.deps) for name, artifact in self.artifacts.items()}
+        order = []
+        ready = sorted(name for name, deps in pending.items() if not deps)
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            del pending[name]
+            for other, deps in pending.items():
+                if name in deps:
+                    deps.discard(name)
+                    if not deps and other not in ready:
+                        ready.append(other)
+            ready.sort()
+
+        if pending:
+            raise ValueError(f"Ciclo entre artefatos: {sorted(pending)}")
+
+        return order
+
+    def plan(self) -> List[Tuple[str, str]]:
+        """
+        Artefatos desatualizados, em ordem topológica, sem construir nada.
+
+        Dependentes de artefatos desatualizados também entram no plano.
+        """
+        stale = []
+        stale_names = set()
+        for name in self._resolve_deps():
+            artifact = self.artifacts[name]
+            reason = self.state.stale_reason(artifact)
+            if reason is None and stale_names.intersection(artifact.deps):
+                reason = "dependência desatualizada"
+            if reason is not None:
+                stale.append((name, reason))
+                stale_names.add(name)
+        return stale
+
+    def run(self, jobs: Optional[int] = None, force: bool = False) -> Dict[str, object]:
+        """
+        Reconstrói os artefatos desatualizados.
+
+        Um artefato só é avaliado depois que suas dependências terminaram;
+        se uma dependência falhar, os dependentes são pulados.
+
+        Args:
+            jobs: Processos em paralelo (padrão: número de CPUs)
+            force: Reconstruir tudo
+
+        Returns:
+            Resumo: built, skipped (atualizados), failed, blocked
+        """
+        order = self._resolve_deps()
+        remaining = {name: set(self.artifacts[name].deps) for name in order}
+        built: List[str] = []
+        skipped: List[str] = []
+        failed: Dict[str, str] = {}
+        blocked: List[str] = []
+        running: Dict[Future, str] = {}
+
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            while remaining or running:
+                # Liberar artefatos cujas dependências terminaram
+                for name in [n for n in order if n in remaining and not remaining[n]]:
+                    del remaining[name]
+                    artifact = self.artifacts[name]
+
+                    if any(dep in failed or dep in blocked for dep in artifact.deps):
+                        blocked.append(name)
+                        continue
+
+                    reason = "forçado" if force else self.state.stale_reason(artifact)
+                    if reason is None:
+                        skipped.append(name)
+                        self._release(name, remaining)
+                        continue
+
+                    logger.info(f"🔨 {name}: {reason}")
+                    future = pool.submit(_run_artifact, artifact.func, artifact.inputs,
+                                         artifact.outputs, artifact.args)
+                    running[future] = name
+
+                if not running:
+                    if remaining and not any(not deps for deps in remaining.values()):
+                        # Só sobraram dependentes de artefatos bloqueados/falhos
+                        for name in list(remaining):
+                            blocked.append(name)
+                            del remaining[name]
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        future.result()
+                        self.state.mark_built(self.artifacts[name])
+                        self.state.save()
+                        built.append(name)
+                    except Exception as e:
+                        failed[name] = str(e)
+                        logger.error(f"❌ {name}: {e}")
+                    self._release(name, remaining)
+
+        return {'built': built, 'skipped': skipped, 'failed': failed, 'blocked': blocked}
+
+    @staticmethod
+    def _release(name: str, remaining: Dict[str, set]) -> None:
+        """Marca `name` como concluído para os dependentes."""
+        for deps in remaining.values():
+            deps.discard(name)
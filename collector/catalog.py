@@ -0,0 +1,685 @@
+"""
+Catálogo (manifesto) dos arquivos de dados
+
+Mantém em `data/catalog.json`, para cada data, os arquivos conhecidos e seu
+papel (pre-op time, op time, daily ops, trading log, live), com contagem de
+linhas, primeiro/último timestamp, tamanho em bytes, checksum SHA-256 e o
+codec de compressão (dias antigos compactados pela retenção).
+
+Toda gravação feita pelo Storage ou pelo consolidador atualiza o manifesto de
+forma atômica (arquivo temporário + os.replace), com a leitura-alteração-
+gravação inteira sob um lock de arquivo (`catalog.json.lock`): processos
+diferentes (modo live, consolidador, build noturno, dashboard) não perdem as
+entradas uns dos outros. As ferramentas localizam os
+arquivos de uma data consultando o manifesto em vez de testar caminhos ou
+percorrer `data/trading ops`.
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import date as date_type, datetime
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Union
+
+import pandas as pd
+
+from .loader import load_signals_frame, TIMESTAMP_FORMAT
+from .compression import DATA_FILE_PATTERNS, codec_for
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: sem lock entre processos (o lock entre threads continua)
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Papéis dos arquivos (nomes das subpastas em data/trading ops/YYYY/MM/DD/)
+ROLE_PRE_OP = 'pre-op time'
+ROLE_OP_TIME = 'op time'
+ROLE_DAILY_OPS = 'daily ops'
+ROLE_TRADING_LOG = 'trading log'
+ROLE_LIVE = 'live'            # data/signals_YYYY-MM-DD.csv gravado pelo Storage
+ROLE_STUDY = 'study data'     # dados sanitizados para os estudos
+ROLE_BINLOG = 'binlog'        # data/binlog/signals_YYYY-MM-DD.bin
+
+# Ordem de preferência ao resolver "o" arquivo de sinais de uma data
+SIGNAL_ROLE_PRIORITY = [ROLE_DAILY_OPS, ROLE_OP_TIME, ROLE_PRE_OP, ROLE_LIVE]
+
+DATA_ROOT = 'data'
+TRADING_OPS_DIR = 'trading ops'
+MANIFEST_NAME = 'catalog.json'
+LOCK_SUFFIX = '.lock'
+MANIFEST_VERSION = 1
+
+DATE_IN_NAME_RE = re.compile(r'(\d{4}-\d{2}-\d{2})')
+
+PathLike = Union[str, Path]
+
+
+def _date_key(day: Union[date_type, datetime, str]) -> str:
+    """Normaliza uma data para a chave do manifesto (YYYY-MM-DD)."""
+    if isinstance(day, str):
+        return day
+    if isinstance(day, datetime):
+        day = day.date()
+    return day.strftime('%Y-%m-%d')
+
+
+def file_checksum(path: PathLike, chunk_size: int = 1 << 20) -> str:
+    """Calcula o SHA-256 de um arquivo em blocos."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _current_umask() -> int:
+    """Umask do processo (os.umask só permite ler trocando o valor)."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+@contextmanager
+def atomic_open(path: PathLike, mode: str = 'w', **kwargs) -> Iterator[IO]:
+    """
+    Abre um arquivo para gravação atômica.
+
+    O conteúdo vai para um arquivo temporário na mesma pasta, que substitui o
+    destino com os.replace ao sair do bloco sem erro; leitores nunca veem um
+    arquivo parcial.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix='.tmp', dir=path.parent)
+    try:
+        # mkstemp cria com 0600; manter as permissões de um arquivo comum
+        os.chmod(tmp_path, path.stat().st_mode & 0o777 if path.exists() else 0o666 & ~_current_umask())
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_frame_atomic(df: pd.DataFrame, path: PathLike) -> str:
+    """
+    Grava um DataFrame em CSV de forma atômica (ver atomic_open).
+
+    Returns:
+        SHA-256 do conteúdo gravado (o catálogo não precisa reler o arquivo)
+    """
+    data = df.to_csv(index=False).encode('utf-8')
+    with atomic_open(path, 'wb') as f:
+        f.write(data)
+    return hashlib.sha256(data).hexdigest()
+
+
+def _glob_data_files(folder: Path, prefix: str = '', recursive: bool = False) -> List[Path]:
+    """Arquivos de dados (CSV puro ou compactado) de uma pasta."""
+    glob = folder.rglob if recursive else folder.glob
+    return [p for pattern in DATA_FILE_PATTERNS for p in glob(prefix + pattern)]
+
+
+def day_dir(day: Union[date_type, datetime], root: PathLike = DATA_ROOT) -> Path:
+    """
+    Pasta de um dia na árvore de operações: data/trading ops/YYYY/MM/DD.
+
+    Os nomes têm largura fixa, então a ordem lexicográfica das pastas é a
+    ordem cronológica e intervalos de datas podem ser podados pelo caminho.
+    """
+    if isinstance(day, datetime):
+        day = day.date()
+    return Path(root) / TRADING_OPS_DIR / f"{day.year:04d}" / f"{day.month:02d}" / f"{day.day:02d}"
+
+
+def role_dir(day: Union[date_type, datetime], role: str, root: PathLike = DATA_ROOT) -> Path:
+    """Subpasta de um papel dentro da pasta do dia (ex.: .../2025/06/27/daily ops)."""
+    return day_dir(day, root) / role
+
+
+def legacy_day_dir(day: Union[date_type, datetime], root: PathLike = DATA_ROOT) -> Path:
+    """Pasta de um dia no layout antigo, sem ano: data/trading ops/<Mês>/<Dia>."""
+    if isinstance(day, datetime):
+        day = day.date()
+    return Path(root) / TRADING_OPS_DIR / day.strftime('%B') / str(day.day)
+
+
+def iter_day_dirs(
+    start: Union[date_type, datetime, str, None] = None,
+    end: Union[date_type, datetime, str, None] = None,
+    root: PathLike = DATA_ROOT
+) -> Iterator[Path]:
+    """
+    Percorre as pastas de dia existentes dentro de um intervalo, em ordem.
+
+    A poda é feita nível a nível (ano, mês, dia) comparando os nomes, sem
+    listar as pastas fora do intervalo.
+
+    Args:
+        start: Primeira data (inclusive); None para sem limite
+        end: Última data (inclusive); None para sem limite
+        root: Raiz dos dados
+
+    Yields:
+        Caminhos das pastas de dia
+    """
+    lo = _date_key(start).split('-') if start is not None else None
+    hi = _date_key(end).split('-') if end is not None else None
+
+    def children(folder: Path, level: int, prefix: List[str]) -> List[Path]:
+        width = 4 if level == 0 else 2
+        names = sorted(p.name for p in folder.iterdir()
+                       if p.is_dir() and len(p.name) == width and p.name.isdigit())
+        selected = []
+        for name in names:
+            key = prefix + [name]
+            if lo is not None and key < lo[:level + 1]:
+                continue
+            if hi is not None and key > hi[:level + 1]:
+                break
+            selected.append(folder / name)
+        return selected
+
+    ops_root = Path(root) / TRADING_OPS_DIR
+    if not ops_root.exists():
+        return
+
+    for year in children(ops_root, 0, []):
+        for month in children(year, 1, [year.name]):
+            yield from children(month, 2, [year.name, month.name])
+
+
+class DataCatalog:
+    """Manifesto dos arquivos de dados por data e papel."""
+
+    def __init__(self, root: PathLike = DATA_ROOT, manifest_path: Optional[PathLike] = None):
+        self.root = Path(root)
+        self.manifest_path = Path(manifest_path) if manifest_path else self.root / MANIFEST_NAME
+        self.lock_path = self.manifest_path.with_name(self.manifest_path.name + LOCK_SUFFIX)
+        self._data: Optional[dict] = None
+        self._loaded_mtime: Optional[float] = None
+        self._thread_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------
+
+    def _load(self) -> dict:
+        """Carrega o manifesto (recarrega se outro processo o alterou)."""
+        try:
+            mtime = self.manifest_path.stat().st_mtime
+        except FileNotFoundError:
+            if self._data is None:
+                self._data = {'version': MANIFEST_VERSION, 'dates': {}}
+            return self._data
+
+        if self._data is None or mtime != self._loaded_mtime:
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    self._data = json.load(f)
+                self._data.setdefault('dates', {})
+                self._loaded_mtime = mtime
+            except (OSError, ValueError) as e:
+                logger.warning(f"Manifesto ilegível ({self.manifest_path}): {e} - será reconstruído")
+                self._data = {'version': MANIFEST_VERSION, 'dates': {}}
+
+        return self._data
+
+    @contextmanager
+    def _locked(self) -> Iterator[dict]:
+        """
+        Manifesto recém-lido, sob lock exclusivo até o fim do bloco.
+
+        Toda alteração (leitura, mudança e _save) acontece dentro do bloco,
+        senão uma gravação concorrente de outro processo se perderia. Não
+        reentrante.
+        """
+        with self._thread_lock:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_path, 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    # O mtime pode não mudar entre duas gravações próximas: sempre reler
+                    self._data = None
+                    yield self._load()
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _save(self) -> None:
+        """Grava o manifesto de forma atômica."""
+        with atomic_open(self.manifest_path, encoding='utf-8') as f:
+            json.dump(self._data, f, indent=2, ensure_ascii=False, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        self._loaded_mtime = self.manifest_path.stat().st_mtime
+
+    # ------------------------------------------------------------------
+    # Registro
+    # ------------------------------------------------------------------
+
+    def describe(
+        self,
+        path: PathLike,
+        role: str,
+        frame: Optional[pd.DataFrame] = None,
+        summary: Optional[Dict[str, object]] = None,
+        checksum: Optional[str] = None
+    ) -> Dict[str, object]:
+        """
+        Calcula a entrada do manifesto para um arquivo.
+
+        Args:
+            path: Caminho do arquivo
+            role: Papel do arquivo
+            frame: Conteúdo já carregado (evita reler o CSV)
+            summary: rows/min_ts/max_ts/sorted já conhecidos por quem gravou
+            checksum: SHA-256 já calculado por quem gravou (evita reler)
+
+        Returns:
+            Dicionário com path, rows, min_ts, max_ts, bytes, sha256, sorted
+            e codec
+        """
+        path = Path(path)
+        stat = path.stat()
+
+        entry: Dict[str, object] = {
+            'path': path.as_posix(),
+            'bytes': stat.st_size,
+            'mtime': stat.st_mtime,
+            'sha256': checksum or file_checksum(path),
+            'codec': codec_for(path),
+            'rows': None,
+            'min_ts': None,
+            'max_ts': None,
+            'sorted': None
+        }
+
+        if summary is not None:
+            entry.update({key: summary.get(key) for key in ('rows', 'min_ts', 'max_ts', 'sorted')})
+            return entry
+
+        if role == ROLE_TRADING_LOG:
+            entry['rows'] = len(frame) if frame is not None else len(pd.read_csv(path))
+            return entry
+
+        if frame is None:
+            frame = load_signals_frame(path)
+
+        timestamps = pd.to_datetime(frame['timestamp'])
+        entry['rows'] = len(frame)
+        if len(frame):
+            entry['min_ts'] = timestamps.min().strftime(TIMESTAMP_FORMAT)
+            entry['max_ts'] = timestamps.max().strftime(TIMESTAMP_FORMAT)
+        entry['sorted'] = bool(timestamps.is_monotonic_increasing)
+
+        return entry
+
+    def record(
+        self,
+        path: PathLike,
+        role: str,
+        day: Union[date_type, datetime, str, None] = None,
+        frame: Optional[pd.DataFrame] = None,
+        sources: Optional[Iterable[PathLike]] = None,
+        summary: Optional[Dict[str, object]] = None,
+        checksum: Optional[str] = None
+    ) -> Dict[str, object]:
+        """
+        Registra (ou atualiza) um arquivo no manifesto.
+
+        Args:
+            path: Caminho do arquivo gravado
+            role: Papel do arquivo
+            day: Data a que o arquivo pertence (padrão: extraída do nome)
+            frame: Conteúdo já carregado (evita reler o CSV)
+            sources: Arquivos de origem; seus checksums ficam registrados
+            summary: rows/min_ts/max_ts/sorted já conhecidos (evita reler)
+            checksum: SHA-256 já conhecido (evita reler)
+
+        Returns:
+            Entrada registrada
+        """
+        if day is None:
+            day = self._date_from_name(path)
+            if day is None:
+                raise ValueError(f"Não foi possível inferir a data de {path}")
+
+        entry = self.describe(path, role, frame, summary, checksum)
+        if sources is not None:
+            entry['sources'] = {Path(s).as_posix(): file_checksum(s) for s in sources}
+
+        with self._locked() as data:
+            data['dates'].setdefault(_date_key(day), {})[role] = entry
+            self._save()
+
+        logger.debug(f"🗂️ Catálogo: {role} {_date_key(day)} -> {entry['path']} ({entry['rows']} linhas)")
+        return entry
+
+    def record_compacted(self, day: Union[date_type, datetime, str], role: str,
+                         path: PathLike) -> Dict[str, object]:
+        """
+        Troca o arquivo de uma entrada pela sua versão compactada.
+
+        O conteúdo é o mesmo, então rows/min_ts/max_ts/sorted e as origens são
+        mantidos. Arquivos derivados que tinham o original como origem passam
+        a referenciar a versão compactada (e seu checksum), continuando
+        atualizados para sources_unchanged.
+
+        Args:
+            day: Data da entrada
+            role: Papel da entrada
+            path: Arquivo compactado
+
+        Returns:
+            Entrada atualizada
+        """
+        with self._locked() as data:
+            entries = data['dates'][_date_key(day)]
+            old = entries[role]
+
+            entry = self.describe(path, role, summary=old)
+            entry['original_bytes'] = old.get('original_bytes', old['bytes'])
+            if 'sources' in old:
+                entry['sources'] = old['sources']
+            entries[role] = entry
+
+            for day_entries in data['dates'].values():
+                for other in day_entries.values():
+                    sources = other.get('sources')
+                    if sources and old['path'] in sources:
+                        sources.pop(old['path'])
+                        sources[entry['path']] = entry['sha256']
+
+            self._save()
+        return entry
+
+    def forget(self, day: Union[date_type, datetime, str], role: str) -> None:
+        """Remove uma entrada do manifesto."""
+        with self._locked() as data:
+            entries = data['dates'].get(_date_key(day), {})
+            if entries.pop(role, None) is not None:
+                if not entries:
+                    data['dates'].pop(_date_key(day), None)
+                self._save()
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def entries(self, day: Union[date_type, datetime, str]) -> Dict[str, Dict[str, object]]:
+        """Entradas registradas para uma data, por papel."""
+        return dict(self._load()['dates'].get(_date_key(day), {}))
+
+    def dates_between(self, start: Union[date_type, datetime, str],
+                      end: Union[date_type, datetime, str]) -> List[str]:
+        """Datas do manifesto dentro do intervalo (inclusive)."""
+        lo, hi = _date_key(start), _date_key(end)
+        return [key for key in self.dates() if lo <= key <= hi]
+
+    def dates(self) -> List[str]:
+        """Datas presentes no manifesto, em ordem."""
+        return sorted(self._load()['dates'])
+
+    def lookup(self, day: Union[date_type, datetime, str], role: str) -> Optional[Path]:
+        """
+        Caminho do arquivo de uma data e papel.
+
+        Returns:
+            Caminho, ou None se não registrado ou se o arquivo sumiu do disco
+        """
+        entry = self.entries(day).get(role)
+        if entry is None:
+            return None
+
+        path = Path(entry['path'])
+        return path if path.exists() else None
+
+    def signal_files(self, day: Union[date_type, datetime, str]) -> Dict[str, Path]:
+        """Arquivos de sinais existentes de uma data, por papel."""
+        files = {}
+        for role in self.entries(day):
+            if role in (ROLE_TRADING_LOG, ROLE_STUDY, ROLE_BINLOG):
+                continue
+            path = self.lookup(day, role)
+            if path is not None:
+                files[role] = path
+        return files
+
+    def resolve(self, day: Union[date_type, datetime, str]) -> Optional[Path]:
+        """
+        Melhor arquivo de sinais de uma data.
+
+        Preferência: daily ops, op time, pre-op time, live e, por fim,
+        qualquer outro papel de sinais registrado.
+        """
+        files = self.signal_files(day)
+
+        for role in SIGNAL_ROLE_PRIORITY:
+            if role in files:
+                return files[role]
+
+        return next(iter(files.values()), None)
+
+    def is_unchanged(self, path: PathLike, day: Union[date_type, datetime, str, None] = None,
+                     role: Optional[str] = None) -> bool:
+        """
+        Verifica se um arquivo está igual ao registrado.
+
+        Tamanho diferente já basta para indicar mudança; com o mesmo tamanho,
+        o checksum decide.
+        """
+        entry = self.entry_for(path, day, role)
+        if entry is None or not os.path.exists(path):
+            return False
+
+        if os.path.getsize(path) != entry['bytes']:
+            return False
+
+        return file_checksum(path) == entry['sha256']
+
+    def sources_unchanged(self, day: Union[date_type, datetime, str], role: str,
+                          sources: Iterable[PathLike]) -> bool:
+        """
+        Verifica se um arquivo derivado está atualizado em relação às origens.
+
+        Verdadeiro se o derivado existe sem alterações e foi gerado a partir
+        exatamente dos mesmos arquivos de origem, com os mesmos checksums.
+        """
+        entry = self.entries(day).get(role)
+        if entry is None or 'sources' not in entry:
+            return False
+
+        if not self.is_unchanged(entry['path'], day, role):
+            return False
+
+        current = {Path(s).as_posix(): file_checksum(s) for s in sources}
+        return current == entry['sources']
+
+    # ------------------------------------------------------------------
+    # Varredura (arquivos movidos manualmente)
+    # ------------------------------------------------------------------
+
+    def scan_date(self, day: Union[date_type, datetime]) -> int:
+        """
+        Registra os arquivos de uma data encontrados no disco.
+
+        Percorre apenas a pasta do dia (e a pasta no layout antigo, se ainda
+        não migrada) e o arquivo live correspondente; arquivos já registrados
+        com mesmo tamanho e mtime são ignorados.
+
+        Returns:
+            Número de entradas novas ou atualizadas
+        """
+        key = _date_key(day)
+        candidates = _glob_data_files(self.root, f"signals_{key}")
+
+        for folder in (day_dir(day, self.root), legacy_day_dir(day, self.root)):
+            if folder.exists():
+                candidates.extend(p for p in _glob_data_files(folder, recursive=True) if key in p.name)
+
+        return self._register(candidates)
+
+    def scan(
+        self,
+        start: Union[date_type, datetime, str, None] = None,
+        end: Union[date_type, datetime, str, None] = None
+    ) -> int:
+        """
+        Registra os arquivos de dados encontrados em `data/`.
+
+        Sem intervalo, percorre toda a árvore (útil na primeira execução).
+        Com intervalo, só visita as pastas YYYY/MM/DD dentro dele.
+
+        Args:
+            start: Primeira data (inclusive)
+            end: Última data (inclusive)
+
+        Returns:
+            Número de entradas novas ou atualizadas
+        """
+        lo = _date_key(start) if start is not None else None
+        hi = _date_key(end) if end is not None else None
+
+        candidates = [
+            p for p in _glob_data_files(self.root, 'signals_')
+            if (lo is None or self._date_from_name(p) >= lo) and (hi is None or self._date_from_name(p) <= hi)
+        ]
+
+        if lo is None and hi is None:
+            ops_root = self.root / TRADING_OPS_DIR
+            if ops_root.exists():
+                candidates.extend(_glob_data_files(ops_root, recursive=True))
+        else:
+            for folder in iter_day_dirs(start, end, self.root):
+                candidates.extend(_glob_data_files(folder, recursive=True))
+
+        return self._register(candidates)
+
+    def rewrite_paths(self, moves: Dict[PathLike, PathLike]) -> int:
+        """
+        Atualiza caminhos de arquivos movidos, preservando as demais informações.
+
+        Também atualiza as referências em `sources` de arquivos derivados.
+
+        Args:
+            moves: Mapa caminho antigo -> caminho novo
+
+        Returns:
+            Número de entradas atualizadas
+        """
+        mapping = {Path(old).as_posix(): Path(new).as_posix() for old, new in moves.items()}
+        changed = 0
+
+        with self._locked() as data:
+            for entries in data['dates'].values():
+                for entry in entries.values():
+                    new_path = mapping.get(entry['path'])
+                    if new_path is not None:
+                        entry['path'] = new_path
+                        entry['mtime'] = Path(new_path).stat().st_mtime
+                        changed += 1
+                    if 'sources' in entry:
+                        entry['sources'] = {mapping.get(src, src): digest for src, digest in entry['sources'].items()}
+
+            if changed:
+                self._save()
+
+        return changed
+
+    def _register(self, candidates: Iterable[Path]) -> int:
+        """
+        Registra candidatos novos ou modificados em uma única gravação.
+
+        Os checksums são calculados antes de tomar o lock; só a aplicação das
+        entradas acontece sob ele.
+        """
+        data = self._load()
+        updates: Dict[tuple, Dict[str, object]] = {}
+
+        for path in candidates:
+            if not path.is_file() or '_backup_' in path.name:
+                continue
+
+            day = self._date_from_name(path)
+            role = self._role_from_path(path)
+            if day is None or role is None:
+                continue
+
+            current = data['dates'].get(day, {}).get(role)
+            stat = path.stat()
+            if (current and current['path'] == path.as_posix()
+                    and current['bytes'] == stat.st_size and current['mtime'] == stat.st_mtime):
+                continue
+
+            try:
+                entry = self.describe(path, role)
+            except Exception as e:
+                logger.warning(f"Arquivo ignorado no catálogo ({path}): {e}")
+                continue
+
+            updates[(day, role)] = entry
+
+        if updates:
+            with self._locked() as data:
+                for (day, role), entry in updates.items():
+                    data['dates'].setdefault(day, {})[role] = entry
+                self._save()
+            logger.info(f"🗂️ Catálogo atualizado: {len(updates)} arquivo(s)")
+
+        return len(updates)
+
+    # ------------------------------------------------------------------
+    # Auxiliares
+    # ------------------------------------------------------------------
+
+    def entry_for(self, path: PathLike, day: Union[date_type, datetime, str, None] = None,
+                  role: Optional[str] = None) -> Optional[Dict[str, object]]:
+        """Entrada registrada para um caminho (data inferida do nome se omitida)."""
+        posix = Path(path).as_posix()
+
+        if day is None:
+            day = self._date_from_name(path)
+        if day is None:
+            return None
+
+        for entry_role, entry in self.entries(day).items():
+            if (role is None or entry_role == role) and entry['path'] == posix:
+                return entry
+        return None
+
+    @staticmethod
+    def _date_from_name(path: PathLike) -> Optional[str]:
+        """Extrai a data (YYYY-MM-DD) do nome do arquivo."""
+        match = DATE_IN_NAME_RE.search(Path(path).name)
+        return match.group(1) if match else None
+
+    def _role_from_path(self, path: Path) -> Optional[str]:
+        """Infere o papel de um arquivo pela sua localização e nome."""
+        if path.name.startswith('real_trading_log_'):
+            return ROLE_TRADING_LOG
+
+        if not path.name.startswith('signals_'):
+            return None
+
+        if path.parent == self.root:
+            return ROLE_LIVE
+
+        if path.parent.name == 'study_data':
+            return ROLE_STUDY
+
+        # Subpasta do dia (pre-op time, op time, daily ops ou estrutura alternativa)
+        return path.parent.name
@@ -0,0 +1,158 @@
+"""
+Compressão dos arquivos de dados de dias antigos
+
+Dias frios são guardados como o mesmo CSV compactado: `.csv.zst` (zstd, via
+pacote opcional `zstandard`) ou, na falta dele, `.csv.gz`. Como o conteúdo
+não muda, o pandas lê qualquer das formas diretamente (compression='infer')
+e `open_text` dá o mesmo acesso às leituras em streaming.
+"""
+
+import io
+import os
+import gzip
+import shutil
+import hashlib
+from pathlib import Path
+from typing import IO, List, Optional, Union
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODEC_ZSTD = 'zstd'
+CODEC_GZIP = 'gzip'
+
+CODEC_SUFFIXES = {CODEC_ZSTD: '.zst', CODEC_GZIP: '.gz'}
+DEFAULT_LEVELS = {CODEC_ZSTD: 10, CODEC_GZIP: 9}
+
+# Padrões dos arquivos de dados tabulares (puro e compactados)
+DATA_FILE_PATTERNS = ['*.csv'] + [f"*.csv{suffix}" for suffix in CODEC_SUFFIXES.values()]
+
+PathLike = Union[str, Path]
+
+
+def available_codecs() -> List[str]:
+    """Codecs disponíveis neste ambiente (zstd depende do pacote zstandard)."""
+    return [CODEC_ZSTD, CODEC_GZIP] if zstandard is not None else [CODEC_GZIP]
+
+
+def default_codec() -> str:
+    """zstd se disponível, senão gzip."""
+    return available_codecs()[0]
+
+
+def codec_for(path: PathLike) -> Optional[str]:
+    """Codec de um arquivo pela extensão (None se não compactado)."""
+    name = str(path)
+    for codec, suffix in CODEC_SUFFIXES.items():
+        if name.endswith(suffix):
+            return codec
+    return None
+
+
+def existing_path(path: PathLike) -> Optional[Path]:
+    """
+    Caminho existente de um arquivo, em qualquer forma.
+
+    Se o arquivo puro não existe mais (foi compactado), devolve a versão
+    `.zst`/`.gz` correspondente.
+
+    Returns:
+        Caminho encontrado, ou None
+    """
+    path = Path(path)
+    if path.exists():
+        return path
+
+    if codec_for(path) is None:
+        for suffix in CODEC_SUFFIXES.values():
+            candidate = path.with_name(path.name + suffix)
+            if candidate.exists():
+                return candidate
+
+    return None
+
+
+def _require_codec(codec: str) -> None:
+    """Falha com mensagem clara se o codec não estiver disponível."""
+    if codec not in CODEC_SUFFIXES:
+        raise ValueError(f"Codec desconhecido: {codec}")
+    if codec == CODEC_ZSTD and zstandard is None:
+        raise RuntimeError("Codec zstd requer o pacote 'zstandard' (pip install zstandard)")
+
+
+def open_binary(path: PathLike) -> IO[bytes]:
+    """Abre um arquivo para leitura binária, descompactando se necessário."""
+    codec = codec_for(path)
+
+    if codec == CODEC_GZIP:
+        return gzip.open(path, 'rb')
+
+    if codec == CODEC_ZSTD:
+        _require_codec(codec)
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+
+    return open(path, 'rb')
+
+
+def open_text(path: PathLike, encoding: str = 'utf-8', newline: Optional[str] = '') -> IO[str]:
+    """Abre um arquivo (puro ou compactado) para leitura de texto em streaming."""
+    if codec_for(path) is None:
+        return open(path, 'r', encoding=encoding, newline=newline)
+    return io.TextIOWrapper(open_binary(path), encoding=encoding, newline=newline)
+
+
+def _content_digest(stream: IO[bytes], chunk_size: int = 1 << 20) -> str:
+    """SHA-256 do conteúdo (descompactado) de um stream."""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compress_file(path: PathLike, codec: Optional[str] = None, level: Optional[int] = None,
+                  remove_source: bool = True) -> Path:
+    """
+    Compacta um arquivo ao lado do original (`<nome>.zst` ou `<nome>.gz`).
+
+    A versão compactada é gravada de forma atômica e conferida (conteúdo
+    descompactado idêntico ao original) antes de o original ser removido.
+
+    Args:
+        path: Arquivo a compactar
+        codec: CODEC_ZSTD ou CODEC_GZIP (padrão: default_codec())
+        level: Nível de compressão (padrão: DEFAULT_LEVELS)
+        remove_source: Remover o original após a conferência
+
+    Returns:
+        Caminho do arquivo compactado
+    """
+    from .catalog import atomic_open
+
+    path = Path(path)
+    codec = codec or default_codec()
+    _require_codec(codec)
+    level = DEFAULT_LEVELS[codec] if level is None else level
+    target = path.with_name(path.name + CODEC_SUFFIXES[codec])
+
+    with open(path, 'rb') as src, atomic_open(target, 'wb') as dst:
+        if codec == CODEC_ZSTD:
+            with zstandard.ZstdCompressor(level=level).stream_writer(dst, closefd=False) as writer:
+                shutil.copyfileobj(src, writer)
+        else:
+            # mtime fixo: mesmo conteúdo gera o mesmo arquivo (checksum estável)
+            with gzip.GzipFile(filename=path.name, mode='wb', fileobj=dst, compresslevel=level, mtime=0) as writer:
+                shutil.copyfileobj(src, writer)
+        dst.flush()
+        os.fsync(dst.fileno())
+
+    with open(path, 'rb') as original, open_binary(target) as compressed:
+        if _content_digest(original) != _content_digest(compressed):
+            target.unlink()
+            raise IOError(f"Conferência falhou ao compactar {path}")
+
+    if remove_source:
+        path.unlink()
+
+    return target
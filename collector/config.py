@@ -18,7 +18,13 @@ load_dotenv(dotenv_path=dotenv_path)
 class Config:
     """Classe de configuração centralizada."""
     
-    def __init__(self):
+    def __init__(self, require_telegram: bool = True):
+        """
+        Args:
+            require_telegram: Exige TG_API_ID/TG_API_HASH. Ferramentas que só
+                leem os dados locais (compactação, build noturno, otimizador)
+                passam False e rodam sem credenciais do Telegram.
+        """
         # Telegram API
         self.api_id = os.getenv('TG_API_ID')
         self.api_hash = os.getenv('TG_API_HASH')
@@ -27,7 +33,34 @@ class Config:
         
         # PostgreSQL
         self.pg_dsn = os.getenv('PG_DSN', '')
-        
+
+        # Buffer de escrita do modo live (group commit no PostgreSQL)
+        self.pg_batch_size = int(os.getenv('PG_BATCH_SIZE', '50'))
+        self.pg_flush_interval_ms = int(os.getenv('PG_FLUSH_INTERVAL_MS', '500'))
+        self.pg_queue_size = int(os.getenv('PG_QUEUE_SIZE', '1000'))
+
+        # Fila de gravação em disco do modo live (log binário + CSV)
+        self.storage_batch_size = int(os.getenv('STORAGE_BATCH_SIZE', '50'))
+        self.storage_flush_interval_ms = int(os.getenv('STORAGE_FLUSH_INTERVAL_MS', '100'))
+        self.storage_queue_size = int(os.getenv('STORAGE_QUEUE_SIZE', '1000'))
+
+        # Leitura em streaming (cursor do lado do servidor)
+        self.pg_itersize = int(os.getenv('PG_ITERSIZE', '5000'))
+
+        # Tabela de sinais particionada por mês (apenas na criação da tabela)
+        self.pg_partitioned = os.getenv('PG_PARTITIONED', 'false').lower() in ('1', 'true', 'yes', 'sim')
+
+        # Log binário de sinais (data/binlog) alimentado pelo modo live
+        self.binlog_enabled = os.getenv('BINLOG_ENABLED', 'true').lower() in ('1', 'true', 'yes', 'sim')
+
+        # Journal write-ahead do modo live (data/journal)
+        self.journal_enabled = os.getenv('JOURNAL_ENABLED', 'true').lower() in ('1', 'true', 'yes', 'sim')
+        self.journal_flush_interval_ms = int(os.getenv('JOURNAL_FLUSH_INTERVAL_MS', '20'))
+
+        # Retenção: dias mais antigos que isto são compactados (zstd ou gzip)
+        self.retention_days = int(os.getenv('RETENTION_DAYS', '30'))
+        self.compression_codec = os.getenv('COMPRESSION_CODEC', '').lower() or None
+
         # Timezone
         self.timezone = pytz.timezone('America/Sao_Paulo')
         
@@ -42,7 +75,8 @@ class Config:
         self.log_level = getattr(logging, log_level, logging.INFO)
         
         # Validações
-        self._validate_config()
+        if require_telegram:
+            self._validate_config()
     
     def _validate_config(self) -> None:
         """Valida configurações obrigatórias."""
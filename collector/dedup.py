@@ -0,0 +1,108 @@
+"""
+Deduplicação idempotente de sinais
+
+A identidade de um sinal é a mensagem do Telegram que o originou:
+(chat_id, message_id). Registros antigos, sem id, caem na chave legada
+(timestamp, asset, result), a mesma usada antes dos ids. A verificação é
+O(1) por registro, com conjuntos em memória, e não depende de comparar
+todas as colunas.
+"""
+
+from datetime import datetime, tzinfo
+from typing import Hashable, Optional, Set, Tuple
+
+from .parser import Signal
+from .loader import TIMESTAMP_FORMAT
+
+
+def signal_timestamp_key(signal: Signal, timezone: Optional[tzinfo] = None) -> str:
+    """Timestamp local do sinal no formato gravado ('YYYY-MM-DD HH:MM:SS')."""
+    timestamp: datetime = signal.timestamp
+    if timezone is not None and timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone)
+    return timestamp.strftime(TIMESTAMP_FORMAT)
+
+
+class SignalDeduper:
+    """
+    Conjunto de sinais já vistos.
+
+    Regras:
+    - dois registros com message_id são iguais se (chat_id, message_id) for igual;
+    - se algum dos dois não tem message_id, compara-se a chave legada
+      (timestamp, asset, result).
+
+    Assim, dois resultados legítimos no mesmo segundo (mensagens diferentes)
+    são mantidos, e dados antigos sem id continuam deduplicados como antes.
+    """
+
+    def __init__(self):
+        self._ids: Set[Tuple[Optional[int], int]] = set()
+        self._legacy_all: Set[Tuple[Hashable, str, str]] = set()
+        self._legacy_without_id: Set[Tuple[Hashable, str, str]] = set()
+
+    def __len__(self) -> int:
+        return len(self._legacy_all)
+
+    def clear(self) -> None:
+        """Esquece todos os registros vistos."""
+        self._ids.clear()
+        self._legacy_all.clear()
+        self._legacy_without_id.clear()
+
+    def clear_legacy(self) -> None:
+        """
+        Esquece só as chaves legadas; os ids de mensagem continuam vistos.
+
+        Com registros em ordem de timestamp, chaves legadas de um timestamp
+        já passado nunca mais colidem (o timestamp faz parte da chave).
+        """
+        self._legacy_all.clear()
+        self._legacy_without_id.clear()
+
+    def add(
+        self,
+        timestamp: Hashable,
+        asset: str,
+        result: str,
+        chat_id: Optional[int] = None,
+        message_id: Optional[int] = None
+    ) -> bool:
+        """
+        Registra um sinal.
+
+        Args:
+            timestamp: Timestamp em qualquer representação consistente
+                (texto local, epoch...)
+            asset: Ativo
+            result: Resultado ('W' ou 'L')
+            chat_id: Id do chat (None se desconhecido)
+            message_id: Id da mensagem (None se desconhecido)
+
+        Returns:
+            True se o sinal é novo, False se é duplicata
+        """
+        legacy = (timestamp, asset, result)
+
+        if message_id is not None:
+            key = (chat_id, message_id)
+            if key in self._ids or legacy in self._legacy_without_id:
+                return False
+            self._ids.add(key)
+        else:
+            if legacy in self._legacy_all:
+                return False
+            self._legacy_without_id.add(legacy)
+
+        self._legacy_all.add(legacy)
+        return True
+
+    def add_signal(self, signal: Signal, timezone: Optional[tzinfo] = None) -> bool:
+        """Registra um objeto Signal (ver add)."""
+        return self.add(
+            signal_timestamp_key(signal, timezone),
+            signal.asset,
+            signal.result,
+            signal.chat_id,
+            signal.message_id
+        )
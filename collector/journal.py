@@ -0,0 +1,255 @@
+"""
+Journal de escrita antecipada (write-ahead) do modo live
+
+Todo sinal recebido ao vivo é acrescentado a `data/journal/<nome>.wal` (uma
+linha JSON por sinal) e só é confirmado ao handler depois do fsync. Os fsyncs
+são agrupados: sinais que chegam juntos compartilham um único fsync (group
+commit).
+
+Com o journal garantindo a durabilidade, o armazenamento principal pode usar
+gravações baratas (append bufferizado). Na inicialização, o conteúdo do
+journal é reaplicado ao armazenamento (operação idempotente) e o journal é
+truncado; no encerramento limpo, o journal é truncado depois que o
+armazenamento principal foi sincronizado.
+"""
+
+import os
+import json
+import asyncio
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional, Union
+
+from .parser import Signal
+from .catalog import DATA_ROOT
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_DIR = 'journal'
+JOURNAL_SUFFIX = '.wal'
+
+PathLike = Union[str, Path]
+
+
+def encode_entry(signal: Signal) -> str:
+    """Serializa um sinal como linha do journal."""
+    return json.dumps({
+        'timestamp': signal.timestamp.isoformat(),
+        'asset': signal.asset,
+        'result': signal.result,
+        'attempt': signal.attempt,
+        'chat_id': signal.chat_id,
+        'message_id': signal.message_id
+    }, ensure_ascii=False) + '\n'
+
+
+def decode_entry(line: str) -> Signal:
+    """Reconstrói um sinal a partir de uma linha do journal."""
+    data = json.loads(line)
+    return Signal(
+        timestamp=datetime.fromisoformat(data['timestamp']),
+        asset=data['asset'],
+        result=data['result'],
+        attempt=data['attempt'],
+        message_id=data.get('message_id'),
+        chat_id=data.get('chat_id')
+    )
+
+
+class SignalJournal:
+    """
+    Journal append-only com fsync em grupo.
+
+    `append` só retorna depois que a linha do sinal foi gravada e sincronizada
+    em disco. Sinais que chegam enquanto um fsync está em andamento entram no
+    próximo lote, até `batch_size` sinais ou `flush_interval_ms` de espera.
+    """
+
+    def __init__(
+        self,
+        name: str = "live",
+        root: PathLike = DATA_ROOT,
+        batch_size: int = 100,
+        flush_interval_ms: int = 20
+    ):
+        self.path = Path(root) / JOURNAL_DIR / f"{name}{JOURNAL_SUFFIX}"
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0, flush_interval_ms) / 1000
+
+        self._file = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Estatísticas
+        self.synced_batches = 0
+        self.synced_entries = 0
+
+    # ------------------------------------------------------------------
+    # Recuperação
+    # ------------------------------------------------------------------
+
+    def read_entries(self) -> List[Signal]:
+        """
+        Lê as entradas do journal.
+
+        Uma última linha incompleta (processo interrompido durante a escrita)
+        é ignorada: ela nunca chegou a ser confirmada.
+        """
+        if not self.path.exists():
+            return []
+
+        entries = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.endswith('\n'):
+                    logger.warning(f"Linha incompleta ignorada no journal ({self.path}:{line_number})")
+                    break
+                try:
+                    entries.append(decode_entry(line))
+                except (ValueError, KeyError) as e:
+                    logger.warning(f"Entrada inválida no journal ({self.path}:{line_number}): {e}")
+
+        return entries
+
+    def replay(self, apply_fn: Callable[[List[Signal]], object]) -> int:
+        """
+        Reaplica o journal no armazenamento principal e o trunca.
+
+        Args:
+            apply_fn: Grava as entradas no armazenamento (deve ser idempotente)
+
+        Returns:
+            Número de entradas reaplicadas
+        """
+        entries = self.read_entries()
+        if entries:
+            logger.info(f"♻️ Reaplicando {len(entries)} sinal(is) do journal {self.path}")
+            apply_fn(entries)
+
+        self.truncate()
+        return len(entries)
+
+    def truncate(self) -> None:
+        """Esvazia o journal (checkpoint)."""
+        if self._file is not None:
+            self._file.flush()
+            self._file.truncate(0)
+            self._file.seek(0)
+            os.fsync(self._file.fileno())
+        elif self.path.exists():
+            with open(self.path, 'w') as f:
+                os.fsync(f.fileno())
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Abre o journal e inicia a tarefa de fsync no event loop atual."""
+        if self._task is not None:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+        # Uma linha incompleta no final não pode se fundir com a próxima entrada
+        if self._file.tell() > 0:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self._file.write('\n')
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f"📝 Journal '{self.path}' aberto (lote={self.batch_size}, "
+                    f"espera={self.flush_interval * 1000:.0f}ms)")
+
+    async def append(self, signal: Signal) -> None:
+        """
+        Grava um sinal no journal e aguarda o fsync.
+
+        Args:
+            signal: Sinal recebido (com chat_id/message_id da mensagem)
+        """
+        if self._task is None:
+            self.start()
+
+        done = asyncio.get_running_loop().create_future()
+        await self._queue.put((encode_entry(signal), done))
+        await done
+
+    async def close(self, checkpoint: bool = False) -> None:
+        """
+        Encerra a tarefa de fsync e fecha o journal.
+
+        Args:
+            checkpoint: Truncar o journal (o armazenamento principal já foi
+                sincronizado e nada precisa ser reaplicado)
+        """
+        if self._task is not None:
+            await self._queue.put(None)
+            await self._task
+            self._task = None
+
+        if self._file is not None:
+            if checkpoint:
+                self.truncate()
+            self._file.close()
+            self._file = None
+
+        logger.info(f"📝 Journal encerrado: {self.synced_entries} sinais em {self.synced_batches} fsyncs"
+                    f"{' (checkpoint)' if checkpoint else ''}")
+
+    async def _run(self) -> None:
+        """Loop de group commit."""
+        stop = False
+
+        while not stop:
+            first = await self._queue.get()
+            if first is None:
+                break
+
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            await self._sync(batch)
+
+    async def _sync(self, batch: List[tuple]) -> None:
+        """Grava e sincroniza um lote, liberando quem aguarda."""
+        try:
+            await asyncio.to_thread(self._write_and_sync, [line for line, _ in batch])
+        except Exception as e:
+            logger.error(f"Erro ao gravar journal ({len(batch)} sinais): {e}")
+            for _, done in batch:
+                if not done.done():
+                    done.set_exception(e)
+            return
+
+        self.synced_batches += 1
+        self.synced_entries += len(batch)
+        for _, done in batch:
+            if not done.done():
+                done.set_result(None)
+
+    def _write_and_sync(self, lines: List[str]) -> None:
+        """Escreve as linhas e faz fsync (executado fora do event loop)."""
+        self._file.write(''.join(lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
@@ -6,20 +6,35 @@ Implementa o workflow completo de análise horária e seleção automática de e
 import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-from collections import deque
-import json
-import os
+from typing import List, Dict, Optional, Set
 from telethon import events
 
 from .config import Config
 from .runner import Runner
 from .parser import Signal
 from .storage import Storage
-from .adaptive_strategy import AdaptiveStrategy, StrategyType, MarketConditions
+from .async_storage import AsyncStorage
+from .loader import frame_to_signals
+from .adaptive_strategy import ASSET_PAUSE_LOSS_STREAK, AdaptiveStrategy, AssetConditions, StrategyType, MarketConditions
+from .market_window import DEFAULT_HORIZON
+from .analysis_log import AnalysisLog
+from .triggers import ASSET, PAUSE, Firing, Trigger, TriggerEngine
+from .scheduler import DeadlineScheduler, next_minute_of_hour, next_minute_multiple
+from .journal import SignalJournal
 
 logger = logging.getLogger(__name__)
 
+# Alerta de losses seguidos no mercado (também usado pelo daily_trading_system)
+LOSS_STREAK_ALERT = Trigger('losses_seguidos', 'loss_streak', '>=', 3, message='3 losses seguidos')
+
+# Gatilhos checados a cada sinal (ver collector/triggers.py)
+LIVE_TRIGGERS = [
+    Trigger('ativo_losses_seguidos', 'loss_streak', '>=', ASSET_PAUSE_LOSS_STREAK,
+            scope=ASSET, action=PAUSE, message='losses seguidos'),
+    LOSS_STREAK_ALERT,
+    Trigger('losses_ultimas_10', 'losses', '>=', 3, last=10, message='3+ losses nas últimas 10 operações'),
+]
+
 
 class LiveTrader:
     """Sistema de trading adaptativo em tempo real."""
@@ -30,18 +45,31 @@ class LiveTrader:
         self.storage = Storage(config)
         self.adaptive_strategy = AdaptiveStrategy(config)
         
-        # Buffer de sinais (última 1 hora para análise)
-        self.signal_buffer: deque = deque(maxlen=200)  # ~200 sinais = 2h de dados
+        # Journal write-ahead dos sinais recebidos
+        self.journal: Optional[SignalJournal] = None
+        if config.journal_enabled:
+            self.journal = SignalJournal("trader", flush_interval_ms=config.journal_flush_interval_ms)
+        
+        # Gravação dos sinais fora do handler (append barato quando há journal)
+        self.async_storage = AsyncStorage(self.storage, config, 'csv', append_csv=self.journal is not None)
         
         # Controle de horários
         self.analysis_interval = 60  # Análise a cada 60 minutos
         self.last_analysis_time: Optional[datetime] = None
+        self.scheduler = DeadlineScheduler(config.timezone)
+        
+        # Histórico das análises (data/analysis/analysis_YYYY-MM-DD.bin)
+        self.analysis_log = AnalysisLog(timezone=config.timezone)
         
         # Estado do sistema
         self.is_running = False
         self.trading_active = False
         self.current_session_signals: List[Signal] = []
         
+        # Ativos pausados individualmente (sequência de losses ou condições do ativo)
+        self.paused_assets: Set[str] = set()
+        self.triggers = TriggerEngine(LIVE_TRIGGERS)
+        
         # Estatísticas da sessão
         self.session_stats = {
             'start_time': None,
@@ -68,10 +96,15 @@ class LiveTrader:
             logger.info("Aguardando horário de início...")
             await self._wait_for_trading_hours()
         
+        # Reaplicar sinais de uma execução interrompida (antes do warm-up)
+        if self.journal is not None:
+            self.journal.replay(lambda signals: self.storage.recover_signals(signals, 'csv'))
+        
         # Inicializar sessão
         self._initialize_session()
         
-        # Configurar listeners
+        # Configurar gravação e listeners
+        self.async_storage.start()
         await self._setup_signal_listener()
         
         # Iniciar loop principal
@@ -90,10 +123,45 @@ class LiveTrader:
         self.is_running = True
         self.trading_active = True
         self.current_session_signals = []
+        self.paused_assets = set()
+        self.triggers.reset()
+        
+        # Horizontes da sessão começam vazios; retomar sinais já recebidos hoje
+        self.adaptive_strategy.market_window.clear()
+        self._warm_up_from_storage(self.session_stats['start_time'])
         
         logger.info("✅ Sessão de trading inicializada")
         self._print_session_header()
     
+    def _warm_up_from_storage(self, now: datetime) -> None:
+        """
+        Recarrega os sinais do dia já gravados dentro do horário de operação.
+        
+        Args:
+            now: Momento atual (timezone local)
+        """
+        session_start = now.replace(hour=self.config.start_hour, minute=0, second=0, microsecond=0)
+        frame = self.storage.query(session_start, now)
+        signals = [
+            signal for signal in frame_to_signals(frame, self.config.timezone)
+            if self._is_valid_signal_time(signal.timestamp)
+        ]
+        
+        if not signals:
+            return
+        
+        for signal in signals:
+            self.adaptive_strategy.observe(signal)
+            self.triggers.observe(signal)
+        self.current_session_signals.extend(signals)
+        
+        # Pausas que ainda valem no fim dos sinais recarregados
+        self._apply_triggers([firing for firing in self.triggers.active() if firing.trigger.action == PAUSE])
+        self.session_stats['total_signals'] = len(signals)
+        
+        logger.info(f"♻️ {len(signals)} sinais de hoje recarregados do armazenamento "
+                    f"(último: {signals[-1].timestamp.strftime('%H:%M:%S')})")
+    
     def _print_session_header(self) -> None:
         """Imprime cabeçalho da sessão."""
         now = datetime.now(self.config.timezone)
@@ -130,20 +198,43 @@ class LiveTrader:
         Args:
             signal: Novo sinal recebido
         """
-        # Adicionar ao buffer
-        self.signal_buffer.append(signal)
+        # Durável no journal antes de qualquer outra coisa
+        if self.journal is not None:
+            await self.journal.append(signal)
+        
+        # Adicionar à janela de análise (contadores incrementais)
+        self.adaptive_strategy.observe(signal)
         self.current_session_signals.append(signal)
         self.session_stats['total_signals'] += 1
         
+        # Gatilhos (pausa do ativo assim que a sequência de losses atingir o limite)
+        self._apply_triggers(self.triggers.observe(signal))
+        
         # Log do sinal
         self._log_new_signal(signal)
         
-        # Salvar sinal
-        self.storage.save_signals([signal], 'csv')
+        # Salvar sinal (apenas enfileira; gravação em lote fora do event loop)
+        await self.async_storage.save(signal)
         
-        # Verificar se precisa fazer análise
-        if self._should_analyze_now():
-            await self._perform_analysis()
+        # Gatilhos por contagem (análise aguardando sinais) rodam no agendador
+        self.scheduler.signal_received()
+    
+    def _apply_triggers(self, firings: List[Firing]) -> None:
+        """
+        Aplica os gatilhos que passaram a valer.
+        
+        Args:
+            firings: Gatilhos disparados (pausa do ativo ou alerta)
+        """
+        for firing in firings:
+            trigger = firing.trigger
+            if trigger.action == PAUSE and firing.asset is not None:
+                if firing.asset not in self.paused_assets:
+                    self.paused_assets.add(firing.asset)
+                    logger.warning(f"⏸️ {firing.asset} pausado: {trigger.describe()} ({firing.value:g})")
+            else:
+                where = f"{firing.asset}: " if firing.asset else ""
+                logger.warning(f"🚨 Alerta: {where}{trigger.describe()} ({firing.value:g})")
     
     def _log_new_signal(self, signal: Signal) -> None:
         """
@@ -164,6 +255,8 @@ class LiveTrader:
         print(f"   📈 Resultado: {'✅ WIN' if signal.result == 'W' else '❌ LOSS'}")
         print(f"   🎲 Tentativa: {attempt_str}")
         print(f"   📊 Total da sessão: {self.session_stats['total_signals']}")
+        if self.is_asset_paused(signal.asset):
+            print(f"   ⏸️ Ativo pausado")
         
         # Status da estratégia atual
         strategy_info = self.adaptive_strategy.get_current_strategy_info()
@@ -172,62 +265,95 @@ class LiveTrader:
         
         print("-" * 50)
     
-    def _should_analyze_now(self) -> bool:
+    @property
+    def asset_conditions(self) -> Dict[str, AssetConditions]:
+        """Condições por ativo da última análise."""
+        return self.adaptive_strategy.asset_conditions
+    
+    def is_asset_paused(self, asset: str) -> bool:
         """
-        Verifica se deve realizar análise agora.
-        Nova lógica: Análise apenas no final de cada hora (XX:59)
-        para ter dados completos da hora inteira.
+        Verifica se o ativo está pausado individualmente.
         
+        Args:
+            asset: Nome do ativo
+            
         Returns:
-            True se deve analisar
+            True se não deve operar o ativo
         """
-        now = datetime.now(self.config.timezone)
+        return asset in self.paused_assets
+    
+    def _analyzed_this_hour(self, now: datetime) -> bool:
+        """
+        Verifica se a análise desta hora já foi feita.
         
-        # Verificar se está no minuto 59 da hora (final da hora)
-        if now.minute != 59:
-            return False
-        
-        # Verificar se já analisou nesta hora
-        if self.last_analysis_time is not None:
-            # Se já analisou na mesma hora, não analisar novamente
-            if (self.last_analysis_time.hour == now.hour and 
-                self.last_analysis_time.day == now.day):
-                return False
-        
-        # Verificar se há sinais suficientes na última hora
-        one_hour_ago = now - timedelta(hours=1)
-        recent_signals = [
-            signal for signal in self.signal_buffer 
-            if signal.timestamp >= one_hour_ago
-        ]
+        Args:
+            now: Momento atual
+            
+        Returns:
+            True se já analisou na mesma hora
+        """
+        return (self.last_analysis_time is not None and
+                self.last_analysis_time.hour == now.hour and
+                self.last_analysis_time.day == now.day)
+    
+    async def _scheduled_analysis(self, now: datetime) -> None:
+        """
+        Análise no final de cada hora (XX:59), com os dados da hora inteira.
+        
+        Sem sinais suficientes, arma um gatilho por contagem que refaz a
+        verificação quando os sinais que faltam chegarem (até o fim da hora).
+        
+        Args:
+            now: Momento em que a tarefa disparou
+        """
+        if now.minute != 59 or self._analyzed_this_hour(now):
+            return
+        
+        recent_count = self._recent_signal_count(now)
         
         # Só analisar se há pelo menos 5 sinais na última hora
-        if len(recent_signals) < 5:
-            logger.warning(f"⚠️ Apenas {len(recent_signals)} sinais na última hora. Aguardando mais dados...")
-            return False
+        if recent_count < 5:
+            logger.warning(f"⚠️ Apenas {recent_count} sinais na última hora. Aguardando mais dados...")
+            end_of_hour = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+            self.scheduler.after_signals(5 - recent_count, self._scheduled_analysis,
+                                         "análise horária (aguardando sinais)", expires=end_of_hour)
+            return
         
-        logger.info(f"🎯 Hora {now.hour}:59 - Iniciando análise com {len(recent_signals)} sinais da última hora")
-        return True
+        logger.info(f"🎯 Hora {now.hour}:59 - Iniciando análise com {recent_count} sinais da última hora")
+        await self._perform_analysis()
+    
+    def _recent_signal_count(self, now: datetime) -> int:
+        """
+        Sinais da última hora (janela da estratégia, expirada até `now`).
+        
+        Args:
+            now: Momento atual
+            
+        Returns:
+            Quantidade de sinais na janela
+        """
+        window = self.adaptive_strategy.market_window
+        window.expire(now)
+        return window.count(DEFAULT_HORIZON)
     
     async def _perform_analysis(self) -> None:
         """Realiza análise das condições do mercado e atualiza estratégia."""
         logger.info("🔍 Iniciando análise das condições do mercado...")
         
-        # Pegar sinais da última hora para análise
+        # Janela da última hora (contadores já atualizados a cada sinal)
         now = datetime.now(self.config.timezone)
-        one_hour_ago = now - timedelta(hours=1)
-        
-        recent_signals = [
-            signal for signal in self.signal_buffer 
-            if signal.timestamp >= one_hour_ago
-        ]
         
-        if len(recent_signals) < 5:
+        if self._recent_signal_count(now) < 5:
             logger.warning("⚠️ Poucos sinais para análise confiável. Aguardando mais dados...")
             return
         
-        # Analisar condições
-        conditions = self.adaptive_strategy.analyze_market_conditions(recent_signals)
+        # Analisar condições de todos os horizontes; a decisão usa a última hora
+        horizons = self.adaptive_strategy.conditions_by_horizon(now)
+        conditions = horizons[DEFAULT_HORIZON]
+        
+        # Condições por ativo da mesma janela (contadores já separados por ativo)
+        assets = self.adaptive_strategy.current_asset_conditions()
+        self._update_paused_assets(self.adaptive_strategy.paused_assets())
         
         # Atualizar estratégia
         strategy_changed = self.adaptive_strategy.update_strategy(conditions)
@@ -241,18 +367,40 @@ class LiveTrader:
         self.session_stats['current_strategy'] = conditions.recommended_strategy.value
         
         # Log da análise
-        self._log_analysis_results(conditions, strategy_changed)
+        self._log_analysis_results(conditions, strategy_changed, horizons, assets)
         
         # Salvar análise
-        await self._save_analysis_results(conditions)
+        await self._save_analysis_results(conditions, horizons, assets)
+    
+    def _update_paused_assets(self, paused: List[str]) -> None:
+        """
+        Substitui o conjunto de ativos pausados, registrando entradas e saídas.
+        
+        Ativos com gatilho de pausa ainda ativo (ex.: sequência de losses que
+        já saiu da janela da análise) continuam pausados.
+        
+        Args:
+            paused: Ativos pausados pela análise
+        """
+        paused = set(paused)
+        paused |= {firing.asset for firing in self.triggers.active() if firing.trigger.action == PAUSE}
+        for asset in sorted(paused - self.paused_assets):
+            logger.warning(f"⏸️ {asset} pausado pela análise")
+        for asset in sorted(self.paused_assets - paused):
+            logger.info(f"▶️ {asset} liberado pela análise")
+        self.paused_assets = paused
     
-    def _log_analysis_results(self, conditions: MarketConditions, strategy_changed: bool) -> None:
+    def _log_analysis_results(self, conditions: MarketConditions, strategy_changed: bool,
+                              horizons: Optional[Dict[str, MarketConditions]] = None,
+                              assets: Optional[Dict[str, AssetConditions]] = None) -> None:
         """
         Registra resultados da análise.
         
         Args:
             conditions: Condições analisadas
             strategy_changed: Se houve mudança de estratégia
+            horizons: Condições por horizonte (15/30/60/120 min e sessão)
+            assets: Condições por ativo
         """
         print("\n" + "🔍" + "=" * 78)
         print("📊 ANÁLISE DE MERCADO CONCLUÍDA")
@@ -260,6 +408,19 @@ class LiveTrader:
         print(f"⏰ Horário: {datetime.now(self.config.timezone).strftime('%H:%M:%S')}")
         print(f"📈 {conditions}")
         
+        if horizons:
+            print("🕒 Horizontes:")
+            for name, horizon_conditions in horizons.items():
+                print(f"   {name:>7}: {horizon_conditions.total_operations:3d} ops | "
+                      f"WR {horizon_conditions.win_rate:5.1f}% | "
+                      f"G2+STOP {horizon_conditions.g2_plus_stop_rate:5.1f}% | "
+                      f"{horizon_conditions.recommended_strategy.value.upper()}")
+        
+        if assets:
+            print("💰 Ativos:")
+            for asset_conditions in sorted(assets.values(), key=lambda c: -c.total_operations):
+                print(f"   {asset_conditions}")
+        
         if strategy_changed:
             print("🔄 MUDANÇA DE ESTRATÉGIA DETECTADA!")
             strategy_info = self.adaptive_strategy.get_current_strategy_info()
@@ -273,62 +434,45 @@ class LiveTrader:
         print("=" * 80)
         print()
     
-    async def _save_analysis_results(self, conditions: MarketConditions) -> None:
+    async def _save_analysis_results(self, conditions: MarketConditions,
+                                     horizons: Optional[Dict[str, MarketConditions]] = None,
+                                     assets: Optional[Dict[str, AssetConditions]] = None) -> None:
         """
-        Salva resultados da análise em arquivo.
+        Salva resultados da análise no histórico de análises.
         
         Args:
             conditions: Condições analisadas
+            horizons: Condições por horizonte
+            assets: Condições por ativo
         """
-        analysis_data = {
-            'timestamp': datetime.now(self.config.timezone).isoformat(),
-            'conditions': {
-                'total_operations': conditions.total_operations,
-                'first_attempt_success_rate': conditions.first_attempt_success_rate,
-                'g1_recovery_rate': conditions.g1_recovery_rate,
-                'g2_plus_stop_rate': conditions.g2_plus_stop_rate,
-                'recommended_strategy': conditions.recommended_strategy.value,
-                'confidence_level': conditions.confidence_level,
-                'analysis_period': conditions.analysis_period
-            },
-            'session_stats': self.session_stats.copy()
-        }
-        
-        # Salvar em arquivo JSON
-        analysis_file = f"data/analysis_{datetime.now().strftime('%Y-%m-%d')}.jsonl"
-        os.makedirs("data", exist_ok=True)
+        horizons = horizons or {DEFAULT_HORIZON: conditions}
+        now = datetime.now(self.config.timezone)
         
-        with open(analysis_file, 'a') as f:
-            f.write(json.dumps(analysis_data) + '\n')
+        # Gravar fora do event loop (arquivo do dia fica aberto durante a sessão)
+        await self.async_storage.run(self.analysis_log.append, now, horizons, assets)
     
     async def _main_trading_loop(self) -> None:
-        """Loop principal do sistema de trading."""
+        """
+        Loop principal do sistema de trading.
+        
+        Em vez de verificar o relógio a cada 30 segundos, as tarefas ficam
+        agendadas no horário exato (análise às XX:59, status a cada 10 minutos,
+        aviso às XX:58 e fim da sessão) e o loop dorme até o próximo prazo.
+        """
         logger.info("🔄 Iniciando loop principal de trading")
         
+        now = self.scheduler.now()
+        session_end = now.replace(hour=self.config.end_hour, minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        
+        self.scheduler.at(session_end, self._on_session_end, "fim da sessão", priority=0)
+        self.scheduler.every(lambda t: next_minute_of_hour(t, 59), self._scheduled_analysis, "análise horária")
+        self.scheduler.every(lambda t: next_minute_of_hour(t, 58),
+                             lambda t: self._print_pre_analysis_status(), "aviso pré-análise")
+        self.scheduler.every(lambda t: next_minute_multiple(t, 10),
+                             lambda t: self._print_status_update(), "status", priority=2)
+        
         try:
-            while self.is_running:
-                now = datetime.now(self.config.timezone)
-                
-                # Verificar se ainda está no horário de operação
-                if not self._is_trading_hours(now):
-                    logger.info("⏰ Fim do horário de operação")
-                    await self._end_trading_session()
-                    break
-                
-                # Verificar se precisa fazer análise periódica
-                if self._should_analyze_now():
-                    await self._perform_analysis()
-                
-                # Status periódico (a cada 10 minutos)
-                if now.minute % 10 == 0 and now.second < 30:
-                    self._print_status_update()
-                
-                # Aviso especial quando estiver próximo da análise (XX:58)
-                if now.minute == 58 and now.second < 30:
-                    self._print_pre_analysis_status()
-                
-                # Aguardar antes da próxima verificação
-                await asyncio.sleep(30)  # Verificar a cada 30 segundos
+            await self.scheduler.run()
                 
         except KeyboardInterrupt:
             logger.info("🛑 Sistema interrompido pelo usuário")
@@ -338,6 +482,12 @@ class LiveTrader:
             logger.error(f"❌ Erro no loop principal: {e}")
             await self._end_trading_session()
     
+    async def _on_session_end(self, now: datetime) -> None:
+        """Tarefa agendada para o fim do horário de operação."""
+        logger.info("⏰ Fim do horário de operação")
+        self.scheduler.stop()
+        await self._end_trading_session()
+    
     def _print_status_update(self) -> None:
         """Imprime atualização de status."""
         now = datetime.now(self.config.timezone)
@@ -351,28 +501,26 @@ class LiveTrader:
         print(f"   🔄 Mudanças de estratégia: {self.session_stats['strategy_changes']}")
         print(f"   📈 Análises realizadas: {self.session_stats['analysis_count']}")
         print(f"   🎯 Estratégia atual: {strategy_info['status']}")
+        if self.paused_assets:
+            print(f"   ⏸️ Ativos pausados: {', '.join(sorted(self.paused_assets))}")
         print("-" * 50)
     
     def _print_pre_analysis_status(self) -> None:
         """Imprime status antes da análise horária."""
         now = datetime.now(self.config.timezone)
-        one_hour_ago = now - timedelta(hours=1)
         
         # Contar sinais da última hora
-        recent_signals = [
-            signal for signal in self.signal_buffer 
-            if signal.timestamp >= one_hour_ago
-        ]
+        recent_count = self._recent_signal_count(now)
         
         print(f"\n🔔 {now.strftime('%H:%M:%S')} - PREPARANDO ANÁLISE HORÁRIA")
         print(f"   ⏰ Próxima análise: {now.hour}:59")
-        print(f"   📊 Sinais na última hora: {len(recent_signals)}")
+        print(f"   📊 Sinais na última hora: {recent_count}")
         print(f"   🎯 Mínimo necessário: 5 sinais")
         
-        if len(recent_signals) >= 5:
+        if recent_count >= 5:
             print(f"   ✅ Dados suficientes para análise!")
         else:
-            print(f"   ⚠️ Aguardando mais {5 - len(recent_signals)} sinais...")
+            print(f"   ⚠️ Aguardando mais {5 - recent_count} sinais...")
         
         print("-" * 50)
     
@@ -383,6 +531,13 @@ class LiveTrader:
         self.is_running = False
         self.trading_active = False
         
+        # Descarregar gravações pendentes e fazer checkpoint do journal
+        await self.async_storage.close()
+        logger.info(f"📦 Gravação: {self.async_storage.stats()}")
+        if self.journal is not None:
+            await self.journal.close(checkpoint=self.async_storage.failed_signals == 0)
+        self.analysis_log.close()
+        
         # Relatório final
         await self._generate_session_report()
         
@@ -469,8 +624,8 @@ class LiveTrader:
             wait_time = (next_start - now).total_seconds()
             logger.info(f"⏳ Aguardando {wait_time/3600:.1f}h até {next_start.strftime('%H:%M')}")
             
-            # Aguardar 1 minuto antes de verificar novamente
-            await asyncio.sleep(60)
+            # Dormir até o horário de início (o laço cobre acordar adiantado)
+            await asyncio.sleep(max(wait_time, 1))
 
 
 # Função de conveniência para iniciar o sistema
@@ -0,0 +1,266 @@
+"""
+Carregador vetorizado e tipado de arquivos de sinais
+
+Centraliza a leitura dos CSVs de sinais (data/, data/trading ops/ e
+docs/study/study_data/) com tipos explícitos e colunas derivadas calculadas
+de forma vetorizada, sem iterrows/apply.
+"""
+
+from dataclasses import dataclass
+from datetime import tzinfo
+from pathlib import Path
+from typing import IO, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .parser import Signal
+from .compression import existing_path
+
+# Colunas persistidas em disco
+SIGNAL_COLUMNS = ['timestamp', 'asset', 'result', 'attempt']
+
+# Identidade da mensagem de origem (opcionais; ausentes em arquivos antigos)
+ID_COLUMNS = ['chat_id', 'message_id']
+
+# Formato fixo dos timestamps (sufixo de offset, se houver, é descartado)
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Sentinela para "sem tentativa" (STOP) na coluna int8 de attempt
+ATTEMPT_NULL = 0
+
+# Códigos de resultado no formato colunar
+RESULT_LOSS = 0
+RESULT_WIN = 1
+
+# Extensão dos arquivos do log binário (ver collector/binlog.py)
+BINLOG_SUFFIX = '.bin'
+
+PathLike = Union[str, Path]
+
+
+@dataclass
+class SignalBatch:
+    """Lote colunar de sinais (arrays NumPy paralelos)."""
+    epoch: np.ndarray        # int64, segundos desde 1970-01-01 UTC
+    asset_code: np.ndarray   # int16, índice em `assets`
+    result: np.ndarray       # int8, RESULT_WIN / RESULT_LOSS
+    attempt: np.ndarray      # int8, 1-3 ou ATTEMPT_NULL
+    assets: List[str]        # tabela de ativos
+    message_id: Optional[np.ndarray] = None  # int64, 0 se desconhecido
+
+    def __len__(self) -> int:
+        return len(self.epoch)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, timezone: Optional[tzinfo] = None) -> 'SignalBatch':
+        """
+        Converte um DataFrame do loader em lote colunar.
+
+        Args:
+            df: DataFrame retornado por load_signals_frame
+            timezone: Timezone dos timestamps sem fuso (obrigatório nesse caso)
+
+        Returns:
+            Lote colunar
+        """
+        timestamps = df['timestamp']
+        if timestamps.dt.tz is None:
+            if timezone is None:
+                raise ValueError("timezone é obrigatório para timestamps sem fuso")
+            timestamps = timestamps.dt.tz_localize(timezone)
+
+        assets = df['asset'].astype('category')
+
+        return cls(
+            epoch=timestamps.dt.tz_convert('UTC').dt.tz_localize(None).to_numpy('datetime64[s]').astype(np.int64),
+            asset_code=assets.cat.codes.to_numpy(np.int16),
+            result=np.where(df['result'].to_numpy() == 'W', RESULT_WIN, RESULT_LOSS).astype(np.int8),
+            attempt=df['attempt'].to_numpy(np.int8),
+            assets=[str(a) for a in assets.cat.categories],
+            message_id=df['message_id'].fillna(0).to_numpy(np.int64)
+        )
+
+
+def _as_path_list(paths: Union[PathLike, Iterable[PathLike]]) -> List[PathLike]:
+    """Normaliza um caminho ou uma coleção de caminhos em lista."""
+    if isinstance(paths, (str, Path)):
+        return [paths]
+    return list(paths)
+
+
+def _read_signal_file(path: PathLike) -> pd.DataFrame:
+    """Lê um arquivo de sinais com tipos explícitos (CSV ou log binário .bin)."""
+    if str(path).endswith(BINLOG_SUFFIX):
+        from .binlog import read_binlog_frame
+        return _with_id_columns(read_binlog_frame(path))
+
+    return read_signal_csv(path)
+
+
+def read_signal_csv(source: Union[PathLike, IO]) -> pd.DataFrame:
+    """
+    Lê um CSV de sinais (caminho ou buffer) nas colunas básicas tipadas.
+
+    Sem as colunas derivadas; use combine_signal_frames para obtê-las.
+    """
+    df = pd.read_csv(
+        source,
+        usecols=lambda column: column in SIGNAL_COLUMNS or column in ID_COLUMNS,
+        dtype={'timestamp': str, 'asset': str, 'result': str, 'attempt': 'float32',
+               'chat_id': 'Int64', 'message_id': 'Int64'}
+    )
+
+    # Timestamps gravados com offset (ex.: "-03:00") já estão em horário local
+    df['timestamp'] = pd.to_datetime(df['timestamp'].str.slice(0, 19), format=TIMESTAMP_FORMAT)
+    df['attempt'] = df['attempt'].fillna(ATTEMPT_NULL).astype(np.int8)
+    return _with_id_columns(df)
+
+
+def _with_id_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Garante as colunas de id (Int64 anulável) na ordem padrão."""
+    for column in ID_COLUMNS:
+        if column not in df:
+            df[column] = pd.Series(pd.NA, index=df.index, dtype='Int64')
+        else:
+            df[column] = df[column].astype('Int64')
+    return df[SIGNAL_COLUMNS + ID_COLUMNS]
+
+
+def load_signals_frame(
+    paths: Union[PathLike, Iterable[PathLike]],
+    timezone: Optional[tzinfo] = None
+) -> pd.DataFrame:
+    """
+    Carrega um ou mais arquivos de sinais em um DataFrame tipado.
+
+    Aceita CSVs (puros ou compactados) e arquivos do log binário (.bin),
+    inclusive misturados.
+
+    Colunas: timestamp (datetime64), asset e result (category), attempt
+    (int8, ATTEMPT_NULL para STOP), chat_id e message_id (Int64, nulos em
+    arquivos antigos) e as derivadas date, hour (int8) e is_win (1ª
+    tentativa ou G1).
+
+    Args:
+        paths: Caminho ou lista de caminhos
+        timezone: Se informado, localiza os timestamps neste timezone
+
+    Returns:
+        DataFrame tipado (vazio se nenhum arquivo existir)
+    """
+    # Dias antigos podem ter sido compactados (.csv.zst/.csv.gz) pela retenção
+    found = (existing_path(p) for p in _as_path_list(paths))
+    return combine_signal_frames([_read_signal_file(p) for p in found if p is not None], timezone)
+
+
+def combine_signal_frames(frames: List[pd.DataFrame], timezone: Optional[tzinfo] = None) -> pd.DataFrame:
+    """
+    Junta frames com as colunas básicas e calcula os tipos e colunas derivadas.
+
+    Args:
+        frames: Frames lidos (read_signal_csv, BinaryLog.to_frame...)
+        timezone: Se informado, localiza os timestamps neste timezone
+
+    Returns:
+        DataFrame no formato de load_signals_frame
+    """
+    frames = [_with_id_columns(frame) for frame in frames]
+
+    if frames:
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    else:
+        df = _with_id_columns(pd.DataFrame({
+            'timestamp': pd.Series(dtype='datetime64[ns]'),
+            'asset': pd.Series(dtype=str),
+            'result': pd.Series(dtype=str),
+            'attempt': pd.Series(dtype=np.int8)
+        }))
+
+    if timezone is not None:
+        df['timestamp'] = df['timestamp'].dt.tz_localize(timezone)
+
+    df['asset'] = df['asset'].astype('category')
+    df['result'] = df['result'].astype('category')
+
+    # Colunas derivadas
+    df['date'] = df['timestamp'].dt.date
+    df['hour'] = df['timestamp'].dt.hour.astype(np.int8)
+    df['is_win'] = (df['result'] == 'W').to_numpy() & df['attempt'].isin((1, 2)).to_numpy()
+
+    return df
+
+
+def load_signals_batch(
+    paths: Union[PathLike, Iterable[PathLike]],
+    timezone: tzinfo
+) -> SignalBatch:
+    """
+    Carrega arquivos de sinais direto em formato colunar.
+
+    Args:
+        paths: Caminho ou lista de caminhos
+        timezone: Timezone local dos timestamps gravados
+
+    Returns:
+        Lote colunar
+    """
+    return SignalBatch.from_frame(load_signals_frame(paths), timezone)
+
+
+def frame_to_signals(df: pd.DataFrame, timezone: Optional[tzinfo] = None) -> List[Signal]:
+    """
+    Converte um DataFrame do loader em objetos Signal.
+
+    Args:
+        df: DataFrame retornado por load_signals_frame
+        timezone: Timezone para localizar timestamps sem fuso
+
+    Returns:
+        Lista de sinais
+    """
+    timestamps = df['timestamp']
+    if timezone is not None and timestamps.dt.tz is None:
+        timestamps = timestamps.dt.tz_localize(timezone)
+
+    attempts = df['attempt'].to_numpy()
+    chat_ids = df['chat_id'].astype(object).where(df['chat_id'].notna(), None) if 'chat_id' in df else [None] * len(df)
+    message_ids = df['message_id'].astype(object).where(df['message_id'].notna(), None) if 'message_id' in df else [None] * len(df)
+
+    return [
+        Signal(
+            timestamp=timestamp,
+            asset=asset,
+            result=result,
+            attempt=int(attempt) if attempt != ATTEMPT_NULL else None,
+            message_id=message_id,
+            chat_id=chat_id
+        )
+        for timestamp, asset, result, attempt, chat_id, message_id in zip(
+            timestamps.dt.to_pydatetime(), df['asset'].astype(str), df['result'].astype(str), attempts,
+            chat_ids, message_ids
+        )
+    ]
+
+
+def to_storage_frame(df: pd.DataFrame, with_ids: Optional[bool] = None) -> pd.DataFrame:
+    """
+    Converte um DataFrame do loader de volta ao formato gravado em disco.
+
+    Args:
+        df: DataFrame retornado por load_signals_frame
+        with_ids: Incluir chat_id/message_id (None: só se houver algum id)
+
+    Returns:
+        DataFrame com timestamp em texto e attempt anulável
+    """
+    if with_ids is None:
+        with_ids = 'message_id' in df and bool(df['message_id'].notna().any())
+
+    columns = SIGNAL_COLUMNS + ID_COLUMNS if with_ids else SIGNAL_COLUMNS
+    out = _with_id_columns(df.copy())[columns] if with_ids else df[SIGNAL_COLUMNS].copy()
+    out['timestamp'] = out['timestamp'].dt.strftime(TIMESTAMP_FORMAT)
+    out['asset'] = out['asset'].astype(str)
+    out['result'] = out['result'].astype(str)
+    out['attempt'] = out['attempt'].astype('Int8').mask(out['attempt'] == ATTEMPT_NULL)
+    return out
@@ -0,0 +1,341 @@
+"""
+Janela deslizante de sinais com contadores incrementais
+
+`AdaptiveStrategy` lê as condições de mercado de vários horizontes (15, 30,
+60 e 120 minutos e a sessão até agora). Em vez de reagrupar e reescanear os
+sinais de cada horizonte, a `MarketWindow` mantém um único fluxo de sinais
+e, por horizonte, os contadores (1ª tentativa, G1, G2, STOP e total) e o
+início da janela: cada sinal é somado a todos os horizontes ao chegar e
+subtraído de cada um ao sair dele, então a leitura das condições é O(1).
+
+Cada sinal W/L é uma operação (mesma regra de
+collector.operations.group_operations): W conta pela tentativa (sem
+tentativa = 1ª) e L conta como STOP.
+
+Os sinais em si ficam num `SignalWindow` (arrays de epoch, ativo e
+desfecho), que descarta por idade o que saiu do maior horizonte.
+
+Os mesmos passos mantêm, por horizonte, os contadores de cada ativo, e por
+ativo a sequência atual de wins/losses (`streak`), sem varredura extra.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .parser import Signal
+from .signal_window import (OUTCOME_FIRST, OUTCOME_G1, OUTCOME_G2, OUTCOME_NONE, OUTCOME_STOP, OUTCOMES,
+                            SignalWindow, WindowView, outcome_code, to_epoch_us)
+
+# Até quantos sinais expirados por horizonte a varredura é escalar (senão, busca binária)
+_SCALAR_EXPIRE = 8
+
+# Horizontes padrão; None = sessão inteira (sem expiração)
+SESSION = 'session'
+DEFAULT_HORIZON = '60min'
+HORIZONS: Dict[str, Optional[timedelta]] = {
+    '15min': timedelta(minutes=15),
+    '30min': timedelta(minutes=30),
+    '60min': timedelta(minutes=60),
+    '120min': timedelta(minutes=120),
+    SESSION: None,
+}
+
+
+@dataclass
+class SignalCounts:
+    """Contadores de operações por desfecho."""
+    total: int = 0
+    first_attempt: int = 0
+    g1: int = 0
+    g2: int = 0
+    stops: int = 0
+
+    def add(self, signal: Signal, sign: int = 1) -> None:
+        """Soma (sign=1) ou subtrai (sign=-1) um sinal dos contadores."""
+        self.add_outcome(outcome_code(signal), sign)
+
+    def add_outcome(self, outcome: int, sign: int = 1) -> None:
+        """Soma ou subtrai um código de desfecho (ver signal_window)."""
+        if outcome == OUTCOME_FIRST:
+            self.first_attempt += sign
+        elif outcome == OUTCOME_G1:
+            self.g1 += sign
+        elif outcome == OUTCOME_G2:
+            self.g2 += sign
+        elif outcome == OUTCOME_STOP:
+            self.stops += sign
+        elif outcome == OUTCOME_NONE:
+            return
+        self.total += sign
+
+    def add_outcomes(self, outcomes: np.ndarray, sign: int = 1) -> None:
+        """Soma ou subtrai um array de códigos de desfecho (ver signal_window)."""
+        if not len(outcomes):
+            return
+        tally = np.bincount(outcomes, minlength=OUTCOMES)
+        self.first_attempt += sign * int(tally[OUTCOME_FIRST])
+        self.g1 += sign * int(tally[OUTCOME_G1])
+        self.g2 += sign * int(tally[OUTCOME_G2])
+        self.stops += sign * int(tally[OUTCOME_STOP])
+        self.total += sign * int(tally[:OUTCOME_NONE].sum())
+
+    @classmethod
+    def from_signals(cls, signals: Iterable[Signal]) -> 'SignalCounts':
+        """Contadores de uma lista de sinais (uma passada)."""
+        counts = cls()
+        for signal in signals:
+            counts.add(signal)
+        return counts
+
+
+def next_streak(streak: int, outcome: int) -> int:
+    """
+    Sequência após um desfecho: positiva = wins seguidos (1ª tentativa ou G1),
+    negativa = losses seguidos (G2 ou STOP).
+    """
+    if outcome == OUTCOME_FIRST or outcome == OUTCOME_G1:
+        return streak + 1 if streak > 0 else 1
+    if outcome == OUTCOME_G2 or outcome == OUTCOME_STOP:
+        return streak - 1 if streak < 0 else -1
+    return streak
+
+
+@dataclass
+class SignalTally:
+    """Contadores gerais e por ativo, sequências e período de uma lista de sinais."""
+    counts: SignalCounts
+    by_asset: Dict[str, SignalCounts]
+    streaks: Dict[str, int]
+    first_timestamp: Optional[datetime] = None
+    last_timestamp: Optional[datetime] = None
+
+    @classmethod
+    def from_signals(cls, signals: Iterable[Signal]) -> 'SignalTally':
+        """
+        Tudo em uma passada. As sequências seguem a ordem dos timestamps de
+        cada ativo; um sinal mais antigo que o último do ativo não as altera.
+        """
+        tally = cls(SignalCounts(), {}, {})
+        last_seen: Dict[str, datetime] = {}
+
+        for signal in signals:
+            outcome = outcome_code(signal)
+            tally.counts.add_outcome(outcome)
+
+            asset_counts = tally.by_asset.get(signal.asset)
+            if asset_counts is None:
+                asset_counts = tally.by_asset[signal.asset] = SignalCounts()
+                tally.streaks[signal.asset] = 0
+            asset_counts.add_outcome(outcome)
+
+            previous = last_seen.get(signal.asset)
+            if previous is None or signal.timestamp >= previous:
+                last_seen[signal.asset] = signal.timestamp
+                tally.streaks[signal.asset] = next_streak(tally.streaks[signal.asset], outcome)
+
+            if tally.first_timestamp is None or signal.timestamp < tally.first_timestamp:
+                tally.first_timestamp = signal.timestamp
+            if tally.last_timestamp is None or signal.timestamp > tally.last_timestamp:
+                tally.last_timestamp = signal.timestamp
+
+        return tally
+
+
+class _Horizon:
+    """Estado de um horizonte: início no buffer compartilhado, corte e contadores."""
+
+    __slots__ = ('window', 'window_us', 'start', 'cutoff', 'counts', 'asset_counts', 'signals', 'first_timestamp')
+
+    def __init__(self, window: Optional[timedelta]):
+        self.window = window
+        self.window_us = window // timedelta(microseconds=1) if window is not None else None
+        self.start = 0                      # índice absoluto do 1º sinal no horizonte
+        self.cutoff: Optional[int] = None   # epoch (µs) do início do horizonte
+        self.counts = SignalCounts()
+        self.asset_counts: Dict[int, SignalCounts] = {}  # por código de ativo
+        self.signals = 0                    # usado apenas pela sessão
+        self.first_timestamp: Optional[datetime] = None
+
+
+class MarketWindow:
+    """
+    Sinais em ordem de timestamp com contadores por horizonte.
+
+    O buffer guarda apenas o maior horizonte finito; a sessão só acumula.
+    Sinais fora de ordem são inseridos na posição certa; sinais mais antigos
+    que o maior horizonte (em relação ao mais recente) contam só na sessão.
+    """
+
+    def __init__(self, horizons: Optional[Dict[str, Optional[timedelta]]] = None):
+        horizons = HORIZONS if horizons is None else horizons
+        self._horizons = {name: _Horizon(window) for name, window in horizons.items()}
+        self._finite = [h for h in self._horizons.values() if h.window is not None]
+        self._longest_us = max((h.window_us for h in self._finite), default=None)
+        self._buffer = SignalWindow()
+        self._newest: Optional[datetime] = None
+        self._streaks: Dict[int, int] = {}     # por código de ativo
+        self._last_seen: Dict[int, int] = {}   # epoch (µs) do último sinal do ativo
+
+    @property
+    def horizons(self) -> List[str]:
+        """Nomes dos horizontes, na ordem de declaração."""
+        return list(self._horizons)
+
+    @property
+    def buffer(self) -> SignalWindow:
+        """Buffer de sinais (somente leitura; as views valem até o próximo `add`)."""
+        return self._buffer
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def count(self, horizon: str = DEFAULT_HORIZON) -> int:
+        """Quantidade de sinais no horizonte."""
+        state = self._horizons[horizon]
+        if state.window is None:
+            return state.signals
+        return self._buffer.end - state.start
+
+    def counts(self, horizon: str = DEFAULT_HORIZON) -> SignalCounts:
+        """Contadores de operações do horizonte."""
+        return self._horizons[horizon].counts
+
+    def asset_counts(self, horizon: str = DEFAULT_HORIZON) -> Dict[str, SignalCounts]:
+        """Contadores de cada ativo com operações no horizonte."""
+        names = self._buffer.asset_names
+        return {names[code]: counts for code, counts in self._horizons[horizon].asset_counts.items()
+                if counts.total > 0}
+
+    def streak(self, asset: str) -> int:
+        """Sequência atual do ativo na sessão (+ wins / - losses seguidos; 0 se não apareceu)."""
+        return self._streaks.get(self._buffer.find_asset(asset), 0)
+
+    def streaks(self) -> Dict[str, int]:
+        """Sequência atual de cada ativo visto na sessão."""
+        names = self._buffer.asset_names
+        return {names[code]: streak for code, streak in self._streaks.items()}
+
+    def view(self, horizon: str = DEFAULT_HORIZON) -> WindowView:
+        """Epochs, códigos de ativo e de desfecho do horizonte (views, sem cópia)."""
+        state = self._horizons[horizon]
+        if state.window is None:
+            raise ValueError("A sessão não guarda os sinais; use um horizonte finito")
+        return self._buffer.view(state.start)
+
+    def first_timestamp(self, horizon: str = DEFAULT_HORIZON) -> Optional[datetime]:
+        """Timestamp do sinal mais antigo no horizonte."""
+        state = self._horizons[horizon]
+        if state.window is None:
+            return state.first_timestamp
+        if state.start >= self._buffer.end:
+            return None
+        return self._buffer.timestamp_at(state.start)
+
+    @property
+    def last_timestamp(self) -> Optional[datetime]:
+        """Timestamp do sinal mais recente."""
+        return self._newest
+
+    def add(self, signal: Signal) -> bool:
+        """
+        Adiciona um sinal a todos os horizontes e expira os que saíram.
+
+        Returns:
+            False se o sinal já era mais antigo que o maior horizonte
+        """
+        if self._newest is None or signal.timestamp > self._newest:
+            self._newest = signal.timestamp
+
+        buffer = self._buffer
+        epoch = to_epoch_us(signal.timestamp)
+        outcome = outcome_code(signal)
+        asset = buffer.asset_code(signal.asset)
+
+        # Sequência do ativo (sinais mais antigos que o último do ativo não alteram)
+        if epoch >= self._last_seen.get(asset, epoch):
+            self._last_seen[asset] = epoch
+            self._streaks[asset] = next_streak(self._streaks.get(asset, 0), outcome)
+
+        for state in self._horizons.values():
+            if state.window is None:
+                self._count(state, asset, outcome)
+                state.signals += 1
+                if state.first_timestamp is None or signal.timestamp < state.first_timestamp:
+                    state.first_timestamp = signal.timestamp
+
+        if not self._finite:
+            return True
+
+        newest = buffer.epoch_at(buffer.end - 1) if len(buffer) else None
+        if newest is None or epoch >= newest:
+            buffer.add(signal, epoch, outcome)
+            for state in self._finite:
+                self._count(state, asset, outcome)
+            self._expire_us(epoch)
+            return True
+
+        if epoch < newest - self._longest_us:
+            return False
+
+        # Chegou fora de ordem: o buffer insere mantendo a ordem (raro)
+        buffer.add(signal, epoch, outcome)
+        for state in self._finite:
+            if state.cutoff is None or epoch >= state.cutoff:
+                self._count(state, asset, outcome)
+            else:
+                # Antes do início do horizonte: o início desloca uma posição
+                state.start += 1
+        return True
+
+    @staticmethod
+    def _count(state: _Horizon, asset: int, outcome: int, sign: int = 1) -> None:
+        """Soma (ou subtrai) um desfecho no horizonte e no ativo."""
+        state.counts.add_outcome(outcome, sign)
+        asset_counts = state.asset_counts.get(asset)
+        if asset_counts is None:
+            asset_counts = state.asset_counts[asset] = SignalCounts()
+        asset_counts.add_outcome(outcome, sign)
+
+    def expire(self, now: datetime) -> None:
+        """Remove de cada horizonte os sinais anteriores a `now - horizonte`."""
+        if self._finite:
+            self._expire_us(to_epoch_us(now))
+
+    def _expire_us(self, now_us: int) -> None:
+        buffer = self._buffer
+        end = buffer.end
+        for state in self._finite:
+            cutoff = now_us - state.window_us
+            if state.cutoff is None or cutoff > state.cutoff:
+                state.cutoff = cutoff
+            # Poucos sinais saindo (caso do fluxo ao vivo): varredura escalar
+            start, limit = state.start, min(end, state.start + _SCALAR_EXPIRE)
+            while start < limit and buffer.epoch_at(start) < state.cutoff:
+                self._count(state, buffer.asset_at(start), buffer.outcome_at(start), -1)
+                start += 1
+            if start == limit and start < end and buffer.epoch_at(start) < state.cutoff:
+                stop = buffer.index_at(state.cutoff)
+                _, assets, outcomes = buffer.view(start, stop)
+                state.counts.add_outcomes(outcomes, -1)
+                for asset in np.unique(assets):
+                    state.asset_counts[int(asset)].add_outcomes(outcomes[assets == asset], -1)
+                start = stop
+            state.start = start
+
+        # O buffer só precisa guardar o maior horizonte
+        buffer.discard_before(min(state.start for state in self._finite))
+
+    def clear(self) -> None:
+        """Esvazia o buffer e zera todos os horizontes (nova sessão)."""
+        self._buffer.clear()
+        self._newest = None
+        self._streaks.clear()
+        self._last_seen.clear()
+        for name, state in list(self._horizons.items()):
+            fresh = _Horizon(state.window)
+            fresh.start = self._buffer.end
+            self._horizons[name] = fresh
+        self._finite = [h for h in self._horizons.values() if h.window is not None]
@@ -0,0 +1,187 @@
+"""
+Consolidação por merge k-way em streaming
+
+Cada fonte (arquivo CSV ou lista de sinais novos) é lida como uma sequência
+de registros ordenados por timestamp; `heapq.merge` intercala as fontes e a
+deduplicação (por (chat_id, message_id) em todo o merge, ou pela chave
+legada (timestamp, asset, result) em registros sem id) acontece durante o
+merge. A saída é gravada em uma única passada sequencial; a memória cresce
+só com os ids de mensagem vistos, não com o tamanho das linhas.
+"""
+
+import csv
+import heapq
+import logging
+from datetime import tzinfo
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from .parser import Signal
+from .loader import SIGNAL_COLUMNS, ID_COLUMNS, TIMESTAMP_FORMAT, ATTEMPT_NULL, load_signals_frame
+from .catalog import DataCatalog, atomic_open
+from .dedup import SignalDeduper
+from .compression import open_text
+
+logger = logging.getLogger(__name__)
+
+# Registro normalizado: (timestamp 'YYYY-MM-DD HH:MM:SS', asset, result, attempt,
+# chat_id, message_id), ids em texto ('' se desconhecido).
+# O timestamp em texto de largura fixa ordena igual ao cronológico.
+Record = Tuple[str, str, str, str, str, str]
+
+PathLike = Union[str, Path]
+
+
+def _normalize_attempt(value: str) -> str:
+    """Normaliza attempt ('', '1', '1.0') para '' ou dígito."""
+    if not value:
+        return ''
+    return str(int(float(value)))
+
+
+def _id_text(value) -> str:
+    """Id opcional como texto ('' se ausente)."""
+    return '' if value is None or value is pd.NA else str(int(value))
+
+
+def iter_csv_records(path: PathLike) -> Iterator[Record]:
+    """
+    Lê um CSV de sinais linha a linha, sem carregá-lo inteiro.
+
+    Args:
+        path: Caminho do CSV, puro ou compactado (já ordenado por timestamp)
+
+    Yields:
+        Registros normalizados
+    """
+    with open_text(path) as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+
+        ts_idx, asset_idx, result_idx, attempt_idx = (header.index(col) for col in SIGNAL_COLUMNS)
+        chat_idx, message_idx = (header.index(col) if col in header else None for col in ID_COLUMNS)
+        for row in reader:
+            if not row:
+                continue
+            yield (
+                row[ts_idx][:19],
+                row[asset_idx],
+                row[result_idx],
+                _normalize_attempt(row[attempt_idx]),
+                row[chat_idx] if chat_idx is not None else '',
+                row[message_idx] if message_idx is not None else ''
+            )
+
+
+def iter_sorted_file(path: PathLike, catalog: Optional[DataCatalog] = None) -> Iterator[Record]:
+    """
+    Registros de um arquivo em ordem de timestamp.
+
+    Arquivos marcados como ordenados no catálogo são lidos em streaming; os
+    demais (ou sem registro) são ordenados em memória antes do merge.
+    """
+    entry = catalog.entry_for(path) if catalog is not None else None
+
+    if entry is not None and entry.get('sorted'):
+        return iter_csv_records(path)
+
+    logger.debug(f"Ordenando em memória (fonte não ordenada): {path}")
+    df = load_signals_frame(path).sort_values('timestamp', kind='stable')
+    attempts = df['attempt'].astype(str).where(df['attempt'] != ATTEMPT_NULL, '')
+    return zip(
+        df['timestamp'].dt.strftime(TIMESTAMP_FORMAT),
+        df['asset'].astype(str),
+        df['result'].astype(str),
+        attempts,
+        (_id_text(value) for value in df['chat_id']),
+        (_id_text(value) for value in df['message_id'])
+    )
+
+
+def iter_signal_records(signals: Iterable[Signal], timezone: Optional[tzinfo] = None) -> Iterator[Record]:
+    """
+    Registros de uma lista de sinais, em ordem de timestamp.
+
+    Args:
+        signals: Sinais (em qualquer ordem)
+        timezone: Timezone local para converter timestamps com fuso
+    """
+    records = []
+    for signal in signals:
+        timestamp = signal.timestamp
+        if timezone is not None and timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(timezone)
+        records.append((
+            timestamp.strftime(TIMESTAMP_FORMAT),
+            signal.asset,
+            signal.result,
+            '' if signal.attempt is None else str(signal.attempt),
+            _id_text(signal.chat_id),
+            _id_text(signal.message_id)
+        ))
+
+    records.sort(key=lambda record: record[0])
+    return iter(records)
+
+
+def merge_records(sources: List[Iterable[Record]]) -> Iterator[Record]:
+    """
+    Intercala fontes ordenadas removendo duplicatas (ver SignalDeduper).
+
+    Em caso de empate, vale o registro da fonte que aparece primeiro em
+    `sources` (heapq.merge é estável entre fontes). Os ids de mensagem valem
+    para o merge inteiro: a mesma mensagem gravada com timestamps diferentes
+    em fontes diferentes aparece uma vez só. As chaves legadas são zeradas a
+    cada novo timestamp, já que contêm o timestamp.
+    """
+    current_ts = None
+    seen = SignalDeduper()
+
+    for record in heapq.merge(*sources, key=lambda record: record[0]):
+        timestamp = record[0]
+
+        if timestamp != current_ts:
+            current_ts = timestamp
+            seen.clear_legacy()
+
+        chat_id, message_id = record[4], record[5]
+        if seen.add(timestamp, record[1], record[2], chat_id or None, message_id or None):
+            yield record
+
+
+def write_records(records: Iterable[Record], path: PathLike) -> Dict[str, object]:
+    """
+    Grava registros em CSV numa única passada (atômica).
+
+    Returns:
+        Resumo para o catálogo: rows, min_ts, max_ts, sorted
+    """
+    rows = 0
+    first_ts = None
+    last_ts = None
+    is_sorted = True
+
+    with atomic_open(path, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(SIGNAL_COLUMNS + ID_COLUMNS)
+
+        for record in records:
+            timestamp = record[0]
+            if last_ts is not None and timestamp < last_ts:
+                is_sorted = False
+            if first_ts is None:
+                first_ts = timestamp
+            last_ts = timestamp
+            writer.writerow(record)
+            rows += 1
+
+    return {
+        'rows': rows,
+        'min_ts': first_ts if is_sorted else None,
+        'max_ts': last_ts if is_sorted else None,
+        'sorted': is_sorted
+    }
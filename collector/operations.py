@@ -0,0 +1,117 @@
+"""
+Agrupamento de sinais em operações
+
+Cada sinal W/L vira uma operação. No WIN, a tentativa vem do próprio sinal
+(sem tentativa = 1ª). No LOSS, as tentativas são 1 + o número de sinais
+anteriores do mesmo ativo nos últimos `window_seconds` segundos, com máximo
+de 3.
+
+Duas implementações com o mesmo resultado:
+
+- `group_operations`: lista de sinais, janela por dois ponteiros em cada
+  ativo (O(n) após a ordenação), usada no modo live e nas análises do dia;
+- `group_operations_frame`: DataFrame do loader, vetorizado com NumPy
+  (ordenação por ativo + epoch e `searchsorted`), para histórico em lote.
+"""
+
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .parser import Signal
+
+# Janela de tentativas anteriores de um LOSS (10 minutos)
+OPERATION_WINDOW_SECONDS = 600
+
+# Máximo de tentativas de uma operação (1ª, G1, G2)
+MAX_ATTEMPTS = 3
+
+
+def group_operations(signals: List[Signal], window_seconds: float = OPERATION_WINDOW_SECONDS) -> List[Dict[str, Any]]:
+    """
+    Agrupa sinais em operações completas.
+
+    Args:
+        signals: Lista de sinais (qualquer ordem)
+        window_seconds: Janela das tentativas anteriores de um LOSS
+
+    Returns:
+        Operações (asset, timestamp, result, attempts), por ativo na ordem
+        da primeira aparição e, em cada ativo, por timestamp
+    """
+    signals_by_asset: Dict[str, List[Signal]] = {}
+    for signal in sorted(signals, key=lambda x: x.timestamp):
+        signals_by_asset.setdefault(signal.asset, []).append(signal)
+
+    operations = []
+    for asset, asset_signals in signals_by_asset.items():
+        start = 0  # primeiro sinal do ativo dentro da janela do sinal atual
+
+        for i, signal in enumerate(asset_signals):
+            if signal.result == 'W':
+                operations.append({
+                    'asset': asset,
+                    'timestamp': signal.timestamp,
+                    'result': 'W',
+                    'attempts': signal.attempt if signal.attempt else 1
+                })
+
+            elif signal.result == 'L':
+                while (signal.timestamp - asset_signals[start].timestamp).total_seconds() > window_seconds:
+                    start += 1
+
+                operations.append({
+                    'asset': asset,
+                    'timestamp': signal.timestamp,
+                    'result': 'L',
+                    'attempts': min(1 + i - start, MAX_ATTEMPTS)
+                })
+
+    return operations
+
+
+def group_operations_frame(df: pd.DataFrame, window_seconds: int = OPERATION_WINDOW_SECONDS) -> pd.DataFrame:
+    """
+    Versão vetorizada de `group_operations` para um DataFrame de sinais.
+
+    A janela é contada em segundos inteiros (resolução dos arquivos).
+
+    Args:
+        df: Sinais com timestamp, asset, result e attempt (formato do loader)
+        window_seconds: Janela das tentativas anteriores de um LOSS
+
+    Returns:
+        DataFrame com asset, timestamp, result e attempts, na mesma ordem
+        de `group_operations`
+    """
+    columns = ['asset', 'timestamp', 'result', 'attempts']
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    # Ordem por timestamp (estável) e códigos de ativo na ordem da primeira aparição
+    timestamps = pd.DatetimeIndex(df['timestamp'])
+    by_time = np.argsort(timestamps.asi8, kind='stable')
+    asset_codes, _ = pd.factorize(df['asset'].astype(str).to_numpy()[by_time])
+    epochs = ((timestamps - pd.Timestamp(0, tz=timestamps.tz)) // pd.Timedelta(seconds=1)).to_numpy()[by_time]
+
+    # Chave única (ativo, epoch): a janela de um sinal é um intervalo contíguo
+    keys = asset_codes.astype(np.int64) * (1 << 32) + (epochs - epochs.min())
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    rows = df.iloc[by_time[order]].reset_index(drop=True)
+
+    # Sinais anteriores do mesmo ativo na janela: posição - início da janela
+    previous = np.arange(len(keys)) - np.searchsorted(keys, keys - window_seconds, side='left')
+
+    result = rows['result'].astype(str).to_numpy()
+    attempt = rows['attempt'].fillna(0).to_numpy().astype(np.int64)
+    attempts = np.where(result == 'W', np.where(attempt > 0, attempt, 1),
+                        np.minimum(1 + previous, MAX_ATTEMPTS))
+
+    keep = (result == 'W') | (result == 'L')
+    operations = rows.loc[keep, ['asset', 'timestamp']].reset_index(drop=True)
+    operations['asset'] = operations['asset'].astype(str)
+    operations['result'] = result[keep]
+    operations['attempts'] = attempts[keep]
+    return operations
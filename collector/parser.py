@@ -22,6 +22,8 @@ class Signal:
     asset: str
     result: str  # 'W' ou 'L'
     attempt: Optional[int]  # 1, 2, 3 ou None para loss
+    message_id: Optional[int] = None  # id da mensagem no Telegram
+    chat_id: Optional[int] = None  # id do chat de origem
     
     def to_dict(self) -> Dict[str, Any]:
         """Converte para dicionário."""
@@ -29,7 +31,9 @@ class Signal:
             'timestamp': self.timestamp,
             'asset': self.asset,
             'result': self.result,
-            'attempt': self.attempt
+            'attempt': self.attempt,
+            'chat_id': self.chat_id,
+            'message_id': self.message_id
         }
     
     def __str__(self) -> str:
@@ -337,7 +341,9 @@ class SignalParser:
                 timestamp=local_timestamp,
                 asset=asset,
                 result=result,
-                attempt=attempt
+                attempt=attempt,
+                message_id=message.id,
+                chat_id=getattr(message, 'chat_id', None)
             )
             
             logger.info(f"Sinal encontrado: {signal}")
@@ -532,7 +538,9 @@ class HistoricalParser(SignalParser):
                 timestamp=local_timestamp,
                 asset=asset,
                 result=result,
-                attempt=attempt
+                attempt=attempt,
+                message_id=message.id,
+                chat_id=getattr(message, 'chat_id', None)
             )
             
             logger.debug(f"Sinal histórico encontrado: {signal}")
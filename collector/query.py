@@ -0,0 +1,265 @@
+"""
+Consulta por intervalo de tempo em todos os dias armazenados
+
+`SignalQuery.frame(start, end)` devolve os sinais do intervalo sem que o
+chamador precise conhecer o layout dos arquivos:
+
+- os dias vêm do catálogo (e dos arquivos do log binário, para o dia corrente
+  ainda não registrado); o arquivo de cada dia é escolhido como no dashboard
+  (cópia binária atualizada, senão o melhor CSV);
+- min_ts/max_ts do catálogo descartam arquivos fora do intervalo sem abri-los;
+- em CSVs ordenados, uma busca binária pelos offsets de byte lê apenas o
+  trecho do intervalo; no log binário, `np.searchsorted` sobre o epoch.
+
+Arquivos compactados (ou sem metadados atualizados) são lidos inteiros e
+filtrados em memória.
+"""
+
+import io
+import os
+import logging
+from datetime import date as date_type, datetime, timedelta, tzinfo
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .loader import BINLOG_SUFFIX, TIMESTAMP_FORMAT, combine_signal_frames, read_signal_csv
+from .catalog import DataCatalog, ROLE_BINLOG, DATE_IN_NAME_RE
+from .binlog import BinaryLog
+
+logger = logging.getLogger(__name__)
+
+# Tamanho de 'YYYY-MM-DD HH:MM:SS' no início de cada linha
+TIMESTAMP_WIDTH = 19
+
+DateLike = Union[date_type, datetime, str]
+
+
+def _line_start(f: BinaryIO, offset: int, data_start: int) -> int:
+    """Offset da primeira linha que começa em `offset` ou depois."""
+    if offset <= data_start:
+        return data_start
+    f.seek(offset - 1)
+    f.readline()
+    return f.tell()
+
+
+def _bisect_lines(f: BinaryIO, data_start: int, size: int, predicate: Callable[[bytes], bool]) -> int:
+    """
+    Offset da primeira linha cujo timestamp satisfaz `predicate`.
+
+    O predicado deve ser monótono na ordem do arquivo (falso... verdadeiro);
+    o fim do arquivo conta como verdadeiro.
+    """
+    lo, hi = data_start, size
+    while lo < hi:
+        mid = (lo + hi) // 2
+        f.seek(_line_start(f, mid, data_start))
+        line = f.readline()
+        if line and not predicate(line[:TIMESTAMP_WIDTH]):
+            lo = mid + 1
+        else:
+            hi = mid
+    return _line_start(f, lo, data_start)
+
+
+def read_csv_range(path: Union[str, Path], start_key: str, end_key: str) -> pd.DataFrame:
+    """
+    Lê de um CSV ordenado apenas as linhas com start_key <= timestamp <= end_key.
+
+    Args:
+        path: CSV puro, ordenado, com timestamp na primeira coluna
+        start_key: Timestamp inicial ('YYYY-MM-DD HH:MM:SS')
+        end_key: Timestamp final, inclusive
+
+    Returns:
+        Frame com as colunas básicas (read_signal_csv)
+    """
+    start_bytes, end_bytes = start_key.encode(), end_key.encode()
+
+    with open(path, 'rb') as f:
+        header = f.readline()
+        data_start = f.tell()
+        size = os.fstat(f.fileno()).st_size
+
+        begin = _bisect_lines(f, data_start, size, lambda ts: ts >= start_bytes)
+        end = _bisect_lines(f, begin, size, lambda ts: ts > end_bytes)
+
+        f.seek(begin)
+        chunk = f.read(end - begin)
+
+    return read_signal_csv(io.BytesIO(header + chunk))
+
+
+class SignalQuery:
+    """Consulta de sinais por intervalo de tempo sobre catálogo e log binário."""
+
+    def __init__(
+        self,
+        catalog: Optional[DataCatalog] = None,
+        binlog: Optional[BinaryLog] = None,
+        timezone: Optional[tzinfo] = None
+    ):
+        self.catalog = catalog if catalog is not None else DataCatalog()
+        self.binlog = binlog if binlog is not None else BinaryLog(self.catalog.root, timezone=timezone)
+        self.timezone = self.binlog.timezone
+
+    # ------------------------------------------------------------------
+    # Escolha dos arquivos
+    # ------------------------------------------------------------------
+
+    def _local(self, timestamp: Union[datetime, date_type]) -> datetime:
+        """Horário local sem fuso (o mesmo dos CSVs)."""
+        if not isinstance(timestamp, datetime):
+            timestamp = datetime.combine(timestamp, datetime.min.time())
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(self.timezone).replace(tzinfo=None)
+        return timestamp
+
+    def days(self, start: DateLike, end: DateLike) -> List[str]:
+        """Datas com dados no intervalo (catálogo + log binário), em ordem."""
+        lo = start if isinstance(start, str) else self._local(start).strftime('%Y-%m-%d')
+        hi = end if isinstance(end, str) else self._local(end).strftime('%Y-%m-%d')
+
+        days = set(self.catalog.dates_between(lo, hi))
+        if self.binlog.dir.exists():
+            for path in self.binlog.dir.glob(f"signals_*{BINLOG_SUFFIX}"):
+                match = DATE_IN_NAME_RE.search(path.name)
+                if match and lo <= match.group(1) <= hi:
+                    days.add(match.group(1))
+
+        return sorted(days)
+
+    def day_source(self, day: DateLike) -> Optional[Path]:
+        """
+        Arquivo usado para ler um dia.
+
+        Preferência: cópia binária gerada a partir do CSV atual do dia, o
+        melhor CSV do catálogo e, sem CSV registrado (dia corrente do modo
+        live), o arquivo do log binário.
+        """
+        if not isinstance(day, str):
+            day = self._local(day).strftime('%Y-%m-%d')
+
+        csv_path = self.catalog.resolve(day)
+        binlog_path = self.binlog.path_for(day)
+
+        if csv_path is not None:
+            if self.catalog.sources_unchanged(day, ROLE_BINLOG, [csv_path]):
+                return binlog_path
+            return csv_path
+
+        return binlog_path if binlog_path.exists() else None
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def _read_binlog(self, day: str, start: datetime, end: datetime) -> pd.DataFrame:
+        """Registros do log binário no intervalo (busca binária no epoch)."""
+        records = self.binlog.read_day(day)
+        epochs = records['epoch']
+        lo = int(self.timezone.localize(start).timestamp())
+        hi = int(self.timezone.localize(end).timestamp())
+
+        if len(epochs) and np.all(epochs[1:] >= epochs[:-1]):
+            records = records[np.searchsorted(epochs, lo, 'left'):np.searchsorted(epochs, hi, 'right')]
+        else:
+            records = records[(epochs >= lo) & (epochs <= hi)]
+
+        return self.binlog.to_frame(records)
+
+    def _read_csv(self, day: str, path: Path, start: datetime, end: datetime) -> Optional[pd.DataFrame]:
+        """Linhas de um CSV no intervalo, usando os metadados do catálogo."""
+        start_key, end_key = start.strftime(TIMESTAMP_FORMAT), end.strftime(TIMESTAMP_FORMAT)
+
+        entry = self.catalog.entry_for(path, day)
+        stat = path.stat()
+        fresh = (entry is not None and entry['bytes'] == stat.st_size and entry['mtime'] == stat.st_mtime)
+
+        if fresh and entry.get('min_ts') and entry.get('max_ts'):
+            if entry['max_ts'] < start_key or entry['min_ts'] > end_key:
+                return None
+            if entry['min_ts'] >= start_key and entry['max_ts'] <= end_key:
+                return read_signal_csv(path)
+
+        if fresh and entry.get('sorted') and not entry.get('codec'):
+            with open(path, 'rb') as f:
+                seekable = f.readline().startswith(b'timestamp,')
+            if seekable:
+                return read_csv_range(path, start_key, end_key)
+
+        df = read_signal_csv(path)
+        return df[(df['timestamp'] >= start) & (df['timestamp'] <= end)]
+
+    def _iter_raw(self, start: datetime, end: datetime, assets: Optional[Iterable[str]],
+                  results: Optional[Iterable[str]]) -> Iterator[pd.DataFrame]:
+        """Frames básicos (sem colunas derivadas) por dia."""
+        start, end = self._local(start), self._local(end)
+        assets = list(assets) if assets is not None else None
+        results = list(results) if results is not None else None
+
+        for day in self.days(start, end):
+            path = self.day_source(day)
+            if path is None:
+                continue
+
+            if str(path).endswith(BINLOG_SUFFIX):
+                df = self._read_binlog(day, start, end)
+            else:
+                df = self._read_csv(day, path, start, end)
+
+            if df is None or df.empty:
+                continue
+            if assets is not None:
+                df = df[df['asset'].isin(assets)]
+            if results is not None:
+                df = df[df['result'].isin(results)]
+            if not df.empty:
+                yield df.reset_index(drop=True)
+
+    def iter_frames(
+        self,
+        start: Union[datetime, date_type],
+        end: Union[datetime, date_type],
+        assets: Optional[Iterable[str]] = None,
+        results: Optional[Iterable[str]] = None,
+        timezone: Optional[tzinfo] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Sinais do intervalo, um DataFrame por dia (streaming).
+
+        Args:
+            start: Início (datetime com ou sem fuso; data = 00:00)
+            end: Fim, inclusive (data = 23:59:59)
+            assets: Filtrar por ativos
+            results: Filtrar por resultado ('W', 'L')
+            timezone: Se informado, localiza os timestamps neste timezone
+
+        Yields:
+            DataFrames no formato de load_signals_frame
+        """
+        start, end = self._bounds(start, end)
+        for df in self._iter_raw(start, end, assets, results):
+            yield combine_signal_frames([df], timezone)
+
+    def frame(
+        self,
+        start: Union[datetime, date_type],
+        end: Union[datetime, date_type],
+        assets: Optional[Iterable[str]] = None,
+        results: Optional[Iterable[str]] = None,
+        timezone: Optional[tzinfo] = None
+    ) -> pd.DataFrame:
+        """Sinais do intervalo em um único DataFrame (ver iter_frames)."""
+        start, end = self._bounds(start, end)
+        return combine_signal_frames(list(self._iter_raw(start, end, assets, results)), timezone)
+
+    def _bounds(self, start: Union[datetime, date_type],
+                end: Union[datetime, date_type]) -> tuple:
+        """Datas puras viram o dia inteiro; o fim é inclusivo até o segundo."""
+        if not isinstance(end, datetime):
+            end = datetime.combine(end, datetime.min.time()) + timedelta(days=1, seconds=-1)
+        return self._local(start), self._local(end)
@@ -0,0 +1,308 @@
+"""
+Relatórios diários e artefatos derivados
+
+Cálculos que antes viviam no consolidador e no dashboard (relatório do dia e
+tabela por hora) ficam aqui para serem reutilizados pelo build noturno
+(nightly_build.py), que grava os resultados em
+`data/trading ops/YYYY/MM/DD/reports/` e só os recalcula quando o arquivo de
+sinais do dia muda (ver collector/build.py). Os resumos dos estudos em
+docs/study são declarados aqui também.
+"""
+
+import logging
+import os
+import re
+import subprocess
+import sys
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Union
+
+import pandas as pd
+
+from .build import BuildGraph
+from .catalog import DATA_ROOT, DataCatalog, atomic_open, role_dir, write_frame_atomic
+from .adaptive_strategy import rates_frame, recommend
+from .loader import load_signals_frame
+from .simulation import STRATEGY_LABELS, build_hour_stats, hour_counts, simulate_strategy_result
+
+logger = logging.getLogger(__name__)
+
+ROLE_REPORTS = 'reports'
+
+STUDY_ROOT = Path('docs') / 'study'
+
+# Scripts dos estudos: (pasta, script, saídas). A primeira saída recebe o que
+# o script imprime. A variante agressiva do cenário C executa
+# run_scenario_C.py com outras constantes e grava o próprio resumo.
+STUDY_SCRIPTS = [
+    ('scenario_A', 'run_scenario_A.py', ['output.txt', 'summary.csv']),
+    ('scenario_B', 'run_scenario_B.py', ['output.txt', 'summary.csv']),
+    ('scenario_C', 'run_scenario_C.py', ['output.txt', 'summary.csv']),
+    ('scenario_C', 'run_scenario_C_aggressive.py', ['output_aggressive.txt', 'summary_aggressive.csv']),
+    ('scenario_D', 'run_scenario_D.py', ['output.txt']),
+    ('scenario_D', 'run_scenario_D_hourly.py', ['output_hourly.txt']),
+]
+
+PathLike = Union[str, Path]
+
+# `from collector.x import ...` / `import collector.x` nos scripts de estudo e
+# `from .x import ...` dentro do pacote
+COLLECTOR_IMPORT_RE = re.compile(r'^\s*(?:from\s+collector\.(\w+)\s+import|import\s+collector\.(\w+))', re.M)
+RELATIVE_IMPORT_RE = re.compile(r'^\s*from\s+\.(\w+)\s+import', re.M)
+
+
+# ----------------------------------------------------------------------
+# Relatório do dia
+# ----------------------------------------------------------------------
+
+def print_daily_report(df_final: Optional[pd.DataFrame]) -> None:
+    """Imprime o relatório completo do dia (wins = 1ª tentativa + G1)."""
+    print(f"\n📈 RELATÓRIO COMPLETO DO DIA:")
+    print("=" * 60)
+
+    if df_final is None or len(df_final) == 0:
+        print("⚠️ Nenhum dado para analisar")
+        return
+
+    # Estatísticas gerais
+    total_signals = len(df_final)
+    # Conforme estratégias: apenas 1ª tentativa e G1 são wins, G2+ são losses
+    first_attempt_wins = len(df_final[(df_final['result'] == 'W') & (df_final['attempt'] == 1)])
+    g1_wins = len(df_final[(df_final['result'] == 'W') & (df_final['attempt'] == 2)])
+    wins = first_attempt_wins + g1_wins  # Apenas 1ª tentativa + G1
+    losses = len(df_final[df_final['result'] == 'L']) + len(df_final[(df_final['result'] == 'W') & (df_final['attempt'] == 3)])  # Losses + G2
+    win_rate = wins / total_signals * 100
+
+    print(f"📊 RESUMO GERAL:")
+    print(f"   Total de sinais: {total_signals}")
+    print(f"   ✅ Wins: {wins} ({win_rate:.1f}%)")
+    print(f"   ❌ Losses: {losses} ({(100-win_rate):.1f}%)")
+
+    # Por tentativa (apenas wins)
+    wins_df = df_final[df_final['result'] == 'W']
+    if len(wins_df) > 0:
+        first_attempt = len(wins_df[wins_df['attempt'] == 1])
+        g1_wins = len(wins_df[wins_df['attempt'] == 2])
+        g2_wins = len(wins_df[wins_df['attempt'] == 3])
+
+        print(f"\n🎯 ANÁLISE DE TENTATIVAS:")
+        print(f"   1ª tentativa: {first_attempt} ({first_attempt/total_signals*100:.1f}%)")
+        print(f"   G1 recovery: {g1_wins} ({g1_wins/total_signals*100:.1f}%)")
+        print(f"   G2 recovery: {g2_wins} ({g2_wins/total_signals*100:.1f}%)")
+
+    # Por ativo (conforme estratégias: apenas 1ª tentativa + G1 são wins)
+    print(f"\n💰 PERFORMANCE POR ATIVO:")
+    for asset in sorted(df_final['asset'].unique()):
+        asset_data = df_final[df_final['asset'] == asset]
+        asset_first_wins = len(asset_data[(asset_data['result'] == 'W') & (asset_data['attempt'] == 1)])
+        asset_g1_wins = len(asset_data[(asset_data['result'] == 'W') & (asset_data['attempt'] == 2)])
+        asset_wins = asset_first_wins + asset_g1_wins  # Apenas 1ª tentativa + G1
+        asset_losses = len(asset_data[asset_data['result'] == 'L']) + len(asset_data[(asset_data['result'] == 'W') & (asset_data['attempt'] >= 3)])
+        asset_total = len(asset_data)
+        asset_wr = asset_wins / asset_total * 100 if asset_total > 0 else 0
+
+        print(f"   {asset}: {asset_wins}W/{asset_losses}L ({asset_wr:.1f}%) - {asset_total} total")
+
+    # Distribuição temporal (conforme estratégias: apenas 1ª tentativa + G1 são wins)
+    print(f"\n⏰ DISTRIBUIÇÃO POR HORA:")
+    hours = pd.to_datetime(df_final['timestamp']).dt.hour
+
+    for hour in sorted(hours.unique()):
+        hour_data = df_final[hours == hour]
+        hour_total = len(hour_data)
+        hour_first_wins = len(hour_data[(hour_data['result'] == 'W') & (hour_data['attempt'] == 1)])
+        hour_g1_wins = len(hour_data[(hour_data['result'] == 'W') & (hour_data['attempt'] == 2)])
+        hour_wins = hour_first_wins + hour_g1_wins  # Apenas 1ª tentativa + G1
+        hour_wr = hour_wins / hour_total * 100 if hour_total > 0 else 0
+
+        print(f"   {hour:02d}:00-{hour:02d}:59: {hour_total} sinais ({hour_wr:.1f}% WR)")
+
+    # Período de dados
+    first_signal = df_final['timestamp'].min()
+    last_signal = df_final['timestamp'].max()
+    duration = pd.to_datetime(last_signal) - pd.to_datetime(first_signal)
+
+    print(f"\n📅 PERÍODO DOS DADOS:")
+    print(f"   Primeiro sinal: {pd.to_datetime(first_signal).strftime('%H:%M:%S')}")
+    print(f"   Último sinal: {pd.to_datetime(last_signal).strftime('%H:%M:%S')}")
+    print(f"   Duração: {duration}")
+
+    print("=" * 60)
+
+
+# ----------------------------------------------------------------------
+# Tabela por hora (dashboard)
+# ----------------------------------------------------------------------
+
+def hourly_analysis(df: pd.DataFrame) -> pd.DataFrame:
+    """Análise por hora com recomendação de estratégia e simulação de resultados."""
+    if df is None or df.empty:
+        return pd.DataFrame()
+
+    # Recomendação de todas as horas de uma vez (mesma regra do AdaptiveStrategy)
+    hours = recommend(rates_frame(hour_counts(df, by=['hour']))).reset_index()
+
+    hourly_data = []
+    for row in hours.itertuples(index=False):
+        strategy = STRATEGY_LABELS[row.strategy_code]
+
+        # Simular resultado da estratégia
+        strategy_result = simulate_strategy_result(df[df['hour'] == row.hour], strategy)
+
+        hourly_data.append({
+            'hour': int(row.hour),
+            'total': int(row.total),
+            'wins': int(row.first_attempt + row.g1),  # Apenas 1ª tentativa + G1
+            'win_rate': row.win_rate,
+            'first_rate': row.first_rate,
+            'g1_rate': row.g1_rate,  # Taxa de recuperação relativa (dos que não ganharam na primeira)
+            'loss_rate': row.stop_rate,
+            'strategy': strategy,
+            'strategy_result': strategy_result
+        })
+
+    return pd.DataFrame(hourly_data)
+
+
+# ----------------------------------------------------------------------
+# Funções de construção (executadas nos processos do BuildGraph)
+# ----------------------------------------------------------------------
+
+def build_daily_report(inputs: List[str], outputs: List[str]) -> None:
+    """Grava o relatório do dia (texto de print_daily_report)."""
+    df = load_signals_frame(inputs[0])
+    with atomic_open(outputs[0], encoding='utf-8') as f, redirect_stdout(f):
+        print_daily_report(df)
+
+
+def build_hourly_table(inputs: List[str], outputs: List[str]) -> None:
+    """Grava a tabela por hora do dashboard em CSV."""
+    write_frame_atomic(hourly_analysis(load_signals_frame(inputs[0])), outputs[0])
+
+
+def build_study_scenario(inputs: List[str], outputs: List[str], script: str) -> None:
+    """Executa um script de estudo e grava a saída impressa (outputs[0])."""
+    env = dict(os.environ, PYTHONIOENCODING='utf-8')
+    with atomic_open(outputs[0], encoding='utf-8') as f:
+        subprocess.run([sys.executable, script], stdout=f, check=True, env=env)
+
+
+# ----------------------------------------------------------------------
+# Declaração dos artefatos
+# ----------------------------------------------------------------------
+
+def report_paths(day: str, root: PathLike = DATA_ROOT) -> tuple:
+    """Caminhos do relatório e da tabela por hora de um dia."""
+    folder = role_dir(datetime.strptime(day, '%Y-%m-%d').date(), ROLE_REPORTS, root)
+    return folder / f"report_{day}.txt", folder / f"hourly_{day}.csv"
+
+
+def hour_stats_path(day: str, root: PathLike = DATA_ROOT) -> Path:
+    """Caminho das estatísticas por hora do otimizador (collector/simulation.py)."""
+    return role_dir(datetime.strptime(day, '%Y-%m-%d').date(), ROLE_REPORTS, root) / f"hour_stats_{day}.csv"
+
+
+def declare_day_artifacts(graph: BuildGraph, day: str, source: PathLike,
+                          root: PathLike = DATA_ROOT) -> None:
+    """Relatório, tabela por hora e estatísticas do otimizador de um dia, a partir do seu melhor arquivo de sinais."""
+    report_path, hourly_path = report_paths(day, root)
+    graph.add(f"report/{day}", [source], [report_path], build_daily_report)
+    graph.add(f"hourly/{day}", [source], [hourly_path], build_hourly_table, version='2')
+    graph.add(f"hourstats/{day}", [source], [hour_stats_path(day, root)], build_hour_stats)
+
+
+def collector_modules(scripts: List[Path]) -> List[Path]:
+    """Módulos do pacote collector usados pelos scripts, incluindo os importados por eles."""
+    package = Path(__file__).parent
+    pending = []
+    for script in scripts:
+        for match in COLLECTOR_IMPORT_RE.finditer(script.read_text(encoding='utf-8')):
+            pending.append(match.group(1) or match.group(2))
+
+    modules = set()
+    while pending:
+        name = pending.pop()
+        path = package / f"{name}.py"
+        if path in modules or not path.exists():
+            continue
+        modules.add(path)
+        pending.extend(RELATIVE_IMPORT_RE.findall(path.read_text(encoding='utf-8')))
+    return sorted(modules)
+
+
+def declare_study_artifacts(graph: BuildGraph, study_root: PathLike = STUDY_ROOT) -> None:
+    """Saídas e summary.csv dos scripts de estudo."""
+    study_root = Path(study_root)
+    data_files = sorted((study_root / 'study_data').glob('signals_*.csv'))
+
+    for folder, script, outputs in STUDY_SCRIPTS:
+        script_path = study_root / folder / script
+        if not script_path.exists():
+            continue
+
+        # Todos os scripts da pasta: variantes reutilizam o script base
+        scripts = sorted((study_root / folder).glob('run_*.py'))
+        graph.add(f"study/{folder}/{script}", [*scripts, *collector_modules(scripts), *data_files],
+                  [study_root / folder / name for name in outputs],
+                  build_study_scenario, script_path.as_posix())
+
+
+def declare_all(graph: BuildGraph, catalog: DataCatalog, study: bool = True) -> None:
+    """Todos os artefatos: relatórios de cada dia do catálogo e estudos."""
+    for day in catalog.dates():
+        source = catalog.resolve(day)
+        if source is not None:
+            declare_day_artifacts(graph, day, source, catalog.root)
+
+    if study:
+        declare_study_artifacts(graph)
+
+
+def load_hourly_table(day: str, source: PathLike, root: PathLike = DATA_ROOT) -> Optional[pd.DataFrame]:
+    """
+    Tabela por hora pré-calculada pelo build noturno, se ainda valer.
+
+    Returns:
+        DataFrame, ou None se não foi construída a partir do `source` atual
+    """
+    graph = BuildGraph(root)
+    declare_day_artifacts(graph, day, source, root)
+    artifact = graph.artifacts[f"hourly/{day}"]
+
+    if graph.state.stale_reason(artifact) is not None:
+        return None
+    try:
+        return pd.read_csv(artifact.outputs[0])
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame()
+
+
+def load_catalog_hour_stats(catalog: DataCatalog, jobs: Optional[int] = None) -> pd.DataFrame:
+    """
+    Estatísticas por hora de todos os dias do catálogo, reconstruindo antes
+    as desatualizadas (mesmo artefato do build noturno).
+
+    Returns:
+        Linhas de `collector.simulation.hour_stats` de todos os dias
+    """
+    graph = BuildGraph(catalog.root)
+    for day in catalog.dates():
+        source = catalog.resolve(day)
+        if source is not None:
+            declare_day_artifacts(graph, day, source, catalog.root)
+    graph.artifacts = {name: artifact for name, artifact in graph.artifacts.items()
+                       if name.startswith('hourstats/')}
+
+    summary = graph.run(jobs=jobs)
+    for name, error in summary['failed'].items():
+        logger.warning(f"⚠️ {name}: {error}")
+
+    frames = []
+    for name in [*summary['built'], *summary['skipped']]:
+        try:
+            frames.append(pd.read_csv(graph.artifacts[name].outputs[0]))
+        except pd.errors.EmptyDataError:
+            continue
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
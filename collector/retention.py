@@ -0,0 +1,90 @@
+"""
+Retenção: compactação dos arquivos de dias antigos
+
+Arquivos de sinais de dias mais antigos que N dias (live, pre-op time, op
+time e daily ops) são compactados no lugar (ver collector/compression.py) e
+atualizados no catálogo. O log binário fica de fora (é lido via mmap), assim
+como trading logs e dados de estudo, que são editados/lidos diretamente.
+"""
+
+import logging
+from datetime import date as date_type, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from .catalog import DataCatalog, SIGNAL_ROLE_PRIORITY
+from .compression import compress_file, default_codec
+
+logger = logging.getLogger(__name__)
+
+# Papéis compactados pela retenção
+COMPACT_ROLES = list(SIGNAL_ROLE_PRIORITY)
+
+
+def compact_old_days(
+    catalog: DataCatalog,
+    older_than_days: int,
+    today: Union[date_type, datetime, None] = None,
+    codec: Optional[str] = None,
+    level: Optional[int] = None,
+    dry_run: bool = False
+) -> List[Dict[str, object]]:
+    """
+    Compacta os arquivos de sinais de dias anteriores ao corte.
+
+    Args:
+        catalog: Catálogo dos dados
+        older_than_days: Dias mais antigos que isto (em relação a `today`)
+            são compactados
+        today: Data de referência (padrão: hoje)
+        codec: CODEC_ZSTD ou CODEC_GZIP (padrão: zstd se disponível)
+        level: Nível de compressão
+        dry_run: Apenas listar o que seria compactado
+
+    Returns:
+        Um item por arquivo: day, role, path, target, bytes_before, bytes_after
+    """
+    if today is None:
+        today = date_type.today()
+    elif isinstance(today, datetime):
+        today = today.date()
+
+    cutoff = (today - timedelta(days=older_than_days)).strftime('%Y-%m-%d')
+    codec = codec or default_codec()
+    results = []
+
+    for day in catalog.dates():
+        if day >= cutoff:
+            break
+
+        for role, entry in catalog.entries(day).items():
+            if role not in COMPACT_ROLES or entry.get('codec'):
+                continue
+
+            path = Path(entry['path'])
+            if not path.exists():
+                continue
+
+            item = {'day': day, 'role': role, 'path': path.as_posix(), 'target': None,
+                    'bytes_before': path.stat().st_size, 'bytes_after': None}
+            results.append(item)
+
+            if dry_run:
+                continue
+
+            try:
+                # Entrada desatualizada: registrar o conteúdo atual antes
+                if not catalog.is_unchanged(path, day, role):
+                    catalog.record(path, role, day)
+
+                target = compress_file(path, codec, level)
+                compacted = catalog.record_compacted(day, role, target)
+            except Exception as e:
+                logger.error(f"Erro ao compactar {path}: {e}")
+                continue
+
+            item['target'] = compacted['path']
+            item['bytes_after'] = compacted['bytes']
+            logger.info(f"🗜️ {day} {role}: {item['bytes_before']} -> {item['bytes_after']} bytes ({codec})")
+
+    return results
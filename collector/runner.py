@@ -14,6 +14,8 @@ from telethon.tl.types import User
 from .config import Config
 from .parser import SignalParser, Signal
 from .storage import Storage
+from .async_storage import AsyncStorage
+from .journal import SignalJournal
 
 logger = logging.getLogger(__name__)
 
@@ -172,6 +174,17 @@ class Runner:
         logger.info(f"Horário de operação: {self.config.start_hour}:00 - {self.config.end_hour}:59")
         logger.info("Pressione Ctrl+C para parar")
         
+        # Journal write-ahead: reaplica o que ficou de uma execução interrompida
+        journal = None
+        if self.config.journal_enabled:
+            journal = SignalJournal("listener", flush_interval_ms=self.config.journal_flush_interval_ms)
+            journal.replay(lambda signals: self.storage.recover_signals(signals, export_format))
+            journal.start()
+        
+        # Gravação (disco e PostgreSQL) em lote, fora do handler
+        store = AsyncStorage(self.storage, self.config, export_format, append_csv=journal is not None)
+        store.start()
+        
         # Handler para novas mensagens
         @self.client.on(events.NewMessage(chats=entity))
         async def handle_new_message(event):
@@ -180,8 +193,12 @@ class Runner:
                 if signal:
                     logger.info(f"🎯 Novo sinal: {signal}")
                     
-                    # Salvar sinal
-                    self.storage.save_signals([signal], export_format)
+                    # Durável no journal antes de seguir
+                    if journal is not None:
+                        await journal.append(signal)
+                    
+                    # Salvar sinal (apenas enfileira)
+                    await store.save(signal)
                     
                     # Imprimir na tela
                     print(f"\n🎯 {datetime.now().strftime('%H:%M:%S')} - Novo sinal:")
@@ -199,6 +216,11 @@ class Runner:
         except KeyboardInterrupt:
             logger.info("Listener interrompido pelo usuário")
         finally:
+            await store.close()
+            logger.info(f"📦 Gravação: {store.stats()}")
+            if journal is not None:
+                # Com falhas de gravação, o journal é mantido para nova tentativa
+                await journal.close(checkpoint=store.failed_signals == 0)
             await self.cleanup()
     
     async def cleanup(self) -> None:
@@ -0,0 +1,176 @@
+"""
+Agendador de prazos e gatilhos por contagem no event loop
+
+Substitui o polling de 30 s do LiveTrader: as tarefas têm horário exato de
+relógio (XX:59, status a cada 10 minutos, fim da sessão) e ficam num heap;
+o loop dorme exatamente até o próximo prazo e acorda antes se um gatilho por
+contagem de sinais disparar (`signal_received`).
+"""
+
+import asyncio
+import heapq
+import inspect
+import itertools
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, tzinfo
+from typing import Awaitable, Callable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[[datetime], Union[None, Awaitable[None]]]
+
+
+def next_minute_of_hour(after: datetime, minute: int) -> datetime:
+    """Próximo horário HH:minute:00 estritamente depois de `after`."""
+    candidate = after.replace(minute=minute, second=0, microsecond=0)
+    if candidate <= after:
+        candidate += timedelta(hours=1)
+    return candidate
+
+
+def next_minute_multiple(after: datetime, step: int) -> datetime:
+    """Próximo horário com minuto múltiplo de `step` (ex.: :00, :10, :20)."""
+    start = after.replace(second=0, microsecond=0)
+    minutes = (after.minute // step + 1) * step
+    return start.replace(minute=0) + timedelta(minutes=minutes)
+
+
+@dataclass(order=True)
+class _Job:
+    when: datetime
+    priority: int
+    seq: int
+    name: str = field(compare=False)
+    callback: Callback = field(compare=False)
+    repeat: Optional[Callable[[datetime], datetime]] = field(compare=False, default=None)
+
+
+@dataclass
+class _CountTrigger:
+    name: str
+    remaining: int
+    callback: Callback
+    expires: Optional[datetime] = None
+
+
+class DeadlineScheduler:
+    """
+    Heap de prazos de relógio + gatilhos por quantidade de sinais.
+
+    Tarefas no mesmo horário rodam por prioridade (menor primeiro) e, depois,
+    pela ordem de agendamento. Callbacks podem ser funções ou corrotinas e
+    recebem o horário atual.
+    """
+
+    def __init__(self, timezone: tzinfo):
+        self.timezone = timezone
+        self._heap: List[_Job] = []
+        self._seq = itertools.count()
+        self._triggers: List[_CountTrigger] = []
+        self._wakeup: Optional[asyncio.Event] = None  # criado no loop de `run`
+        self._running = False
+
+    def now(self) -> datetime:
+        """Horário atual no timezone do agendador."""
+        return datetime.now(self.timezone)
+
+    def at(self, when: datetime, callback: Callback, name: str = '', priority: int = 1) -> _Job:
+        """Agenda uma tarefa para um horário exato."""
+        job = _Job(when, priority, next(self._seq), name or callback.__name__, callback)
+        heapq.heappush(self._heap, job)
+        self._wake()
+        return job
+
+    def every(self, next_time: Callable[[datetime], datetime], callback: Callback,
+              name: str = '', priority: int = 1) -> _Job:
+        """
+        Agenda uma tarefa recorrente.
+
+        Args:
+            next_time: Próximo horário estritamente depois do horário dado
+            callback: Tarefa
+            name: Nome para logs
+            priority: Desempate entre tarefas no mesmo horário
+        """
+        job = self.at(next_time(self.now()), callback, name, priority)
+        job.repeat = next_time
+        return job
+
+    def after_signals(self, count: int, callback: Callback, name: str = '',
+                      expires: Optional[datetime] = None) -> None:
+        """
+        Dispara `callback` quando mais `count` sinais chegarem.
+
+        Args:
+            count: Sinais a aguardar
+            callback: Tarefa
+            name: Nome para logs
+            expires: Descartar o gatilho se não disparar até este horário
+        """
+        self._triggers.append(_CountTrigger(name or callback.__name__, max(1, count), callback, expires))
+
+    def signal_received(self, count: int = 1) -> None:
+        """Conta sinais recebidos; gatilhos atingidos rodam na próxima volta do loop."""
+        if not self._triggers:
+            return
+
+        now = self.now()
+        pending = []
+        for trigger in self._triggers:
+            if trigger.expires is not None and now >= trigger.expires:
+                continue
+            trigger.remaining -= count
+            if trigger.remaining <= 0:
+                self.at(now, trigger.callback, trigger.name, priority=0)
+            else:
+                pending.append(trigger)
+        self._triggers = pending
+
+    def stop(self) -> None:
+        """Encerra `run` (tarefas pendentes são descartadas)."""
+        self._running = False
+        self._wake()
+
+    def _wake(self) -> None:
+        """Acorda o loop para reavaliar o próximo prazo."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run(self) -> None:
+        """Executa as tarefas no horário, dormindo até o próximo prazo."""
+        self._running = True
+        self._wakeup = asyncio.Event()
+
+        while self._running:
+            self._wakeup.clear()
+            now = self.now()
+
+            while self._running and self._heap and self._heap[0].when <= now:
+                job = heapq.heappop(self._heap)
+                if job.repeat is not None:
+                    job.when = job.repeat(max(job.when, now))
+                    job.seq = next(self._seq)
+                    heapq.heappush(self._heap, job)
+                await self._execute(job, now)
+
+            if not self._running:
+                break
+
+            timeout = (self._heap[0].when - self.now()).total_seconds() if self._heap else None
+            if timeout is not None and timeout <= 0:
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _execute(self, job: _Job, now: datetime) -> None:
+        """Executa uma tarefa; erros são registrados sem parar o agendador."""
+        try:
+            result = job.callback(now)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.error(f"❌ Erro na tarefa agendada '{job.name}': {e}")
@@ -0,0 +1,237 @@
+"""
+Buffer circular de sinais ordenado por tempo
+
+Guarda apenas o necessário para as janelas do modo live, em arrays NumPy
+paralelos: epoch em microssegundos, código do ativo e código do desfecho
+(ver `outcome_code`). Os sinais saem por idade (`expire`), não por
+quantidade, então uma hora movimentada não é truncada; a memória fica
+limitada à taxa de sinais vezes a maior janela.
+
+As consultas por intervalo de tempo usam busca binária (`searchsorted`) e
+devolvem fatias (views) dos arrays, sem cópia. Quando o fim dos arrays é
+atingido, a parte viva volta para o início (ou a capacidade dobra se
+ocupar mais da metade), o que mantém o append em O(1) amortizado e os
+dados sempre contíguos.
+
+Os índices expostos (`head`, `end`, `index_at`) são absolutos: não mudam
+quando o buffer é compactado, só quando um sinal é inserido fora de ordem
+antes deles.
+"""
+
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .parser import Signal
+
+# Códigos de desfecho (mesma regra de collector.operations.group_operations)
+OUTCOME_FIRST = 0   # WIN na 1ª tentativa (ou sem tentativa)
+OUTCOME_G1 = 1      # WIN no G1
+OUTCOME_G2 = 2      # WIN no G2
+OUTCOME_STOP = 3    # LOSS
+OUTCOME_WIN = 4     # WIN com tentativa fora de 1-3 (conta só no total)
+OUTCOME_NONE = 5    # Não é operação (resultado desconhecido)
+OUTCOMES = 6
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+WindowView = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def outcome_code(signal: Signal) -> int:
+    """Código de desfecho de um sinal."""
+    if signal.result == 'W':
+        attempt = signal.attempt or 1
+        return attempt - 1 if 1 <= attempt <= 3 else OUTCOME_WIN
+    if signal.result == 'L':
+        return OUTCOME_STOP
+    return OUTCOME_NONE
+
+
+def to_epoch_us(timestamp: datetime) -> int:
+    """Epoch em microssegundos (timestamps sem timezone são tratados como UTC)."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+
+def from_epoch_us(epoch_us: int, tz: Optional[tzinfo] = None) -> datetime:
+    """Inverso de `to_epoch_us` (tz=None devolve datetime sem timezone, em UTC)."""
+    timestamp = _EPOCH + timedelta(microseconds=int(epoch_us))
+    if tz is None:
+        return timestamp.replace(tzinfo=None)
+    return timestamp.astimezone(tz)
+
+
+class SignalWindow:
+    """
+    Sinais em ordem de timestamp em arrays paralelos (epoch, ativo, desfecho).
+
+    Sinais fora de ordem são inseridos na posição certa (deslocamento dos
+    posteriores, raro no fluxo do Telegram).
+    """
+
+    def __init__(self, capacity: int = 256):
+        capacity = max(16, capacity)
+        self._epochs = np.empty(capacity, dtype=np.int64)
+        self._assets = np.empty(capacity, dtype=np.int32)
+        self._outcomes = np.empty(capacity, dtype=np.int8)
+        self._start = 0   # posição física do sinal mais antigo
+        self._stop = 0    # posição física após o mais recente
+        self._offset = 0  # índice absoluto da posição física 0
+        self._asset_codes: Dict[str, int] = {}
+        self.asset_names: List[str] = []
+        self.tz: Optional[tzinfo] = None
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    @property
+    def capacity(self) -> int:
+        return len(self._epochs)
+
+    @property
+    def head(self) -> int:
+        """Índice absoluto do sinal mais antigo."""
+        return self._offset + self._start
+
+    @property
+    def end(self) -> int:
+        """Índice absoluto após o sinal mais recente."""
+        return self._offset + self._stop
+
+    def asset_code(self, asset: str) -> int:
+        """Código do ativo (atribuído na primeira aparição)."""
+        code = self._asset_codes.get(asset)
+        if code is None:
+            code = self._asset_codes[asset] = len(self.asset_names)
+            self.asset_names.append(asset)
+        return code
+
+    def find_asset(self, asset: str) -> Optional[int]:
+        """Código do ativo, se já apareceu."""
+        return self._asset_codes.get(asset)
+
+    def epoch_at(self, index: int) -> int:
+        """Epoch (µs) do sinal no índice absoluto."""
+        return int(self._epochs[index - self._offset])
+
+    def timestamp_at(self, index: int) -> datetime:
+        """Timestamp do sinal no índice absoluto."""
+        return from_epoch_us(self.epoch_at(index), self.tz)
+
+    def asset_at(self, index: int) -> int:
+        """Código do ativo do sinal no índice absoluto."""
+        return int(self._assets[index - self._offset])
+
+    def outcome_at(self, index: int) -> int:
+        """Código de desfecho do sinal no índice absoluto."""
+        return int(self._outcomes[index - self._offset])
+
+    def add(self, signal: Signal, epoch_us: Optional[int] = None, outcome: Optional[int] = None) -> int:
+        """
+        Adiciona um sinal na posição de seu timestamp.
+
+        Args:
+            signal: Sinal
+            epoch_us: Epoch já calculado (opcional)
+            outcome: Código de desfecho já calculado (opcional)
+
+        Returns:
+            Índice absoluto em que o sinal ficou
+        """
+        if self.tz is None:
+            self.tz = signal.timestamp.tzinfo
+        if epoch_us is None:
+            epoch_us = to_epoch_us(signal.timestamp)
+        if outcome is None:
+            outcome = outcome_code(signal)
+        return self.append(epoch_us, self.asset_code(signal.asset), outcome)
+
+    def append(self, epoch_us: int, asset: int, outcome: int) -> int:
+        """Versão de `add` com valores já codificados."""
+        if self._stop == self.capacity:
+            self._make_room()
+
+        stop = self._stop
+        if stop == self._start or epoch_us >= self._epochs[stop - 1]:
+            position = stop
+        else:
+            # Fora de ordem: deslocar os posteriores uma posição
+            position = self._start + int(np.searchsorted(self._epochs[self._start:stop], epoch_us, side='right'))
+            for column in (self._epochs, self._assets, self._outcomes):
+                column[position + 1:stop + 1] = column[position:stop].copy()
+
+        self._epochs[position] = epoch_us
+        self._assets[position] = asset
+        self._outcomes[position] = outcome
+        self._stop = stop + 1
+        return self._offset + position
+
+    def _make_room(self) -> None:
+        """Volta a parte viva para o início ou dobra a capacidade."""
+        live = len(self)
+        if 2 * live > self.capacity:
+            capacity = 2 * self.capacity
+            for name in ('_epochs', '_assets', '_outcomes'):
+                column = getattr(self, name)
+                grown = np.empty(capacity, dtype=column.dtype)
+                grown[:live] = column[self._start:self._stop]
+                setattr(self, name, grown)
+        else:
+            for column in (self._epochs, self._assets, self._outcomes):
+                column[:live] = column[self._start:self._stop]
+        self._offset += self._start
+        self._start = 0
+        self._stop = live
+
+    def index_at(self, epoch_us: int, side: str = 'left') -> int:
+        """Índice absoluto do primeiro sinal com epoch >= epoch_us (side='left') ou > (side='right')."""
+        position = np.searchsorted(self._epochs[self._start:self._stop], epoch_us, side=side)
+        return self.head + int(position)
+
+    def view(self, start: Optional[int] = None, stop: Optional[int] = None) -> WindowView:
+        """
+        Fatias (sem cópia) de epochs, ativos e desfechos entre índices absolutos.
+
+        As views valem até a próxima escrita no buffer.
+        """
+        begin = self._start if start is None else max(start - self._offset, self._start)
+        finish = self._stop if stop is None else min(stop - self._offset, self._stop)
+        finish = max(begin, finish)
+        return self._epochs[begin:finish], self._assets[begin:finish], self._outcomes[begin:finish]
+
+    def since(self, timestamp: datetime) -> WindowView:
+        """Sinais com timestamp >= `timestamp`."""
+        return self.view(self.index_at(to_epoch_us(timestamp)))
+
+    def between(self, start: datetime, end: datetime) -> WindowView:
+        """Sinais com start <= timestamp < end."""
+        return self.view(self.index_at(to_epoch_us(start)), self.index_at(to_epoch_us(end)))
+
+    def expire(self, cutoff: datetime) -> int:
+        """
+        Remove os sinais anteriores a `cutoff`.
+
+        Returns:
+            Quantidade removida
+        """
+        return self.discard_before(self.index_at(to_epoch_us(cutoff)))
+
+    def discard_before(self, index: int) -> int:
+        """Remove os sinais com índice absoluto menor que `index`."""
+        position = min(max(index - self._offset, self._start), self._stop)
+        removed = position - self._start
+        self._start = position
+        if self._start == self._stop:
+            # Vazio: recomeçar do início dos arrays
+            self._offset += self._start
+            self._start = self._stop = 0
+        return removed
+
+    def clear(self) -> None:
+        """Esvazia o buffer (códigos de ativo são mantidos)."""
+        self._offset += self._stop
+        self._start = self._stop = 0
@@ -0,0 +1,411 @@
+"""
+Simulação de P&L e otimização dos critérios do AdaptiveStrategy
+
+As simulações por hora (Martingale Conservative e Infinity Conservative)
+ficam aqui, junto com o otimizador de `decision_thresholds` usado por
+optimize_thresholds.py.
+
+O otimizador não reprocessa sinais por candidato. Cada (dia, hora) do
+histórico é resumido uma única vez em estatísticas suficientes (`hour_stats`:
+contadores de 1ª tentativa, G1, G2, STOP e o resultado de cada estratégia
+naquela hora), gravadas pelo build noturno; avaliar um conjunto de critérios
+é então só aritmética em arrays (dias x 24 horas):
+
+1. recomendação por hora com `adaptive_strategy.recommend_arrays` (a regra
+   de `AdaptiveStrategy._determine_strategy`, vetorizada);
+2. troca de estratégia só com confiança >= `confidence_threshold`
+   (`AdaptiveStrategy.should_change_strategy`);
+3. fluxo do dia de `simulate_realistic_trading_day` do dashboard: a hora H
+   opera com a estratégia decidida na análise da hora H-1, até a meta
+   diária ou os stops.
+
+A janela de agrupamento (600 s) não entra na busca: ela só define quantas
+tentativas um LOSS consumiu, e todo LOSS conta como STOP nos contadores, então
+nenhum critério muda com ela.
+"""
+
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .adaptive_strategy import DECISION_THRESHOLDS, STRATEGY_CODES, StrategyType, compute_rates, recommend_arrays
+from .catalog import write_frame_atomic
+from .loader import load_signals_frame
+
+logger = logging.getLogger(__name__)
+
+MARTINGALE = "Martingale Conservative"
+INFINITY = "Infinity Conservative"
+
+# P&L de uma sessão (hora) por estratégia e resultado (ver dashboard)
+STRATEGY_PNL = {
+    MARTINGALE: {"Vitória": 12.0, "Derrota": -12.0},
+    INFINITY: {"Vitória": 12.0, "Derrota": -8.0},
+}
+
+# Fluxo do dia (mesmos valores de simulate_realistic_trading_day)
+DAILY_TARGET = 12.0
+MARTINGALE_DAILY_LOSSES = 3
+INFINITY_STOP = -49.0
+
+# O modo live só analisa uma hora com pelo menos 5 sinais
+MIN_ANALYSIS_SIGNALS = 5
+
+HOUR_STATS_COLUMNS = ['date', 'hour', 'total', 'first_attempt', 'g1', 'g2', 'stops',
+                      'martingale_pnl', 'infinity_pnl']
+
+# Espaço de busca padrão
+PARAMETER_GRID = {
+    'pause_threshold': [20.0, 25.0, 30.0, 35.0, 40.0],
+    'martingale_threshold': [55.0, 60.0, 65.0, 70.0, 75.0],
+    'infinity_threshold': [50.0, 55.0, 60.0, 65.0, 70.0],
+    'min_operations': [5, 10, 15, 20],
+    'confidence_threshold': [50.0, 60.0, 70.0, 80.0],
+}
+
+# Códigos de estratégia nos arrays (NO_STRATEGY = antes da primeira análise do dia)
+NO_STRATEGY = -1
+PAUSE = STRATEGY_CODES[StrategyType.PAUSE]
+MARTINGALE_CODE = STRATEGY_CODES[StrategyType.MARTINGALE_CONSERVATIVE]
+INFINITY_CODE = STRATEGY_CODES[StrategyType.INFINITY_CONSERVATIVE]
+
+# Nome de cada código nas tabelas do dashboard
+STRATEGY_LABELS = {PAUSE: "PAUSE", MARTINGALE_CODE: MARTINGALE, INFINITY_CODE: INFINITY}
+
+
+# ----------------------------------------------------------------------
+# Simulação de uma hora
+# ----------------------------------------------------------------------
+
+def simulate_strategy_result(hour_df: pd.DataFrame, strategy: str) -> str:
+    """Simula o resultado da aplicação da estratégia nas operações da hora."""
+    if strategy in ["PAUSE", "Dados Insuficientes", "Aguardar Mais Dados"]:
+        return "Sem Operações"
+
+    # Ordenar operações por timestamp para simular em ordem cronológica
+    operations = hour_df.sort_values('timestamp')
+
+    if strategy == MARTINGALE:
+        return simulate_martingale_conservative(operations)
+    elif strategy == INFINITY:
+        return simulate_infinity_conservative(operations)
+
+    return "N/A"
+
+
+def simulate_martingale_conservative(operations: pd.DataFrame) -> str:
+    """
+    Simula Martingale Conservative:
+    - Vitória: 3 wins seguidos sem nenhum loss entre eles
+    - Derrota: qualquer loss (de primeira ou entre vitórias)
+    """
+    consecutive_wins = 0
+
+    for _, op in operations.iterrows():
+        if op['result'] == 'W':
+            consecutive_wins += 1
+            if consecutive_wins >= 3:
+                return "Vitória"
+        else:  # Loss
+            return "Derrota"
+
+    # Se chegou ao fim sem 3 wins consecutivos nem loss
+    if consecutive_wins < 3:
+        return "Incompleto"
+
+    return "Vitória"
+
+
+def simulate_infinity_conservative(operations: pd.DataFrame) -> str:
+    """
+    Simula Infinity Conservative:
+    - Vitória: 2 ciclos completos vitoriosos (2 vitórias seguidas, duas vezes)
+    - Derrota: falha em completar os ciclos
+    """
+    cycles_completed = 0
+    consecutive_wins = 0
+
+    for _, op in operations.iterrows():
+        if op['result'] == 'W':
+            consecutive_wins += 1
+            if consecutive_wins >= 2:  # Ciclo completo
+                cycles_completed += 1
+                consecutive_wins = 0  # Reset para próximo ciclo
+                if cycles_completed >= 2:
+                    return "Vitória"
+        else:  # Loss
+            consecutive_wins = 0  # Reset na sequência
+
+    # Se não completou 2 ciclos
+    if cycles_completed < 2:
+        return "Incompleto"
+
+    return "Vitória"
+
+
+def strategy_pnl(strategy: str, result: str) -> float:
+    """P&L de uma sessão com a estratégia e o resultado simulado."""
+    return STRATEGY_PNL.get(strategy, {}).get(result, 0.0)
+
+
+# ----------------------------------------------------------------------
+# Estatísticas suficientes por hora
+# ----------------------------------------------------------------------
+
+def hour_counts(df: pd.DataFrame, by: Sequence[str] = ('date', 'hour')) -> pd.DataFrame:
+    """
+    Contadores de operações (total, first_attempt, g1, g2, stops) por grupo.
+
+    Mesma regra de `SignalCounts`: W sem tentativa conta como 1ª, L = STOP.
+
+    Args:
+        df: Sinais no formato do loader
+        by: Colunas de agrupamento ('date' vira texto YYYY-MM-DD)
+
+    Returns:
+        DataFrame indexado pelas colunas de `by`, em ordem
+    """
+    result = df['result'].astype(str).to_numpy()
+    attempt = df['attempt'].to_numpy().astype(np.int64)
+    attempt = np.where(attempt > 0, attempt, 1)
+    win = result == 'W'
+    stop = result == 'L'
+
+    keys = {'date': df['date'].astype(str).to_numpy(), 'hour': df['hour'].astype(int).to_numpy()}
+    return pd.DataFrame({
+        **{column: keys[column] for column in by},
+        'total': win | stop,
+        'first_attempt': win & (attempt == 1),
+        'g1': win & (attempt == 2),
+        'g2': win & (attempt == 3),
+        'stops': stop,
+    }).groupby(list(by)).sum().astype(np.int64)
+
+
+def hour_stats(df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Resume um frame de sinais (formato do loader) por (dia, hora).
+
+    Contadores de `hour_counts` e o P&L de cada estratégia operando a hora inteira.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=HOUR_STATS_COLUMNS)
+
+    counts = hour_counts(df)
+
+    pnl = {MARTINGALE: [], INFINITY: []}
+    for _, hour_df in df.groupby([df['date'].astype(str), df['hour'].astype(int)], sort=True):
+        for strategy, values in pnl.items():
+            values.append(strategy_pnl(strategy, simulate_strategy_result(hour_df, strategy)))
+
+    counts['martingale_pnl'] = pnl[MARTINGALE]
+    counts['infinity_pnl'] = pnl[INFINITY]
+    return counts.reset_index()[HOUR_STATS_COLUMNS]
+
+
+def build_hour_stats(inputs: List[str], outputs: List[str]) -> None:
+    """Grava as estatísticas por hora de um dia (artefato do build)."""
+    write_frame_atomic(hour_stats(load_signals_frame(inputs[0])), outputs[0])
+
+
+@dataclass
+class HistoryStats:
+    """Estatísticas por hora em arrays dias x 24."""
+    days: List[str]
+    total: np.ndarray
+    first_attempt: np.ndarray
+    g1: np.ndarray
+    g2: np.ndarray
+    stops: np.ndarray
+    martingale_pnl: np.ndarray
+    infinity_pnl: np.ndarray
+
+    @classmethod
+    def from_frame(cls, stats: pd.DataFrame) -> 'HistoryStats':
+        """Monta os arrays a partir de linhas de `hour_stats` (dias em ordem)."""
+        stats = stats.drop_duplicates(['date', 'hour'], keep='first')
+        days = sorted(stats['date'].astype(str).unique())
+        row = pd.Index(days).get_indexer(stats['date'].astype(str))
+        hour = stats['hour'].astype(int).to_numpy()
+
+        arrays = {}
+        for column in HOUR_STATS_COLUMNS[2:]:
+            dtype = np.float64 if column.endswith('_pnl') else np.int64
+            matrix = np.zeros((len(days), 24), dtype=dtype)
+            matrix[row, hour] = stats[column].to_numpy(dtype=dtype)
+            arrays[column] = matrix
+        return cls(days=days, **arrays)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def select(self, rows: slice) -> 'HistoryStats':
+        """Subconjunto de dias."""
+        return HistoryStats(self.days[rows], *(getattr(self, name)[rows] for name in HOUR_STATS_COLUMNS[2:]))
+
+    def split(self, holdout: float) -> Tuple['HistoryStats', 'HistoryStats']:
+        """Divide em (dentro da amostra, fora da amostra) pela ordem dos dias."""
+        cut = len(self) - int(round(len(self) * holdout))
+        if holdout > 0 and len(self) > 1:
+            cut = min(max(cut, 1), len(self) - 1)
+        return self.select(slice(0, cut)), self.select(slice(cut, None))
+
+
+# ----------------------------------------------------------------------
+# Avaliação de um conjunto de critérios
+# ----------------------------------------------------------------------
+
+def simulate_days(history: HistoryStats, thresholds: Dict[str, float],
+                  start_hour: int = 17, end_hour: int = 23) -> Dict[str, float]:
+    """
+    Simula todos os dias com um conjunto de critérios.
+
+    Returns:
+        Métricas: pnl, pnl_per_day, worst_day, target_days, stop_days, hours_traded
+    """
+    days = len(history)
+    if days == 0:
+        return {'pnl': 0.0, 'pnl_per_day': 0.0, 'worst_day': 0.0,
+                'target_days': 0, 'stop_days': 0, 'hours_traded': 0}
+
+    rates = compute_rates(history.total, history.first_attempt, history.g1, history.g2, history.stops)
+    codes, confidence = recommend_arrays(history.total, rates['first_rate'], rates['g1_rate'],
+                                         rates['g2_stop_rate'], thresholds)
+    analyzable = history.total >= MIN_ANALYSIS_SIGNALS
+
+    current = np.full(days, NO_STRATEGY)
+    active = np.ones(days, dtype=bool)
+    pnl = np.zeros(days)
+    martingale_losses = np.zeros(days, dtype=np.int64)
+    hours_traded = np.zeros(days, dtype=np.int64)
+    target_hit = np.zeros(days, dtype=bool)
+    stopped = np.zeros(days, dtype=bool)
+
+    for hour in range(start_hour, end_hour + 1):
+        # Análise da hora anterior (XX:59) decide a estratégia desta hora
+        reference = hour - 1
+        if reference >= 0:
+            recommended = codes[:, reference]
+            change = analyzable[:, reference] & (
+                (current == NO_STRATEGY) |
+                ((recommended != current) & (confidence[:, reference] >= thresholds['confidence_threshold']))
+            )
+            current = np.where(change, recommended, current)
+
+        martingale = active & (current == MARTINGALE_CODE) & (martingale_losses < MARTINGALE_DAILY_LOSSES)
+        infinity = active & (current == INFINITY_CODE)
+        traded = (martingale | infinity) & (history.total[:, hour] > 0)
+
+        hour_pnl = (np.where(martingale, history.martingale_pnl[:, hour], 0.0) +
+                    np.where(infinity, history.infinity_pnl[:, hour], 0.0))
+        martingale_losses += martingale & (hour_pnl < 0)
+        pnl += hour_pnl
+        hours_traded += traded
+
+        # Condições de parada (verificadas após cada hora operada)
+        target = traded & (pnl >= DAILY_TARGET)
+        stop = traded & ~target & (
+            (martingale & (martingale_losses >= MARTINGALE_DAILY_LOSSES)) |
+            (infinity & (pnl <= INFINITY_STOP))
+        )
+        target_hit |= target
+        stopped |= stop
+        active &= ~(target | stop)
+
+    return {
+        'pnl': float(pnl.sum()),
+        'pnl_per_day': float(pnl.mean()),
+        'worst_day': float(pnl.min()),
+        'target_days': int(target_hit.sum()),
+        'stop_days': int(stopped.sum()),
+        'hours_traded': int(hours_traded.sum()),
+    }
+
+
+# ----------------------------------------------------------------------
+# Busca
+# ----------------------------------------------------------------------
+
+def grid_candidates(grid: Dict[str, Sequence[float]] = PARAMETER_GRID) -> List[Dict[str, float]]:
+    """Todas as combinações da grade."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def random_candidates(samples: int, grid: Dict[str, Sequence[float]] = PARAMETER_GRID,
+                      seed: Optional[int] = None) -> List[Dict[str, float]]:
+    """Amostras uniformes dentro do intervalo (mín, máx) de cada parâmetro da grade."""
+    rng = np.random.default_rng(seed)
+    candidates = []
+    for _ in range(samples):
+        candidate = {}
+        for name, values in grid.items():
+            low, high = min(values), max(values)
+            if all(isinstance(v, int) for v in values):
+                candidate[name] = int(rng.integers(low, high + 1))
+            else:
+                candidate[name] = round(float(rng.uniform(low, high)), 1)
+        candidates.append(candidate)
+    return candidates
+
+
+# Estado de cada processo do pool (evita reenviar o histórico a cada lote)
+_WORKER: Dict[str, object] = {}
+
+
+def _init_worker(in_sample: HistoryStats, out_of_sample: HistoryStats, start_hour: int, end_hour: int) -> None:
+    _WORKER.update(in_sample=in_sample, out_of_sample=out_of_sample, hours=(start_hour, end_hour))
+
+
+def _evaluate_chunk(candidates: List[Dict[str, float]]) -> List[Dict[str, float]]:
+    """Avalia um lote de candidatos dentro e fora da amostra."""
+    rows = []
+    start_hour, end_hour = _WORKER['hours']
+    for candidate in candidates:
+        row = dict(candidate)
+        for prefix, key in (('is', 'in_sample'), ('oos', 'out_of_sample')):
+            metrics = simulate_days(_WORKER[key], candidate, start_hour, end_hour)
+            row.update({f"{prefix}_{name}": value for name, value in metrics.items()})
+        rows.append(row)
+    return rows
+
+
+def optimize(history: HistoryStats, candidates: Iterable[Dict[str, float]], holdout: float = 0.3,
+             jobs: Optional[int] = None, start_hour: int = 17, end_hour: int = 23,
+             chunk_size: int = 64) -> pd.DataFrame:
+    """
+    Avalia os candidatos em paralelo e ordena pelo P&L dentro da amostra.
+
+    Os últimos `holdout` dos dias ficam fora da amostra: a ordem usa só os
+    primeiros, e as colunas oos_* mostram como cada conjunto se saiu depois.
+    Os critérios atuais (DECISION_THRESHOLDS) entram sempre, marcados em
+    `baseline`.
+
+    Returns:
+        DataFrame com os parâmetros e as métricas is_*/oos_*, já ordenado
+    """
+    in_sample, out_of_sample = history.split(holdout)
+    baseline = dict(DECISION_THRESHOLDS)
+    candidates = [baseline] + [c for c in candidates if c != baseline]
+    chunks = [candidates[i:i + chunk_size] for i in range(0, len(candidates), chunk_size)]
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        _init_worker(in_sample, out_of_sample, start_hour, end_hour)
+        results = [_evaluate_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(in_sample, out_of_sample, start_hour, end_hour)) as pool:
+            results = list(pool.map(_evaluate_chunk, chunks))
+
+    table = pd.DataFrame([row for chunk in results for row in chunk])
+    table['baseline'] = [True] + [False] * (len(table) - 1)
+    table = table.sort_values(['is_pnl', 'is_worst_day', 'oos_pnl'], ascending=False, kind='stable')
+    table.insert(0, 'rank', range(1, len(table) + 1))
+    return table.reset_index(drop=True)
@@ -3,9 +3,13 @@ Sistema de armazenamento para CSV e PostgreSQL
 """
 
 import os
+import re
+import gzip
+import hashlib
 import logging
-from datetime import datetime
-from typing import List, Optional
+from datetime import date as date_type, datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
 import pandas as pd
 import psycopg2
 from psycopg2.extras import RealDictCursor
@@ -13,9 +17,64 @@ from psycopg2 import sql
 
 from .config import Config
 from .parser import Signal
+from .loader import (
+    ATTEMPT_NULL, ID_COLUMNS, RESULT_WIN, SIGNAL_COLUMNS, TIMESTAMP_FORMAT,
+    combine_signal_frames, load_signals_frame, frame_to_signals, to_storage_frame
+)
+from .catalog import DataCatalog, ROLE_LIVE, write_frame_atomic
+from .binlog import BinaryLog
+from .query import SignalQuery
+from .compression import existing_path
+from .dedup import SignalDeduper
 
 logger = logging.getLogger(__name__)
 
+# Partições mensais: signals_y2025m06
+PARTITION_NAME_RE = re.compile(r'^signals_y(\d{4})m(\d{2})$')
+
+
+class _CsvAppender:
+    """
+    CSV do dia aberto para append.
+    
+    Mantém o checksum e o resumo do catálogo (rows, min_ts, max_ts, sorted)
+    atualizados a cada linha, para registrar o arquivo sem relê-lo.
+    """
+    
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.digest = hashlib.sha256()
+        self.summary: Dict[str, object] = {'rows': 0, 'min_ts': None, 'max_ts': None, 'sorted': True}
+        
+        if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
+            with open(filepath, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    self.digest.update(chunk)
+            timestamps = load_signals_frame(filepath)['timestamp']
+            self.summary['rows'] = len(timestamps)
+            if len(timestamps):
+                self.summary['min_ts'] = timestamps.min().strftime(TIMESTAMP_FORMAT)
+                self.summary['max_ts'] = timestamps.max().strftime(TIMESTAMP_FORMAT)
+            self.summary['sorted'] = bool(timestamps.is_monotonic_increasing)
+        
+        self.file = open(filepath, 'a', newline='', encoding='utf-8')
+        if self.file.tell() == 0:
+            self._write(','.join(SIGNAL_COLUMNS + ID_COLUMNS) + '\n')
+    
+    def _write(self, line: str) -> None:
+        self.file.write(line)
+        self.digest.update(line.encode('utf-8'))
+    
+    def write_row(self, timestamp: str, line: str) -> None:
+        """Acrescenta uma linha de sinal (timestamp já no formato gravado)."""
+        self._write(line)
+        summary = self.summary
+        if summary['max_ts'] is not None and timestamp < summary['max_ts']:
+            summary['sorted'] = False
+        summary['rows'] += 1
+        summary['min_ts'] = min(summary['min_ts'] or timestamp, timestamp)
+        summary['max_ts'] = max(summary['max_ts'] or timestamp, timestamp)
+
 
 class Storage:
     """Classe para gerenciar armazenamento de sinais."""
@@ -23,6 +82,25 @@ class Storage:
     def __init__(self, config: Config):
         self.config = config
         self.timezone = config.timezone
+        
+        # Meses cujas partições já foram garantidas nesta instância
+        self._known_partitions: Set[Tuple[int, int]] = set()
+        
+        # Tabelas, índices e rollup já garantidos nesta instância (ver _ensure_schema)
+        self._schema_ready = False
+        self._partitioned = False
+        
+        # Manifesto dos arquivos de dados (data/catalog.json)
+        self.catalog = DataCatalog()
+        
+        # Log binário diário (data/binlog), usado pelo modo live
+        self.binlog = BinaryLog(timezone=self.timezone)
+        
+        # Consulta por intervalo sobre catálogo + log binário
+        self.signal_query = SignalQuery(self.catalog, self.binlog)
+        
+        # Arquivos CSV abertos para append (modo live com journal)
+        self._csv_appenders: Dict[str, _CsvAppender] = {}
     
     def save_to_csv(self, signals: List[Signal], date: Optional[datetime] = None) -> str:
         """
@@ -52,53 +130,303 @@ class Storage:
         # Criar diretório se não existir
         os.makedirs("data", exist_ok=True)
         
-        # Converter sinais para DataFrame
-        data = []
-        for signal in signals:
-            data.append({
-                'timestamp': signal.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                'asset': signal.asset,
-                'result': signal.result,
-                'attempt': signal.attempt
-            })
-        
-        df = pd.DataFrame(data)
+        # Converter sinais para DataFrame (colunas do loader)
+        df = pd.DataFrame({
+            'timestamp': pd.to_datetime([signal.timestamp.strftime(TIMESTAMP_FORMAT) for signal in signals],
+                                        format=TIMESTAMP_FORMAT),
+            'asset': [signal.asset for signal in signals],
+            'result': [signal.result for signal in signals],
+            'attempt': pd.array([signal.attempt or ATTEMPT_NULL for signal in signals], dtype='int8'),
+            'chat_id': pd.array([signal.chat_id for signal in signals], dtype='Int64'),
+            'message_id': pd.array([signal.message_id for signal in signals], dtype='Int64')
+        })
         
-        # Verificar se arquivo já existe
-        file_exists = os.path.exists(filepath)
+        # Verificar se arquivo já existe (puro ou compactado pela retenção)
+        existing_file = existing_path(filepath)
+        file_exists = existing_file is not None
+        if existing_file == Path(filepath):
+            # Append interrompido pode ter deixado meia linha no fim
+            self._discard_torn_line(filepath)
+            file_exists = os.path.getsize(filepath) > 0
         
         try:
             if file_exists:
-                # Carregar dados existentes
-                existing_df = pd.read_csv(filepath)
-                
-                # Combinar com novos dados
+                # Carregar dados existentes e combinar com os novos
+                existing_df = load_signals_frame(existing_file)[SIGNAL_COLUMNS + ID_COLUMNS]
                 combined_df = pd.concat([existing_df, df], ignore_index=True)
-                
-                # Remover duplicatas baseado em timestamp, asset, result
-                combined_df = combined_df.drop_duplicates(
-                    subset=['timestamp', 'asset', 'result'], 
-                    keep='first'
-                )
-                
-                # Ordenar por timestamp
-                combined_df = combined_df.sort_values('timestamp')
-                
-                # Salvar
-                combined_df.to_csv(filepath, index=False)
+            else:
+                combined_df = df
+            
+            # Remover duplicatas pelo id da mensagem (chave legada sem id)
+            combined_df = self._drop_duplicate_signals(combined_df)
+            
+            # Ordenar por timestamp
+            combined_df = combined_df.sort_values('timestamp', kind='stable')
+            
+            # Salvar
+            checksum = write_frame_atomic(to_storage_frame(combined_df, with_ids=True), filepath)
+            if file_exists and existing_file != Path(filepath):
+                # Dia voltou a receber dados: a versão compactada foi substituída
+                os.remove(existing_file)
+            if file_exists:
                 logger.info(f"Atualizado CSV: {filepath} ({len(combined_df)} registros)")
-                
             else:
-                # Salvar novo arquivo
-                df.to_csv(filepath, index=False)
-                logger.info(f"Criado CSV: {filepath} ({len(df)} registros)")
+                logger.info(f"Criado CSV: {filepath} ({len(combined_df)} registros)")
             
+            self._record_in_catalog(filepath, ROLE_LIVE, date, combined_df, checksum)
             return filepath
             
         except Exception as e:
             logger.error(f"Erro ao salvar CSV: {e}")
             raise
     
+    def _drop_duplicate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Mantém a primeira ocorrência de cada sinal (ver SignalDeduper)."""
+        deduper = SignalDeduper()
+        keep = [
+            deduper.add(
+                timestamp,
+                asset,
+                result,
+                None if pd.isna(chat_id) else int(chat_id),
+                None if pd.isna(message_id) else int(message_id)
+            )
+            for timestamp, asset, result, chat_id, message_id in zip(
+                df['timestamp'], df['asset'], df['result'], df['chat_id'], df['message_id']
+            )
+        ]
+        return df[keep]
+    
+    def append_to_csv(self, signals: List[Signal]) -> int:
+        """
+        Acrescenta sinais ao CSV do dia sem reler o arquivo.
+        
+        Gravação bufferizada e sem deduplicação: a durabilidade vem do journal
+        do modo live (collector/journal.py), e sync_csv_appends() sincroniza e
+        fecha os arquivos. A entrada do catálogo é atualizada a cada chamada
+        (com checksum incremental), então leitores nunca veem um tamanho ou
+        checksum antigo para o arquivo do dia.
+        
+        Args:
+            signals: Lista de sinais
+            
+        Returns:
+            Número de linhas gravadas
+        """
+        os.makedirs("data", exist_ok=True)
+        
+        touched = {}
+        for signal in signals:
+            timestamp = signal.timestamp
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.astimezone(self.timezone)
+            
+            filepath = os.path.join("data", f"signals_{timestamp.strftime('%Y-%m-%d')}.csv")
+            appender = self._csv_appenders.get(filepath)
+            if appender is None:
+                self._prepare_csv_append(filepath)
+                appender = _CsvAppender(filepath)
+                self._csv_appenders[filepath] = appender
+            
+            timestamp_text = timestamp.strftime(TIMESTAMP_FORMAT)
+            attempt = '' if signal.attempt is None else str(signal.attempt)
+            chat_id = '' if signal.chat_id is None else str(signal.chat_id)
+            message_id = '' if signal.message_id is None else str(signal.message_id)
+            appender.write_row(timestamp_text, f"{timestamp_text},{signal.asset},{signal.result},{attempt},"
+                                               f"{chat_id},{message_id}\n")
+            touched[filepath] = appender
+        
+        for filepath, appender in touched.items():
+            appender.file.flush()
+            self._record_append(appender)
+        
+        return len(signals)
+    
+    def _record_append(self, appender: _CsvAppender) -> None:
+        """Registra o estado atual de um CSV em append no catálogo (sem relê-lo)."""
+        self._record_in_catalog(appender.filepath, ROLE_LIVE, None, None,
+                                appender.digest.hexdigest(), dict(appender.summary))
+    
+    def _prepare_csv_append(self, filepath: str) -> None:
+        """
+        Deixa o CSV do dia pronto para appends.
+        
+        Um CSV antigo (sem colunas de id) é regravado no formato atual, e um
+        dia compactado pela retenção volta a ser um CSV puro.
+        """
+        existing_file = existing_path(filepath)
+        if existing_file == Path(filepath):
+            self._discard_torn_line(filepath)
+        if existing_file is None or os.path.getsize(existing_file) == 0:
+            return
+        
+        if existing_file == Path(filepath):
+            with open(filepath, 'r', newline='') as f:
+                header = f.readline().strip().split(',')
+            if all(column in header for column in ID_COLUMNS):
+                return
+        
+        write_frame_atomic(to_storage_frame(load_signals_frame(existing_file), with_ids=True), filepath)
+        if existing_file != Path(filepath):
+            os.remove(existing_file)
+        logger.info(f"CSV preparado para append: {filepath}")
+    
+    def _discard_torn_line(self, filepath: str) -> None:
+        """
+        Descarta a última linha incompleta de um CSV (append interrompido).
+        
+        A linha nunca foi sincronizada, então o sinal dela continua no journal
+        e volta na reaplicação.
+        """
+        with open(filepath, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            if end == 0:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b'\n':
+                return
+            
+            # Voltar em blocos até a última quebra de linha
+            position = end
+            while position > 0:
+                start = max(0, position - 4096)
+                f.seek(start)
+                chunk = f.read(position - start)
+                newline = chunk.rfind(b'\n')
+                if newline >= 0:
+                    position = start + newline + 1
+                    break
+                position = start
+            
+            f.truncate(position)
+            os.fsync(f.fileno())
+        logger.warning(f"Linha incompleta descartada em {filepath} ({end - position} bytes)")
+    
+    def sync_csv_appends(self) -> None:
+        """Sincroniza (fsync), fecha e registra no catálogo os CSVs abertos para append."""
+        for filepath, appender in list(self._csv_appenders.items()):
+            try:
+                appender.file.flush()
+                os.fsync(appender.file.fileno())
+                appender.file.close()
+                self._record_append(appender)
+            except Exception as e:
+                logger.error(f"Erro ao sincronizar CSV {filepath}: {e}")
+            finally:
+                self._csv_appenders.pop(filepath, None)
+    
+    def recover_signals(self, signals: List[Signal], export_format: str = 'csv') -> None:
+        """
+        Regrava sinais recuperados do journal (idempotente).
+        
+        CSV e PostgreSQL já ignoram duplicatas; no log binário só entram os
+        sinais ainda ausentes do arquivo do dia (mesma regra do SignalDeduper,
+        com o epoch como timestamp). Uma falha no log binário é repassada,
+        e o journal não é truncado.
+        
+        Args:
+            signals: Sinais recuperados
+            export_format: Formato ('csv', 'pg', ou 'both')
+        """
+        if not signals:
+            return
+        
+        self.save_signals(signals, export_format)
+        
+        if self.config.binlog_enabled:
+            # O log binário não guarda chat_id: ids comparados só pela mensagem
+            seen = SignalDeduper()
+            names = self.binlog.registry.names()
+            for day in {signal.timestamp.astimezone(self.timezone).date() for signal in signals}:
+                records = self.binlog.read_day(day)
+                for epoch, asset, result, message_id in zip(
+                    records['epoch'].tolist(), names[records['asset']].tolist(),
+                    records['result'].tolist(), records['message_id'].tolist()
+                ):
+                    seen.add(epoch, asset, 'W' if result == RESULT_WIN else 'L', None, message_id or None)
+            
+            missing = [
+                signal for signal in signals
+                if seen.add(int(signal.timestamp.timestamp()), signal.asset, signal.result, None, signal.message_id)
+            ]
+            self.save_to_binlog(missing)
+    
+    def save_to_binlog(self, signals: List[Signal]) -> int:
+        """
+        Acrescenta sinais ao log binário diário.
+        
+        Args:
+            signals: Lista de sinais
+            
+        Returns:
+            Número de registros gravados (0 se desativado)
+            
+        Raises:
+            OSError: Falha de gravação; o modo live conta o lote como falho
+                e mantém o journal para reaplicação
+        """
+        if not self.config.binlog_enabled or not signals:
+            return 0
+        
+        try:
+            return self.binlog.append(signals)
+        except Exception as e:
+            logger.error(f"Erro ao gravar log binário: {e}")
+            raise
+    
+    def load_from_binlog(self, date: Union[date_type, datetime]) -> List[Signal]:
+        """
+        Carrega os sinais de um dia do log binário (leitura via mmap).
+        
+        Args:
+            date: Data local
+            
+        Returns:
+            Lista de sinais (vazia se o dia não tiver log)
+        """
+        return self.binlog.to_signals(self.binlog.read_day(date))
+    
+    def query(
+        self,
+        start: Union[date_type, datetime],
+        end: Union[date_type, datetime],
+        assets: Optional[List[str]] = None,
+        results: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Sinais de um intervalo de tempo, em qualquer dia armazenado.
+        
+        Lê só os arquivos e trechos necessários (ver collector/query.py).
+        
+        Args:
+            start: Início (datetime com ou sem fuso; data = 00:00)
+            end: Fim, inclusive (data = 23:59:59)
+            assets: Filtrar por ativos
+            results: Filtrar por resultado ('W', 'L')
+            
+        Returns:
+            DataFrame no formato de load_signals_frame
+        """
+        return self.signal_query.frame(start, end, assets, results)
+    
+    def iter_query(
+        self,
+        start: Union[date_type, datetime],
+        end: Union[date_type, datetime],
+        assets: Optional[List[str]] = None,
+        results: Optional[List[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """Como query, mas em streaming: um DataFrame por dia."""
+        return self.signal_query.iter_frames(start, end, assets, results)
+    
+    def _record_in_catalog(self, filepath: str, role: str, date, frame: Optional[pd.DataFrame],
+                           checksum: Optional[str] = None, summary: Optional[Dict[str, object]] = None) -> None:
+        """Registra um arquivo gravado no manifesto (falhas não interrompem a gravação)."""
+        try:
+            self.catalog.record(filepath, role, date, frame=frame, summary=summary, checksum=checksum)
+        except Exception as e:
+            logger.warning(f"Não foi possível atualizar o catálogo para {filepath}: {e}")
+    
     def save_to_postgres(self, signals: List[Signal]) -> int:
         """
         Salva sinais no PostgreSQL.
@@ -117,11 +445,16 @@ class Storage:
             logger.error("PostgreSQL não configurado")
             raise ValueError("PostgreSQL não configurado")
         
+        new_partitions: Set[Tuple[int, int]] = set()
         try:
             with psycopg2.connect(self.config.pg_dsn) as conn:
                 with conn.cursor() as cur:
-                    # Criar tabela se não existir
-                    self._create_table_if_not_exists(cur)
+                    # Criar tabela se não existir (uma vez por instância)
+                    partitioned = self._ensure_schema(cur)
+                    
+                    # Tabela particionada: garantir partições dos meses do lote
+                    if partitioned:
+                        new_partitions = self._ensure_partitions(cur, signals)
                     
                     # Preparar dados para inserção
                     insert_data = []
@@ -130,16 +463,18 @@ class Storage:
                             signal.timestamp,
                             signal.asset,
                             signal.result,
-                            signal.attempt
+                            signal.attempt,
+                            signal.chat_id,
+                            signal.message_id
                         ))
                     
-                    # Inserção em lote com ON CONFLICT
+                    # Inserção em lote: qualquer chave única já existente
+                    # (id da mensagem ou chave legada) ignora a linha
                     insert_query = """
-                        INSERT INTO signals (timestamp, asset, result, attempt)
+                        INSERT INTO signals (timestamp, asset, result, attempt, chat_id, message_id)
                         VALUES %s
-                        ON CONFLICT (timestamp, asset, result, attempt) 
-                        DO NOTHING
-                        RETURNING id
+                        ON CONFLICT DO NOTHING
+                        RETURNING timestamp, asset, result, attempt
                     """
                     
                     # Usar execute_values para inserção em lote
@@ -157,41 +492,477 @@ class Storage:
                     
                     inserted_count = len(result) if result else 0
                     
+                    # Rollup horário na mesma transação (apenas linhas novas)
+                    if result:
+                        self._update_hourly_rollup(cur, result)
+                    
                     cur.execute("COMMIT")
                     
+                    # Esquema e partições só entram no cache depois do commit
+                    self._schema_ready, self._partitioned = True, partitioned
+                    self._known_partitions |= new_partitions
+                    
                     logger.info(f"Inseridos {inserted_count} novos registros no PostgreSQL")
                     return inserted_count
                     
         except Exception as e:
+            # O rollback desfaz também os CREATE TABLE das partições do lote
+            self._known_partitions -= new_partitions
             logger.error(f"Erro ao salvar no PostgreSQL: {e}")
             raise
     
+    def _ensure_schema(self, cursor) -> bool:
+        """
+        Garante tabelas e índices só no primeiro lote da instância.
+        
+        A verificação completa (consultas ao catálogo, migrações, CREATE
+        UNIQUE INDEX) bloquearia inserções concorrentes e custaria várias
+        idas ao servidor a cada lote do group commit. O chamador marca
+        `_schema_ready` depois do commit.
+        
+        Returns:
+            True se a tabela de sinais é particionada
+        """
+        if self._schema_ready:
+            return self._partitioned
+        
+        self._create_table_if_not_exists(cursor)
+        return self._is_partitioned(cursor)
+    
     def _create_table_if_not_exists(self, cursor) -> None:
-        """Cria tabela de sinais se não existir."""
-        create_table_query = """
+        """Cria tabela de sinais (e rollup horário) se não existir."""
+        cursor.execute("SELECT to_regclass('signals') IS NULL")
+        signals_missing = cursor.fetchone()[0]
+        
+        if self.config.pg_partitioned:
+            self._create_partitioned_table(cursor)
+        else:
+            create_table_query = """
+                CREATE TABLE IF NOT EXISTS signals (
+                    id SERIAL PRIMARY KEY,
+                    timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+                    asset VARCHAR(20) NOT NULL,
+                    result CHAR(1) NOT NULL CHECK (result IN ('W', 'L')),
+                    attempt INTEGER CHECK (attempt IN (1, 2, 3)),
+                    chat_id BIGINT,
+                    message_id BIGINT,
+                    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                )
+            """
+            
+            cursor.execute(create_table_query)
+            
+            # Criar índices se não existirem
+            indexes = [
+                "CREATE INDEX IF NOT EXISTS idx_signals_timestamp ON signals(timestamp)",
+                "CREATE INDEX IF NOT EXISTS idx_signals_asset ON signals(asset)",
+                "CREATE INDEX IF NOT EXISTS idx_signals_result ON signals(result)"
+            ]
+            
+            for index_query in indexes:
+                cursor.execute(index_query)
+        
+        self._ensure_message_key(cursor, signals_missing)
+        
+        # Rollup horário: se a tabela for nova, popular a partir do histórico
+        cursor.execute("SELECT to_regclass('signal_hourly') IS NULL")
+        rollup_missing = cursor.fetchone()[0]
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS signal_hourly (
+                local_date DATE NOT NULL,
+                hour SMALLINT NOT NULL CHECK (hour BETWEEN 0 AND 23),
+                asset VARCHAR(20) NOT NULL,
+                total INTEGER NOT NULL DEFAULT 0,
+                first_wins INTEGER NOT NULL DEFAULT 0,
+                g1_wins INTEGER NOT NULL DEFAULT 0,
+                g2_wins INTEGER NOT NULL DEFAULT 0,
+                stops INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (local_date, hour, asset)
+            )
+        """)
+        
+        if rollup_missing:
+            self._rebuild_hourly_rollup(cursor)
+    
+    def _create_partitioned_table(self, cursor) -> None:
+        """Cria a tabela de sinais particionada por mês (RANGE em timestamp)."""
+        cursor.execute("""
             CREATE TABLE IF NOT EXISTS signals (
-                id SERIAL PRIMARY KEY,
+                id BIGSERIAL,
                 timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
                 asset VARCHAR(20) NOT NULL,
                 result CHAR(1) NOT NULL CHECK (result IN ('W', 'L')),
                 attempt INTEGER CHECK (attempt IN (1, 2, 3)),
+                chat_id BIGINT,
+                message_id BIGINT,
                 created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(timestamp, asset, result, attempt)
-            )
-        """
+                PRIMARY KEY (id, timestamp)
+            ) PARTITION BY RANGE (timestamp)
+        """)
         
-        cursor.execute(create_table_query)
+        if not self._is_partitioned(cursor):
+            logger.warning("PG_PARTITIONED ativo, mas a tabela 'signals' já existe sem partições; "
+                           "mantendo a tabela atual")
+            return
         
-        # Criar índices se não existirem
+        # BRIN: índice minúsculo para dados inseridos em ordem de tempo
         indexes = [
-            "CREATE INDEX IF NOT EXISTS idx_signals_timestamp ON signals(timestamp)",
-            "CREATE INDEX IF NOT EXISTS idx_signals_asset ON signals(asset)",
-            "CREATE INDEX IF NOT EXISTS idx_signals_result ON signals(result)"
+            "CREATE INDEX IF NOT EXISTS idx_signals_timestamp_brin ON signals USING BRIN (timestamp)",
+            "CREATE INDEX IF NOT EXISTS idx_signals_asset ON signals(asset)"
         ]
         
         for index_query in indexes:
             cursor.execute(index_query)
     
+    def _ensure_message_key(self, cursor, new_table: bool) -> None:
+        """
+        Garante as colunas chat_id/message_id e as chaves de deduplicação.
+        
+        A identidade de um sinal é a mensagem de origem (timestamp entra na
+        chave porque as chaves únicas de tabelas particionadas precisam da
+        coluna de partição; chat_id desconhecido vale 0, já que NULLs nunca
+        colidem). A chave antiga (timestamp, asset, result, attempt) vale
+        apenas para linhas sem id: em tabelas criadas antes dos ids, a UNIQUE
+        original é trocada pelo índice parcial assim que a chave da mensagem
+        existe (senão duas mensagens com a mesma chave antiga continuariam
+        sendo descartadas).
+        """
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.columns
+            WHERE table_name = 'signals' AND column_name IN ('chat_id', 'message_id')
+        """)
+        if cursor.fetchone()[0] < 2:
+            cursor.execute("ALTER TABLE signals ADD COLUMN IF NOT EXISTS chat_id BIGINT")
+            cursor.execute("ALTER TABLE signals ADD COLUMN IF NOT EXISTS message_id BIGINT")
+            logger.info("Colunas chat_id/message_id adicionadas à tabela 'signals'")
+        
+        # Versões anteriores: chave da mensagem sem COALESCE e chave legada só com (timestamp, asset)
+        cursor.execute("SELECT to_regclass('idx_signals_legacy_key') IS NOT NULL")
+        had_short_legacy_key = cursor.fetchone()[0]
+        cursor.execute("DROP INDEX IF EXISTS idx_signals_message")
+        cursor.execute("DROP INDEX IF EXISTS idx_signals_legacy_key")
+        
+        has_message_key = self._create_unique_index(
+            cursor, "idx_signals_message_key",
+            "ON signals ((COALESCE(chat_id, 0)), message_id, timestamp)"
+        )
+        
+        old_constraints = self._legacy_unique_constraints(cursor) if has_message_key else []
+        if new_table or had_short_legacy_key or old_constraints:
+            has_legacy_key = self._create_unique_index(
+                cursor, "idx_signals_legacy",
+                "ON signals (timestamp, asset, result, attempt) WHERE message_id IS NULL"
+            )
+            
+            # Migração única: a UNIQUE de toda a tabela vira o índice parcial
+            if has_legacy_key:
+                for name in old_constraints:
+                    cursor.execute(sql.SQL("ALTER TABLE signals DROP CONSTRAINT {}").format(sql.Identifier(name)))
+                    logger.info(f"Restrição {name} substituída por idx_signals_legacy (só linhas sem message_id)")
+    
+    def _legacy_unique_constraints(self, cursor) -> List[str]:
+        """Restrições UNIQUE(timestamp, asset, result, attempt) de versões anteriores da tabela."""
+        cursor.execute("""
+            SELECT con.conname
+            FROM pg_constraint con
+            WHERE con.conrelid = to_regclass('signals') AND con.contype = 'u'
+              AND ARRAY(
+                  SELECT att.attname::text
+                  FROM unnest(con.conkey) WITH ORDINALITY AS k(attnum, position)
+                  JOIN pg_attribute att ON att.attrelid = con.conrelid AND att.attnum = k.attnum
+                  ORDER BY k.position
+              ) = ARRAY['timestamp', 'asset', 'result', 'attempt']
+        """)
+        return [row[0] for row in cursor.fetchall()]
+    
+    def _create_unique_index(self, cursor, name: str, definition: str) -> bool:
+        """
+        Cria um índice único; se já houver duplicatas gravadas, avisa e segue sem ele.
+        
+        Args:
+            cursor: Cursor da transação
+            name: Nome do índice
+            definition: Trecho após o nome ("ON tabela (colunas) ...")
+            
+        Returns:
+            True se o índice existe ao final
+        """
+        cursor.execute("SAVEPOINT unique_index")
+        try:
+            cursor.execute(sql.SQL("CREATE UNIQUE INDEX IF NOT EXISTS {} ").format(sql.Identifier(name))
+                           + sql.SQL(definition))
+            created = True
+        except psycopg2.IntegrityError as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT unique_index")
+            logger.warning(f"Índice {name} não criado (duplicatas existentes): {e}")
+            created = False
+        cursor.execute("RELEASE SAVEPOINT unique_index")
+        return created
+    
+    def _is_partitioned(self, cursor) -> bool:
+        """Verifica se a tabela 'signals' é particionada."""
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('signals')")
+        row = cursor.fetchone()
+        return bool(row) and row[0] == 'p'
+    
+    def _month_bounds(self, year: int, month: int) -> Tuple[datetime, datetime]:
+        """Retorna início e fim (exclusivo) de um mês no timezone local."""
+        start = self.timezone.localize(datetime(year, month, 1))
+        if month == 12:
+            end = self.timezone.localize(datetime(year + 1, 1, 1))
+        else:
+            end = self.timezone.localize(datetime(year, month + 1, 1))
+        return start, end
+    
+    def _ensure_partitions(self, cursor, signals: List[Signal]) -> Set[Tuple[int, int]]:
+        """
+        Cria as partições mensais necessárias para um lote de sinais.
+        
+        Args:
+            cursor: Cursor da transação de inserção
+            signals: Sinais que serão inseridos
+            
+        Returns:
+            Meses (ano, mês) verificados nesta transação; o chamador os
+            adiciona ao cache depois do commit
+        """
+        months = set()
+        for signal in signals:
+            local_ts = signal.timestamp
+            if local_ts.tzinfo is None:
+                local_ts = self.timezone.localize(local_ts)
+            local_ts = local_ts.astimezone(self.timezone)
+            months.add((local_ts.year, local_ts.month))
+        
+        missing = months - self._known_partitions
+        for year, month in sorted(missing):
+            start, end = self._month_bounds(year, month)
+            cursor.execute(
+                sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF signals FOR VALUES FROM (%s) TO (%s)").format(
+                    sql.Identifier(f"signals_y{year:04d}m{month:02d}")
+                ),
+                (start, end)
+            )
+        return missing
+    
+    def list_partitions(self) -> List[Dict[str, object]]:
+        """
+        Lista as partições mensais da tabela de sinais.
+        
+        Returns:
+            Lista de dicionários com name, start, end e rows (estimativa)
+        """
+        if not self.config.has_postgres:
+            logger.error("PostgreSQL não configurado")
+            return []
+        
+        with psycopg2.connect(self.config.pg_dsn) as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT c.relname, c.reltuples::bigint
+                    FROM pg_inherits i
+                    JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = to_regclass('signals')
+                    ORDER BY c.relname
+                """)
+                rows = cur.fetchall()
+        
+        partitions = []
+        for name, estimated_rows in rows:
+            match = PARTITION_NAME_RE.match(name)
+            if not match:
+                continue
+            start, end = self._month_bounds(int(match.group(1)), int(match.group(2)))
+            partitions.append({
+                'name': name,
+                'start': start,
+                'end': end,
+                'rows': max(0, estimated_rows)
+            })
+        
+        return partitions
+    
+    def detach_partitions_before(
+        self,
+        cutoff: date_type,
+        archive_dir: Optional[str] = None,
+        drop: bool = False
+    ) -> List[str]:
+        """
+        Desanexa partições de meses que terminam antes de `cutoff`.
+        
+        O rollup horário (signal_hourly) é mantido, então as estatísticas
+        desses meses continuam disponíveis.
+        
+        Args:
+            cutoff: Data limite; meses inteiramente anteriores são desanexados
+            archive_dir: Se informado, exporta cada partição para CSV gzip
+            drop: Se True, remove a partição após desanexar (e arquivar)
+            
+        Returns:
+            Nomes das partições processadas
+        """
+        if not self.config.has_postgres:
+            raise ValueError("PostgreSQL não configurado")
+        
+        if isinstance(cutoff, datetime):
+            cutoff = cutoff.date()
+        
+        old_partitions = [
+            p for p in self.list_partitions()
+            if p['end'].date() <= cutoff
+        ]
+        
+        if archive_dir:
+            os.makedirs(archive_dir, exist_ok=True)
+        
+        processed = []
+        with psycopg2.connect(self.config.pg_dsn) as conn:
+            with conn.cursor() as cur:
+                for partition in old_partitions:
+                    name = partition['name']
+                    
+                    cur.execute(sql.SQL("ALTER TABLE signals DETACH PARTITION {}").format(sql.Identifier(name)))
+                    self._known_partitions.discard((partition['start'].year, partition['start'].month))
+                    
+                    if archive_dir:
+                        archive_path = os.path.join(archive_dir, f"{name}.csv.gz")
+                        with gzip.open(archive_path, 'wt', encoding='utf-8') as f:
+                            cur.copy_expert(
+                                sql.SQL("COPY (SELECT timestamp, asset, result, attempt, chat_id, message_id FROM {} "
+                                        "ORDER BY timestamp) TO STDOUT WITH CSV HEADER").format(sql.Identifier(name)),
+                                f
+                            )
+                        logger.info(f"Partição {name} arquivada em {archive_path}")
+                    
+                    if drop:
+                        cur.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(name)))
+                    
+                    logger.info(f"Partição {name} desanexada{' e removida' if drop else ''}")
+                    processed.append(name)
+        
+        return processed
+    
+    def _update_hourly_rollup(self, cursor, rows: List[tuple]) -> None:
+        """
+        Soma as linhas recém-inseridas ao rollup horário.
+        
+        Args:
+            cursor: Cursor da transação de inserção
+            rows: Tuplas (timestamp, asset, result, attempt) inseridas
+        """
+        counts = {}
+        for timestamp, asset, result, attempt in rows:
+            local_ts = timestamp.astimezone(self.timezone)
+            key = (local_ts.date(), local_ts.hour, asset)
+            # total, 1ª tentativa, G1, G2, STOP
+            bucket = counts.setdefault(key, [0, 0, 0, 0, 0])
+            bucket[0] += 1
+            if result == 'L':
+                bucket[4] += 1
+            elif attempt in (1, 2, 3):
+                bucket[attempt] += 1
+        
+        from psycopg2.extras import execute_values
+        execute_values(
+            cursor,
+            """
+                INSERT INTO signal_hourly
+                    (local_date, hour, asset, total, first_wins, g1_wins, g2_wins, stops)
+                VALUES %s
+                ON CONFLICT (local_date, hour, asset) DO UPDATE SET
+                    total = signal_hourly.total + EXCLUDED.total,
+                    first_wins = signal_hourly.first_wins + EXCLUDED.first_wins,
+                    g1_wins = signal_hourly.g1_wins + EXCLUDED.g1_wins,
+                    g2_wins = signal_hourly.g2_wins + EXCLUDED.g2_wins,
+                    stops = signal_hourly.stops + EXCLUDED.stops
+            """,
+            [key + tuple(values) for key, values in counts.items()],
+            page_size=100
+        )
+    
+    def _rebuild_hourly_rollup(self, cursor) -> None:
+        """Recalcula o rollup horário inteiro a partir da tabela de sinais."""
+        cursor.execute("TRUNCATE signal_hourly")
+        cursor.execute("""
+            INSERT INTO signal_hourly
+                (local_date, hour, asset, total, first_wins, g1_wins, g2_wins, stops)
+            SELECT
+                (timestamp AT TIME ZONE %(tz)s)::date,
+                EXTRACT(HOUR FROM timestamp AT TIME ZONE %(tz)s)::smallint,
+                asset,
+                COUNT(*),
+                COUNT(*) FILTER (WHERE result = 'W' AND attempt = 1),
+                COUNT(*) FILTER (WHERE result = 'W' AND attempt = 2),
+                COUNT(*) FILTER (WHERE result = 'W' AND attempt = 3),
+                COUNT(*) FILTER (WHERE result = 'L')
+            FROM signals
+            GROUP BY 1, 2, 3
+        """, {'tz': self.timezone.zone})
+        logger.info("Rollup horário (signal_hourly) recalculado")
+    
+    def rebuild_hourly_rollup(self) -> None:
+        """Recalcula o rollup horário (ex.: após importar dados manualmente)."""
+        if not self.config.has_postgres:
+            raise ValueError("PostgreSQL não configurado")
+        
+        with psycopg2.connect(self.config.pg_dsn) as conn:
+            with conn.cursor() as cur:
+                self._create_table_if_not_exists(cur)
+                self._rebuild_hourly_rollup(cur)
+    
+    def hourly_stats(
+        self,
+        start_date: date_type,
+        end_date: date_type,
+        assets: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Lê contagens por (data local, hora, ativo) do rollup horário.
+        
+        Args:
+            start_date: Data local inicial (inclusiva)
+            end_date: Data local final (inclusiva)
+            assets: Filtrar apenas estes ativos (opcional)
+            
+        Returns:
+            DataFrame com local_date, hour, asset, total, first_wins,
+            g1_wins, g2_wins e stops
+        """
+        columns = ['local_date', 'hour', 'asset', 'total',
+                   'first_wins', 'g1_wins', 'g2_wins', 'stops']
+        
+        if not self.config.has_postgres:
+            logger.error("PostgreSQL não configurado")
+            return pd.DataFrame(columns=columns)
+        
+        if isinstance(start_date, datetime):
+            start_date = start_date.date()
+        if isinstance(end_date, datetime):
+            end_date = end_date.date()
+        
+        query = f"""
+            SELECT {', '.join(columns)}
+            FROM signal_hourly
+            WHERE local_date BETWEEN %s AND %s
+        """
+        params = [start_date, end_date]
+        if assets:
+            query += " AND asset = ANY(%s)"
+            params.append(list(assets))
+        query += " ORDER BY local_date, hour, asset"
+        
+        try:
+            with psycopg2.connect(self.config.pg_dsn) as conn:
+                with conn.cursor() as cur:
+                    cur.execute(query, params)
+                    return pd.DataFrame.from_records(cur.fetchall(), columns=columns)
+                    
+        except Exception as e:
+            logger.error(f"Erro ao ler rollup horário: {e}")
+            return pd.DataFrame(columns=columns)
+    
     def load_from_postgres(self, start_date: datetime, end_date: datetime) -> List[Signal]:
         """
         Carrega sinais do PostgreSQL para um período.
@@ -208,38 +979,81 @@ class Storage:
             return []
         
         try:
-            with psycopg2.connect(self.config.pg_dsn) as conn:
-                with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                    query = """
-                        SELECT timestamp, asset, result, attempt
-                        FROM signals
-                        WHERE timestamp >= %s AND timestamp <= %s
-                        ORDER BY timestamp
-                    """
-                    
-                    cur.execute(query, (start_date, end_date))
-                    rows = cur.fetchall()
-                    
-                    signals = []
-                    for row in rows:
-                        signal = Signal(
-                            timestamp=row['timestamp'],
-                            asset=row['asset'],
-                            result=row['result'],
-                            attempt=row['attempt']
-                        )
-                        signals.append(signal)
-                    
-                    logger.info(f"Carregados {len(signals)} sinais do PostgreSQL")
-                    return signals
+            signals = []
+            for batch in self.iter_from_postgres(start_date, end_date):
+                signals.extend(batch)
+            
+            logger.info(f"Carregados {len(signals)} sinais do PostgreSQL")
+            return signals
                     
         except Exception as e:
             logger.error(f"Erro ao carregar do PostgreSQL: {e}")
             return []
     
+    def iter_from_postgres(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        itersize: Optional[int] = None,
+        as_frame: bool = False
+    ) -> Iterator[Union[List[Signal], pd.DataFrame]]:
+        """
+        Lê sinais do PostgreSQL em lotes usando um cursor do lado do servidor.
+        
+        A memória usada fica limitada a um lote, independente do tamanho do
+        período consultado.
+        
+        Args:
+            start_date: Data inicial
+            end_date: Data final
+            itersize: Linhas por lote (padrão: PG_ITERSIZE)
+            as_frame: Se True, produz DataFrames no formato de
+                load_signals_frame (timestamp local sem fuso, attempt int8 com
+                ATTEMPT_NULL) em vez de listas de Signal
+            
+        Yields:
+            Lotes de sinais (lista de Signal ou DataFrame)
+        """
+        if not self.config.has_postgres:
+            logger.error("PostgreSQL não configurado")
+            return
+        
+        itersize = itersize or self.config.pg_itersize
+        columns = ['timestamp', 'asset', 'result', 'attempt', 'chat_id', 'message_id']
+        
+        with psycopg2.connect(self.config.pg_dsn) as conn:
+            # Cursor nomeado = cursor do lado do servidor
+            with conn.cursor(name='signals_stream') as cur:
+                cur.itersize = itersize
+                cur.execute("""
+                    SELECT timestamp, asset, result, attempt, chat_id, message_id
+                    FROM signals
+                    WHERE timestamp >= %s AND timestamp <= %s
+                    ORDER BY timestamp
+                """, (start_date, end_date))
+                
+                while True:
+                    rows = cur.fetchmany(itersize)
+                    if not rows:
+                        break
+                    
+                    if as_frame:
+                        frame = pd.DataFrame.from_records(rows, columns=columns)
+                        frame['timestamp'] = (pd.to_datetime(frame['timestamp'], utc=True)
+                                              .dt.tz_convert(self.timezone).dt.tz_localize(None)
+                                              .astype('datetime64[ns]'))
+                        frame['attempt'] = frame['attempt'].fillna(ATTEMPT_NULL).astype('int8')
+                        yield combine_signal_frames([frame])
+                    else:
+                        yield [
+                            Signal(timestamp=ts, asset=asset, result=result, attempt=attempt,
+                                   message_id=message_id, chat_id=chat_id)
+                            for ts, asset, result, attempt, chat_id, message_id in rows
+                        ]
+    
     def load_from_csv(self, filepath: str) -> List[Signal]:
         """
-        Carrega sinais de arquivo CSV.
+        Carrega sinais de arquivo CSV (puro ou compactado pela retenção).
         
         Args:
             filepath: Caminho do arquivo CSV
@@ -247,34 +1061,13 @@ class Storage:
         Returns:
             Lista de sinais
         """
-        if not os.path.exists(filepath):
+        if existing_path(filepath) is None:
             logger.warning(f"Arquivo CSV não encontrado: {filepath}")
             return []
         
         try:
-            df = pd.read_csv(filepath)
-            
-            signals = []
-            for _, row in df.iterrows():
-                # Converter timestamp string para datetime
-                timestamp_str = row['timestamp']
-                timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
-                timestamp = self.timezone.localize(timestamp)
-                
-                # Converter attempt (pode ser NaN)
-                attempt = row['attempt']
-                if pd.isna(attempt):
-                    attempt = None
-                else:
-                    attempt = int(attempt)
-                
-                signal = Signal(
-                    timestamp=timestamp,
-                    asset=row['asset'],
-                    result=row['result'],
-                    attempt=attempt
-                )
-                signals.append(signal)
+            df = load_signals_frame(filepath)
+            signals = frame_to_signals(df, self.timezone)
             
             logger.info(f"Carregados {len(signals)} sinais do CSV: {filepath}")
             return signals
@@ -296,31 +1089,54 @@ class Storage:
         try:
             with psycopg2.connect(self.config.pg_dsn) as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                    # Estatísticas gerais
+                    # Somente leitura: tabelas são criadas pela primeira gravação
+                    cur.execute("""
+                        SELECT to_regclass('signals') IS NOT NULL AS has_signals,
+                               to_regclass('signal_hourly') IS NOT NULL AS has_rollup
+                    """)
+                    tables = cur.fetchone()
+                    if not tables['has_signals']:
+                        return {}
+                    if not tables['has_rollup']:
+                        return self._scan_postgres_stats(cur)
+                    
+                    # Contagens vêm do rollup horário (poucas linhas)
                     cur.execute("""
                         SELECT 
-                            COUNT(*) as total_records,
+                            COALESCE(SUM(total), 0) as total_records,
                             COUNT(DISTINCT asset) as unique_assets,
-                            MIN(timestamp) as first_signal,
-                            MAX(timestamp) as last_signal,
-                            SUM(CASE WHEN result = 'W' THEN 1 ELSE 0 END) as total_wins,
-                            SUM(CASE WHEN result = 'L' THEN 1 ELSE 0 END) as total_losses
-                        FROM signals
+                            COALESCE(SUM(first_wins + g1_wins + g2_wins), 0) as total_wins,
+                            COALESCE(SUM(stops), 0) as total_losses,
+                            COALESCE(SUM(first_wins), 0) as first_wins,
+                            COALESCE(SUM(g1_wins), 0) as g1_wins,
+                            COALESCE(SUM(g2_wins), 0) as g2_wins
+                        FROM signal_hourly
                     """)
                     
-                    stats = dict(cur.fetchone())
+                    row = dict(cur.fetchone())
                     
-                    # Wins por tentativa
+                    # MIN/MAX resolvidos pelo índice de timestamp
                     cur.execute("""
-                        SELECT attempt, COUNT(*) as count
+                        SELECT MIN(timestamp) as first_signal, MAX(timestamp) as last_signal
                         FROM signals
-                        WHERE result = 'W'
-                        GROUP BY attempt
-                        ORDER BY attempt
                     """)
+                    bounds = cur.fetchone()
                     
-                    attempts = {row['attempt']: row['count'] for row in cur.fetchall()}
-                    stats['wins_by_attempt'] = attempts
+                    stats = {
+                        'total_records': row['total_records'],
+                        'unique_assets': row['unique_assets'],
+                        'first_signal': bounds['first_signal'],
+                        'last_signal': bounds['last_signal'],
+                        'total_wins': row['total_wins'],
+                        'total_losses': row['total_losses']
+                    }
+                    
+                    # Wins por tentativa
+                    stats['wins_by_attempt'] = {
+                        attempt: count
+                        for attempt, count in ((1, row['first_wins']), (2, row['g1_wins']), (3, row['g2_wins']))
+                        if count
+                    }
                     
                     return stats
                     
@@ -328,6 +1144,30 @@ class Storage:
             logger.error(f"Erro ao obter estatísticas PostgreSQL: {e}")
             return {}
     
+    def _scan_postgres_stats(self, cursor) -> dict:
+        """Estatísticas lidas direto da tabela de sinais (banco ainda sem rollup horário)."""
+        cursor.execute("""
+            SELECT 
+                COUNT(*) as total_records,
+                COUNT(DISTINCT asset) as unique_assets,
+                MIN(timestamp) as first_signal,
+                MAX(timestamp) as last_signal,
+                SUM(CASE WHEN result = 'W' THEN 1 ELSE 0 END) as total_wins,
+                SUM(CASE WHEN result = 'L' THEN 1 ELSE 0 END) as total_losses
+            FROM signals
+        """)
+        stats = dict(cursor.fetchone())
+        
+        cursor.execute("""
+            SELECT attempt, COUNT(*) as count
+            FROM signals
+            WHERE result = 'W'
+            GROUP BY attempt
+            ORDER BY attempt
+        """)
+        stats['wins_by_attempt'] = {row['attempt']: row['count'] for row in cursor.fetchall()}
+        return stats
+    
     def save_signals(self, signals: List[Signal], export_format: str = 'csv', date: Optional[datetime] = None) -> None:
         """
         Salva sinais no formato especificado.
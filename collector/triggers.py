@@ -0,0 +1,423 @@
+"""
+Gatilhos declarativos de pausa e alerta
+
+Uma regra (`Trigger`) compara uma métrica das últimas operações com um
+limite, no mercado todo ou por ativo:
+
+    Trigger('losses_ultimos_10', 'losses', '>=', 3, last=10)
+    Trigger('ativo_em_sequencia', 'loss_streak', '>=', 3, scope=ASSET, action=PAUSE)
+
+Métricas: count, losses, wins, loss_rate (%), win_rate (%) e loss_streak
+(losses seguidos). `last=N` restringe a métrica às últimas N operações;
+sem `last`, vale tudo desde o último `reset` (ex.: a hora ou a sessão).
+Win/loss seguem a regra do projeto: 1ª tentativa e G1 são wins, G2 e STOP
+são losses.
+
+As mesmas regras rodam de duas formas:
+
+- `TriggerEngine`: ao vivo, sinal a sinal. Cada janela distinta é um anel
+  com soma corrente, no mercado e em cada ativo, então atualizar e checar
+  todas as regras custa O(1) por regra, independente do histórico;
+- `evaluate_frame` / `evaluate_periods`: sobre um DataFrame do loader
+  (coluna is_win), com somas acumuladas por grupo (ex.: data e hora) e sem
+  loop por linha.
+"""
+
+import operator
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .parser import Signal
+from .signal_window import OUTCOME_FIRST, OUTCOME_G1, OUTCOME_G2, OUTCOME_STOP, outcome_code
+
+# Escopo das regras
+MARKET = 'market'
+ASSET = 'asset'
+
+# O que fazer quando a regra dispara
+ALERT = 'alert'
+PAUSE = 'pause'
+
+METRICS = ('count', 'losses', 'wins', 'loss_rate', 'win_rate', 'loss_streak')
+COMPARATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+}
+
+Number = Union[int, float, np.ndarray]
+Window = Tuple[np.ndarray, np.ndarray]  # (count, losses) após cada operação
+
+
+@dataclass(frozen=True)
+class Trigger:
+    """Regra: `metric` (das últimas `last` operações) `op` `threshold`."""
+    name: str
+    metric: str
+    op: str
+    threshold: float
+    last: Optional[int] = None
+    scope: str = MARKET
+    action: str = ALERT
+    message: str = ''
+
+    def __post_init__(self):
+        if self.metric not in METRICS:
+            raise ValueError(f"Métrica desconhecida em '{self.name}': {self.metric}")
+        if self.op not in COMPARATORS:
+            raise ValueError(f"Comparador desconhecido em '{self.name}': {self.op}")
+        if self.scope not in (MARKET, ASSET):
+            raise ValueError(f"Escopo desconhecido em '{self.name}': {self.scope}")
+        if self.action not in (ALERT, PAUSE):
+            raise ValueError(f"Ação desconhecida em '{self.name}': {self.action}")
+        if self.last is not None and self.last < 1:
+            raise ValueError(f"Janela inválida em '{self.name}': {self.last}")
+
+    def check(self, value: Number) -> Union[bool, np.ndarray]:
+        """Aplica o comparador (escalar ou array)."""
+        return COMPARATORS[self.op](value, self.threshold)
+
+    def describe(self) -> str:
+        """Descrição curta para logs."""
+        window = f" (últimas {self.last})" if self.last else ""
+        return self.message or f"{self.metric}{window} {self.op} {self.threshold:g}"
+
+
+class Firing(NamedTuple):
+    """Regra que passou a valer (asset=None no escopo do mercado)."""
+    trigger: Trigger
+    asset: Optional[str]
+    value: float
+
+
+def is_loss(outcome: int) -> Optional[bool]:
+    """True para G2/STOP, False para 1ª tentativa/G1, None se não conta."""
+    if outcome == OUTCOME_G2 or outcome == OUTCOME_STOP:
+        return True
+    if outcome == OUTCOME_FIRST or outcome == OUTCOME_G1:
+        return False
+    return None
+
+
+def _rate(part: Number, count: Number) -> Number:
+    """Percentual (0 quando não há operações)."""
+    if isinstance(count, np.ndarray):
+        safe = np.where(count > 0, count, 1)
+        return np.where(count > 0, part / safe * 100, 0.0)
+    return part / count * 100 if count else 0.0
+
+
+def metric_value(trigger: Trigger, count: Number, losses: Number, streak: Number) -> Number:
+    """Valor da métrica da regra a partir dos contadores da sua janela."""
+    metric = trigger.metric
+    if metric == 'count':
+        return count
+    if metric == 'losses':
+        return losses
+    if metric == 'wins':
+        return count - losses
+    if metric == 'loss_rate':
+        return _rate(losses, count)
+    if metric == 'win_rate':
+        return _rate(count - losses, count)
+    # loss_streak: dentro da janela não passa de `last`
+    if trigger.last is None:
+        return streak
+    return np.minimum(streak, trigger.last) if isinstance(streak, np.ndarray) else min(streak, trigger.last)
+
+
+# ----------------------------------------------------------------------
+# Ao vivo
+# ----------------------------------------------------------------------
+
+class _Ring:
+    """Últimos N resultados (1 = loss) com soma corrente."""
+
+    __slots__ = ('size', 'values', 'position', 'count', 'losses')
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = bytearray(size)
+        self.position = 0
+        self.count = 0
+        self.losses = 0
+
+    def push(self, loss: int) -> None:
+        if self.count == self.size:
+            self.losses -= self.values[self.position]
+        else:
+            self.count += 1
+        self.values[self.position] = loss
+        self.losses += loss
+        self.position = (self.position + 1) % self.size
+
+
+class _Counters:
+    """Contadores do período, sequência e anéis de um escopo (mercado ou ativo)."""
+
+    __slots__ = ('count', 'losses', 'streak', 'rings')
+
+    def __init__(self, windows: Iterable[int]):
+        self.count = 0
+        self.losses = 0
+        self.streak = 0  # losses seguidos
+        self.rings = {size: _Ring(size) for size in windows}
+
+    def push(self, loss: bool) -> None:
+        self.count += 1
+        self.losses += loss
+        self.streak = self.streak + 1 if loss else 0
+        for ring in self.rings.values():
+            ring.push(int(loss))
+
+    def value(self, trigger: Trigger) -> Number:
+        if trigger.last is None:
+            return metric_value(trigger, self.count, self.losses, self.streak)
+        ring = self.rings[trigger.last]
+        return metric_value(trigger, ring.count, ring.losses, self.streak)
+
+
+class TriggerEngine:
+    """
+    Avalia regras sinal a sinal.
+
+    `observe` devolve só as regras que passaram a valer com o sinal (borda):
+    uma regra ativa não dispara de novo até deixar de valer. O estado atual
+    de todas as regras sai de `evaluate`.
+    """
+
+    def __init__(self, triggers: Sequence[Trigger]):
+        names = [trigger.name for trigger in triggers]
+        if len(set(names)) != len(names):
+            raise ValueError("Nomes de regras repetidos")
+
+        self.triggers = list(triggers)
+        self._market_triggers = [t for t in self.triggers if t.scope == MARKET]
+        self._asset_triggers = [t for t in self.triggers if t.scope == ASSET]
+        self._market_windows = sorted({t.last for t in self._market_triggers if t.last})
+        self._asset_windows = sorted({t.last for t in self._asset_triggers if t.last})
+        self.reset()
+
+    def reset(self) -> None:
+        """Zera contadores e regras ativas (início de sessão ou de período)."""
+        self._market = _Counters(self._market_windows)
+        self._assets: Dict[str, _Counters] = {}
+        self._active: Set[Tuple[str, Optional[str]]] = set()
+
+    def observe(self, signal: Signal) -> List[Firing]:
+        """Conta um sinal; sinais que não são operação são ignorados."""
+        loss = is_loss(outcome_code(signal))
+        if loss is None:
+            return []
+        return self.push(signal.asset, loss)
+
+    def push(self, asset: str, loss: bool) -> List[Firing]:
+        """
+        Conta uma operação já classificada.
+
+        Args:
+            asset: Ativo
+            loss: Se a operação foi loss (G2/STOP)
+
+        Returns:
+            Regras que passaram a valer
+        """
+        self._market.push(loss)
+        fired = self._update(self._market_triggers, self._market, None)
+
+        if self._asset_triggers:
+            counters = self._assets.get(asset)
+            if counters is None:
+                counters = self._assets[asset] = _Counters(self._asset_windows)
+            counters.push(loss)
+            fired.extend(self._update(self._asset_triggers, counters, asset))
+
+        return fired
+
+    def _update(self, triggers: List[Trigger], counters: _Counters, asset: Optional[str]) -> List[Firing]:
+        """Atualiza o estado ativo das regras de um escopo."""
+        fired = []
+        for trigger in triggers:
+            value = counters.value(trigger)
+            key = (trigger.name, asset)
+            if trigger.check(value):
+                if key not in self._active:
+                    self._active.add(key)
+                    fired.append(Firing(trigger, asset, float(value)))
+            else:
+                self._active.discard(key)
+        return fired
+
+    def value(self, trigger: Trigger, asset: Optional[str] = None) -> float:
+        """Valor atual da métrica de uma regra (no ativo, se for por ativo)."""
+        if trigger.scope == ASSET:
+            counters = self._assets.get(asset)
+            if counters is None:
+                counters = _Counters(self._asset_windows)
+        else:
+            counters = self._market
+        return float(counters.value(trigger))
+
+    def evaluate(self, asset: Optional[str] = None) -> List[Firing]:
+        """
+        Regras que valem agora: as do mercado ou, com `asset`, as do ativo.
+
+        Útil para regras de período (ex.: `count < 10`), checadas no fim da
+        hora e não a cada sinal.
+        """
+        triggers = self._market_triggers if asset is None else self._asset_triggers
+        firings = []
+        for trigger in triggers:
+            value = self.value(trigger, asset)
+            if trigger.check(value):
+                firings.append(Firing(trigger, asset, value))
+        return firings
+
+    def active(self) -> List[Firing]:
+        """Regras ativas (desde a última borda) em todos os escopos."""
+        firings = []
+        for trigger in self.triggers:
+            assets = [None] if trigger.scope == MARKET else sorted(self._assets)
+            for asset in assets:
+                if (trigger.name, asset) in self._active:
+                    firings.append(Firing(trigger, asset, self.value(trigger, asset)))
+        return firings
+
+
+# ----------------------------------------------------------------------
+# Vetorizado (histórico)
+# ----------------------------------------------------------------------
+
+def rolling_counters(losses: np.ndarray, starts: np.ndarray,
+                     windows: Iterable[int] = ()) -> Tuple[Dict[Optional[int], Window], np.ndarray]:
+    """
+    Contadores após cada operação, reiniciando onde `starts` é True.
+
+    Args:
+        losses: 1 = loss, na ordem das operações (grupos contíguos)
+        starts: Primeira operação de cada grupo
+        windows: Tamanhos de janela (últimas N operações)
+
+    Returns:
+        ({None: (count, losses) do grupo, N: (count, losses) das últimas N},
+        losses seguidos)
+    """
+    losses = np.asarray(losses, dtype=bool)
+    starts = np.asarray(starts, dtype=bool).copy()
+    index = np.arange(len(losses))
+    if len(starts):
+        starts[0] = True
+
+    group_start = np.maximum.accumulate(np.where(starts, index, 0)) if len(index) else index
+    cumulative = np.concatenate(([0], np.cumsum(losses, dtype=np.int64)))
+    end = index + 1
+
+    counters = {None: (end - group_start, cumulative[end] - cumulative[group_start])}
+    for size in windows:
+        begin = np.maximum(end - size, group_start)
+        counters[size] = (end - begin, cumulative[end] - cumulative[begin])
+
+    # Último win (ou o início do grupo) antes de cada operação
+    breaks = np.where(~losses, index, np.where(starts, index - 1, -1))
+    streak = index - np.maximum.accumulate(breaks) if len(index) else index
+    return counters, streak
+
+
+def evaluate_counters(triggers: Sequence[Trigger], counters: Dict[Optional[int], Window],
+                      streak: np.ndarray) -> Dict[str, np.ndarray]:
+    """Estado de cada regra após cada operação (ver `rolling_counters`)."""
+    fired = {}
+    for trigger in triggers:
+        count, losses = counters[trigger.last]
+        fired[trigger.name] = np.asarray(trigger.check(metric_value(trigger, count, losses, streak)), dtype=bool)
+    return fired
+
+
+def _grouped(frame: pd.DataFrame, keys: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Ordem estável que junta os grupos e marcação do início de cada grupo."""
+    if not keys:
+        starts = np.zeros(len(frame), dtype=bool)
+        return np.arange(len(frame)), starts
+
+    codes = frame.groupby(keys, sort=False, observed=True).ngroup().to_numpy()
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+    starts = np.ones(len(codes), dtype=bool)
+    starts[1:] = codes[1:] != codes[:-1]
+    return order, starts
+
+
+def evaluate_frame(triggers: Sequence[Trigger], frame: pd.DataFrame,
+                   by: Union[str, Sequence[str]] = ()) -> pd.DataFrame:
+    """
+    Estado de cada regra logo após cada operação do histórico.
+
+    Args:
+        triggers: Regras
+        frame: Operações em ordem de timestamp (colunas is_win e, para
+            regras por ativo, asset), como em collector.loader
+        by: Colunas que reiniciam os contadores (ex.: ['date', 'hour']);
+            regras por ativo reiniciam também a cada ativo
+
+    Returns:
+        Uma coluna booleana por regra, no índice de `frame`
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    losses = ~frame['is_win'].to_numpy(dtype=bool)
+    result = pd.DataFrame(index=frame.index)
+
+    for scope, keys in ((MARKET, by), (ASSET, by + ['asset'])):
+        scoped = [trigger for trigger in triggers if trigger.scope == scope]
+        if not scoped:
+            continue
+
+        order, starts = _grouped(frame, keys)
+        windows = {trigger.last for trigger in scoped if trigger.last}
+        fired = evaluate_counters(scoped, *rolling_counters(losses[order], starts, windows))
+        for trigger in scoped:
+            column = np.empty(len(frame), dtype=bool)
+            column[order] = fired[trigger.name]
+            result[trigger.name] = column
+
+    return result
+
+
+def evaluate_empty(triggers: Sequence[Trigger]) -> Dict[str, bool]:
+    """Estado de cada regra sem nenhuma operação (ex.: hora sem sinais)."""
+    return {trigger.name: bool(trigger.check(metric_value(trigger, 0, 0, 0))) for trigger in triggers}
+
+
+def evaluate_periods(triggers: Sequence[Trigger], frame: pd.DataFrame,
+                     by: Union[str, Sequence[str]], index: Optional[Iterable] = None) -> pd.DataFrame:
+    """
+    Estado das regras do mercado no fim de cada período.
+
+    Args:
+        triggers: Regras (as por ativo são ignoradas)
+        frame: Operações em ordem de timestamp (coluna is_win)
+        by: Colunas que definem o período (ex.: 'hour' ou ['date', 'hour'])
+        index: Períodos esperados; os que não têm operações recebem o estado
+            de `evaluate_empty`
+
+    Returns:
+        Uma coluna booleana por regra e `fired` (alguma regra), indexado
+        pelos períodos
+    """
+    triggers = [trigger for trigger in triggers if trigger.scope == MARKET]
+    by = [by] if isinstance(by, str) else list(by)
+
+    states = evaluate_frame(triggers, frame, by)
+    states = states.groupby([frame[key] for key in by], sort=True, observed=True).last()
+
+    if index is not None:
+        states = states.reindex(index)
+        for name, empty in evaluate_empty(triggers).items():
+            states[name] = states[name].where(states[name].notna(), empty).astype(bool)
+
+    states['fired'] = states[[trigger.name for trigger in triggers]].any(axis=1)
+    return states
@@ -0,0 +1,165 @@
+"""
+Buffer assíncrono de escrita (group commit) para o modo live
+"""
+
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+from .parser import Signal
+
+logger = logging.getLogger(__name__)
+
+
+class SignalWriteBuffer:
+    """
+    Acumula sinais recebidos ao vivo e os grava em lote.
+
+    O lote é descarregado quando `batch_size` sinais se acumulam ou quando
+    `flush_interval_ms` milissegundos se passam desde o primeiro sinal
+    pendente. A gravação roda em thread separada (`asyncio.to_thread`), então
+    um banco lento não bloqueia o handler de eventos do Telethon. Os lotes são
+    gravados um de cada vez, na ordem de chegada.
+
+    Métricas de backpressure: profundidade máxima da fila, quantas vezes e por
+    quanto tempo `put` precisou esperar por espaço, e duração dos lotes.
+    """
+
+    def __init__(
+        self,
+        flush_fn: Callable[[List[Signal]], object],
+        batch_size: int = 50,
+        flush_interval_ms: int = 500,
+        max_queue: int = 1000,
+        name: str = "postgres"
+    ):
+        self.flush_fn = flush_fn
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(1, flush_interval_ms) / 1000
+        self.name = name
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+        # Estatísticas
+        self.flushed_batches = 0
+        self.flushed_signals = 0
+        self.failed_signals = 0
+
+        # Backpressure
+        self.max_queue_depth = 0
+        self.backpressure_waits = 0
+        self.backpressure_seconds = 0.0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    def start(self) -> None:
+        """Inicia a tarefa de descarga no event loop atual."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info(f"📦 Buffer de escrita '{self.name}' iniciado "
+                        f"(lote={self.batch_size}, intervalo={self.flush_interval * 1000:.0f}ms)")
+
+    async def put(self, signal: Signal) -> None:
+        """
+        Enfileira um sinal para gravação.
+
+        Se a fila estiver cheia, aguarda espaço (backpressure) em vez de
+        descartar o sinal.
+
+        Args:
+            signal: Sinal a gravar
+        """
+        if self._closing:
+            raise RuntimeError(f"Buffer de escrita '{self.name}' já foi encerrado")
+
+        if self._task is None:
+            self.start()
+
+        try:
+            self._queue.put_nowait(signal)
+        except asyncio.QueueFull:
+            # Fila cheia: o gravador está atrasado; esperar em vez de descartar
+            self.backpressure_waits += 1
+            started = time.monotonic()
+            await self._queue.put(signal)
+            self.backpressure_seconds += time.monotonic() - started
+
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+
+    @property
+    def pending(self) -> int:
+        """Sinais na fila aguardando gravação."""
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, object]:
+        """Métricas de gravação e de backpressure."""
+        return {
+            'name': self.name,
+            'pending': self.pending,
+            'flushed_batches': self.flushed_batches,
+            'flushed_signals': self.flushed_signals,
+            'failed_signals': self.failed_signals,
+            'max_queue_depth': self.max_queue_depth,
+            'backpressure_waits': self.backpressure_waits,
+            'backpressure_seconds': round(self.backpressure_seconds, 3),
+            'last_flush_ms': round(self.last_flush_ms, 1),
+            'max_flush_ms': round(self.max_flush_ms, 1)
+        }
+
+    async def close(self) -> None:
+        """Descarrega os sinais pendentes e encerra a tarefa."""
+        if self._task is None:
+            return
+
+        self._closing = True
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+        logger.info(f"📦 Buffer '{self.name}' encerrado: {self.flushed_signals} sinais "
+                    f"em {self.flushed_batches} lotes ({self.failed_signals} com falha, "
+                    f"fila máx. {self.max_queue_depth}, {self.backpressure_waits} esperas)")
+
+    async def _run(self) -> None:
+        """Loop de descarga: agrupa por tamanho ou por tempo."""
+        stop = False
+
+        while not stop:
+            first = await self._queue.get()
+            if first is None:
+                break
+
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Signal]) -> None:
+        """Grava um lote fora do event loop."""
+        started = time.monotonic()
+        try:
+            await asyncio.to_thread(self.flush_fn, batch)
+            self.last_flush_ms = (time.monotonic() - started) * 1000
+            self.max_flush_ms = max(self.max_flush_ms, self.last_flush_ms)
+            self.flushed_batches += 1
+            self.flushed_signals += len(batch)
+            logger.debug(f"📦 Lote de {len(batch)} sinais gravado ({self.name})")
+        except Exception as e:
+            self.failed_signals += len(batch)
+            logger.error(f"Erro ao gravar lote de {len(batch)} sinais ({self.name}): {e}")
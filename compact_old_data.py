@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Retenção: compacta os arquivos de sinais de dias antigos
+
+Arquivos de dias mais antigos que N dias (RETENTION_DAYS, padrão 30) são
+compactados no lugar em `.csv.zst` (requer o pacote zstandard) ou `.csv.gz`
+e atualizados no catálogo. Loader, Storage e dashboard leem as duas formas.
+
+Uso:
+python compact_old_data.py                  # Dias mais antigos que RETENTION_DAYS
+python compact_old_data.py --days 60
+python compact_old_data.py --codec gzip --level 6
+python compact_old_data.py --dry-run        # Apenas listar
+"""
+
+import sys
+import os
+import argparse
+from datetime import datetime
+
+# Adicionar diretório do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from collector import Config
+from collector.catalog import DataCatalog
+from collector.compression import available_codecs, default_codec
+from collector.retention import compact_old_days
+
+
+def main():
+    """Função principal."""
+    config = Config(require_telegram=False)
+
+    parser = argparse.ArgumentParser(description="Compacta os arquivos de sinais de dias antigos")
+    parser.add_argument("--days", type=int, default=config.retention_days,
+                        help=f"Compactar dias mais antigos que isto (padrão: {config.retention_days})")
+    parser.add_argument("--codec", choices=available_codecs(), default=config.compression_codec,
+                        help=f"Codec de compressão (padrão: {default_codec()})")
+    parser.add_argument("--level", type=int, help="Nível de compressão")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas listar o que seria compactado")
+    args = parser.parse_args()
+
+    config.setup_logging()
+
+    catalog = DataCatalog()
+    if not catalog.dates():
+        catalog.scan()
+
+    today = datetime.now(config.timezone).date()
+    results = compact_old_days(catalog, args.days, today, args.codec, args.level, args.dry_run)
+
+    if not results:
+        print(f"✅ Nada a compactar (dias anteriores a {args.days} dias já compactados)")
+        return
+
+    before = sum(item['bytes_before'] for item in results)
+    if args.dry_run:
+        for item in results:
+            print(f"   {item['day']} {item['role']}: {item['path']} ({item['bytes_before']} bytes)")
+        print(f"🔍 {len(results)} arquivo(s), {before / 1024:.1f} KB seriam compactados")
+        return
+
+    done = [item for item in results if item['target'] is not None]
+    after = sum(item['bytes_after'] for item in done)
+    before_done = sum(item['bytes_before'] for item in done)
+    ratio = before_done / after if after else 0
+
+    print(f"🗜️ {len(done)}/{len(results)} arquivo(s) compactado(s): "
+          f"{before_done / 1024:.1f} KB -> {after / 1024:.1f} KB ({ratio:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,11 @@ Script para executar no final do dia (perto da meia-noite) que:
 2. Consolida todos os CSVs do dia em um arquivo final
 3. Organiza na pasta /daily ops/ para histórico completo
 
+Os arquivos do dia são localizados pelo catálogo (data/catalog.json); arquivos
+colocados manualmente na pasta do dia são registrados automaticamente.
+
 Estrutura esperada:
-data/trading ops/June/27/
+data/trading ops/2025/06/27/
 ├── pre-op time/signals_2025-06-27.csv    # Dados antes de operar
 ├── op time/signals_2025-06-27.csv        # Dados durante operação
 └── daily ops/signals_2025-06-27.csv      # ← ARQUIVO FINAL CONSOLIDADO
@@ -23,7 +26,6 @@ import sys
 import os
 import argparse
 from datetime import datetime, timedelta
-import pandas as pd
 from pathlib import Path
 import pytz
 
@@ -34,6 +36,10 @@ from collector import Config, Storage
 from collector.runner import Runner
 from collector.parser import Signal
 from collector.regex import find_signal
+from collector.loader import load_signals_frame, TIMESTAMP_FORMAT
+from collector.catalog import day_dir, ROLE_PRE_OP, ROLE_OP_TIME, ROLE_DAILY_OPS
+from collector.merge import iter_sorted_file, iter_signal_records, merge_records, write_records
+from collector.reports import print_daily_report
 
 
 class DailyConsolidator:
@@ -58,11 +64,13 @@ class DailyConsolidator:
             else:
                 self.today = now.date()
         
-        # Definir caminhos
-        self.base_path = Path("data/trading ops") / self.today.strftime("%B") / str(self.today.day)
-        self.pre_op_path = self.base_path / "pre-op time"
-        self.op_time_path = self.base_path / "op time"
-        self.daily_ops_path = self.base_path / "daily ops"
+        # Arquivos do dia são localizados pelo catálogo (data/catalog.json)
+        self.catalog = self.storage.catalog
+        self.base_path = day_dir(self.today)
+        self.daily_ops_path = self.base_path / ROLE_DAILY_OPS
+        
+        # Arquivos de origem lidos nesta consolidação
+        self.source_files = []
         
         # Criar pasta daily ops se não existir
         self.daily_ops_path.mkdir(parents=True, exist_ok=True)
@@ -76,60 +84,52 @@ class DailyConsolidator:
         print("=" * 60)
     
     def load_existing_csvs(self):
-        """Carrega CSVs existentes do dia."""
+        """
+        Localiza os CSVs existentes do dia.
+        
+        Os arquivos não são carregados aqui: contagens e período vêm do
+        catálogo, e o conteúdo é lido em streaming na consolidação.
+        
+        Returns:
+            Tupla (arquivos de origem, primeiro timestamp, último timestamp)
+        """
         print("\n📂 CARREGANDO DADOS EXISTENTES:")
         print("-" * 40)
         
-        all_signals = []
-        files_found = []
+        # Registrar arquivos colocados manualmente na pasta do dia
+        self.catalog.scan_date(self.today)
         
-        # Arquivo pre-op time
-        pre_op_file = self.pre_op_path / f"signals_{self.today.strftime('%Y-%m-%d')}.csv"
-        if pre_op_file.exists():
-            try:
-                df_pre = pd.read_csv(pre_op_file)
-                df_pre['timestamp'] = pd.to_datetime(df_pre['timestamp'])
-                print(f"✅ Pre-op time: {len(df_pre)} sinais")
-                all_signals.extend(df_pre.to_dict('records'))
-                files_found.append('pre-op')
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar pre-op: {e}")
-        else:
-            print("❌ Pre-op time: Arquivo não encontrado")
+        total_rows = 0
+        first_timestamp = None
+        last_timestamp = None
         
-        # Arquivo op time
-        op_time_file = self.op_time_path / f"signals_{self.today.strftime('%Y-%m-%d')}.csv"
-        if op_time_file.exists():
-            try:
-                df_op = pd.read_csv(op_time_file)
-                df_op['timestamp'] = pd.to_datetime(df_op['timestamp'])
-                print(f"✅ Op time: {len(df_op)} sinais")
-                all_signals.extend(df_op.to_dict('records'))
-                files_found.append('op-time')
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar op time: {e}")
-        else:
-            print("❌ Op time: Arquivo não encontrado")
+        for role, label in ((ROLE_PRE_OP, "Pre-op time"), (ROLE_OP_TIME, "Op time")):
+            source_file = self.catalog.lookup(self.today, role)
+            if source_file is None:
+                print(f"❌ {label}: Arquivo não encontrado")
+                continue
+            
+            entry = self.catalog.entry_for(source_file, self.today, role)
+            print(f"✅ {label}: {entry['rows']} sinais")
+            self.source_files.append(source_file)
+            total_rows += entry['rows']
+            
+            if entry['min_ts']:
+                first_timestamp = min(filter(None, (first_timestamp, entry['min_ts'])))
+                last_timestamp = max(filter(None, (last_timestamp, entry['max_ts'])))
         
-        if not files_found:
+        if not self.source_files:
             print("⚠️ Nenhum arquivo encontrado - será feita coleta completa do dia")
             return [], None, None
         
-        # Converter para DataFrame e ordenar por timestamp
-        if all_signals:
-            df_combined = pd.DataFrame(all_signals)
-            df_combined = df_combined.sort_values('timestamp').drop_duplicates()
+        if first_timestamp is not None:
+            first_timestamp = datetime.strptime(first_timestamp, TIMESTAMP_FORMAT)
+            last_timestamp = datetime.strptime(last_timestamp, TIMESTAMP_FORMAT)
             
-            # Encontrar último timestamp
-            last_timestamp = df_combined['timestamp'].max()
-            first_timestamp = df_combined['timestamp'].min()
-            
-            print(f"📊 Total existente: {len(df_combined)} sinais")
+            print(f"📊 Total existente: {total_rows} sinais (antes da deduplicação)")
             print(f"🕐 Período: {first_timestamp.strftime('%H:%M')} até {last_timestamp.strftime('%H:%M')}")
-            
-            return df_combined, first_timestamp, last_timestamp
         
-        return [], None, None
+        return self.source_files, first_timestamp, last_timestamp
     
     async def collect_missing_signals(self, last_timestamp):
         """Coleta sinais que ainda não foram capturados."""
@@ -229,7 +229,9 @@ class DailyConsolidator:
                             timestamp=local_time,
                             asset=asset,
                             result=result,
-                            attempt=attempt
+                            attempt=attempt,
+                            message_id=message.id,
+                            chat_id=getattr(message, 'chat_id', None)
                         )
                         new_signals.append(signal)
                         print(f"   ✅ Sinal encontrado: {local_time.strftime('%H:%M')} {asset} {result}")
@@ -254,80 +256,48 @@ class DailyConsolidator:
                 await runner.cleanup()
             return []
     
-    def consolidate_all_data(self, existing_df, new_signals):
-        """Consolida todos os dados em um DataFrame final."""
+    def consolidate_all_data(self, source_files, new_signals):
+        """
+        Intercala arquivos existentes e sinais novos (merge k-way).
+        
+        Cada fonte é uma sequência ordenada por timestamp; a deduplicação
+        (ver SignalDeduper) acontece durante o merge, mantendo o registro da
+        primeira fonte (pre-op, op time e, por fim, sinais novos).
+        
+        Returns:
+            Iterador de registros consolidados (consumido ao salvar)
+        """
         print(f"\n🔄 CONSOLIDANDO DADOS:")
         print("-" * 40)
         
-        all_data = []
+        sources = [iter_sorted_file(path, self.catalog) for path in source_files]
+        sources.append(iter_signal_records(new_signals, self.config.timezone))
         
-        # Adicionar dados existentes
-        if existing_df is not None and len(existing_df) > 0:
-            for _, row in existing_df.iterrows():
-                # Garantir que timestamp seja timezone-aware
-                timestamp = row['timestamp']
-                if hasattr(timestamp, 'tz_localize') and timestamp.tz is None:
-                    timestamp = timestamp.tz_localize(self.config.timezone)
-                elif isinstance(timestamp, str):
-                    timestamp = pd.to_datetime(timestamp)
-                    if timestamp.tz is None:
-                        timestamp = timestamp.tz_localize(self.config.timezone)
-                
-                all_data.append({
-                    'timestamp': timestamp,
-                    'asset': row['asset'],
-                    'result': row['result'],
-                    'attempt': row['attempt']
-                })
-            print(f"📊 Dados existentes: {len(existing_df)} sinais")
-        
-        # Adicionar novos sinais
-        for signal in new_signals:
-            # Garantir que timestamp seja timezone-aware
-            timestamp = signal.timestamp
-            if timestamp.tzinfo is None:
-                timestamp = self.config.timezone.localize(timestamp)
-            
-            all_data.append({
-                'timestamp': timestamp,
-                'asset': signal.asset,
-                'result': signal.result,
-                'attempt': signal.attempt
-            })
+        print(f"📊 Arquivos existentes: {len(source_files)}")
         print(f"🆕 Novos sinais: {len(new_signals)} sinais")
         
-        if not all_data:
-            print("⚠️ Nenhum dado para consolidar")
-            return None
-        
-        # Criar DataFrame final
-        df_final = pd.DataFrame(all_data)
-        
-        # Remover duplicatas e ordenar
-        df_final = df_final.drop_duplicates(subset=['timestamp', 'asset'], keep='first')
-        df_final = df_final.sort_values('timestamp')
-        
-        print(f"✅ Total consolidado: {len(df_final)} sinais únicos")
-        
-        return df_final
+        return merge_records(sources)
     
-    def save_consolidated_data(self, df_final):
-        """Salva dados consolidados no arquivo final."""
+    def save_consolidated_data(self, records):
+        """Grava os registros consolidados no arquivo final em uma única passada."""
         print(f"\n💾 SALVANDO DADOS CONSOLIDADOS:")
         print("-" * 40)
         
-        if df_final is None or len(df_final) == 0:
-            print("⚠️ Nenhum dado para salvar")
-            return None
-        
         # Arquivo final
         final_file = self.daily_ops_path / f"signals_{self.today.strftime('%Y-%m-%d')}.csv"
         
         try:
-            # Salvar CSV
-            df_final.to_csv(final_file, index=False)
+            # Gravação atômica e registro no catálogo (resumo calculado durante a escrita)
+            summary = write_records(records, final_file)
+            
+            if summary['rows'] == 0:
+                print("⚠️ Nenhum dado para salvar")
+                final_file.unlink()
+                return None
+            
+            self.catalog.record(final_file, ROLE_DAILY_OPS, self.today, sources=self.source_files, summary=summary)
             print(f"✅ Arquivo salvo: {final_file}")
-            print(f"📊 Total de registros: {len(df_final)}")
+            print(f"📊 Total de registros: {summary['rows']} sinais únicos")
             
             return final_file
             
@@ -337,95 +307,24 @@ class DailyConsolidator:
     
     def generate_daily_report(self, df_final):
         """Gera relatório completo do dia."""
-        print(f"\n📈 RELATÓRIO COMPLETO DO DIA:")
-        print("=" * 60)
-        
-        if df_final is None or len(df_final) == 0:
-            print("⚠️ Nenhum dado para analisar")
-            return
-        
-        # Estatísticas gerais
-        total_signals = len(df_final)
-        # Conforme estratégias: apenas 1ª tentativa e G1 são wins, G2+ são losses
-        first_attempt_wins = len(df_final[(df_final['result'] == 'W') & (df_final['attempt'] == 1)])
-        g1_wins = len(df_final[(df_final['result'] == 'W') & (df_final['attempt'] == 2)])
-        wins = first_attempt_wins + g1_wins  # Apenas 1ª tentativa + G1
-        losses = len(df_final[df_final['result'] == 'L']) + len(df_final[(df_final['result'] == 'W') & (df_final['attempt'] == 3)])  # Losses + G2
-        win_rate = wins / total_signals * 100
-        
-        print(f"📊 RESUMO GERAL:")
-        print(f"   Total de sinais: {total_signals}")
-        print(f"   ✅ Wins: {wins} ({win_rate:.1f}%)")
-        print(f"   ❌ Losses: {losses} ({(100-win_rate):.1f}%)")
-        
-        # Por tentativa (apenas wins)
-        wins_df = df_final[df_final['result'] == 'W']
-        if len(wins_df) > 0:
-            first_attempt = len(wins_df[wins_df['attempt'] == 1])
-            g1_wins = len(wins_df[wins_df['attempt'] == 2])
-            g2_wins = len(wins_df[wins_df['attempt'] == 3])
-            
-            print(f"\n🎯 ANÁLISE DE TENTATIVAS:")
-            print(f"   1ª tentativa: {first_attempt} ({first_attempt/total_signals*100:.1f}%)")
-            print(f"   G1 recovery: {g1_wins} ({g1_wins/total_signals*100:.1f}%)")
-            print(f"   G2 recovery: {g2_wins} ({g2_wins/total_signals*100:.1f}%)")
-        
-        # Por ativo (conforme estratégias: apenas 1ª tentativa + G1 são wins)
-        print(f"\n💰 PERFORMANCE POR ATIVO:")
-        for asset in sorted(df_final['asset'].unique()):
-            asset_data = df_final[df_final['asset'] == asset]
-            asset_first_wins = len(asset_data[(asset_data['result'] == 'W') & (asset_data['attempt'] == 1)])
-            asset_g1_wins = len(asset_data[(asset_data['result'] == 'W') & (asset_data['attempt'] == 2)])
-            asset_wins = asset_first_wins + asset_g1_wins  # Apenas 1ª tentativa + G1
-            asset_losses = len(asset_data[asset_data['result'] == 'L']) + len(asset_data[(asset_data['result'] == 'W') & (asset_data['attempt'] >= 3)])
-            asset_total = len(asset_data)
-            asset_wr = asset_wins / asset_total * 100 if asset_total > 0 else 0
-            
-            print(f"   {asset}: {asset_wins}W/{asset_losses}L ({asset_wr:.1f}%) - {asset_total} total")
-        
-        # Distribuição temporal (conforme estratégias: apenas 1ª tentativa + G1 são wins)
-        print(f"\n⏰ DISTRIBUIÇÃO POR HORA:")
-        df_final['hour'] = pd.to_datetime(df_final['timestamp']).dt.hour
-        
-        for hour in sorted(df_final['hour'].unique()):
-            hour_data = df_final[df_final['hour'] == hour]
-            hour_total = len(hour_data)
-            hour_first_wins = len(hour_data[(hour_data['result'] == 'W') & (hour_data['attempt'] == 1)])
-            hour_g1_wins = len(hour_data[(hour_data['result'] == 'W') & (hour_data['attempt'] == 2)])
-            hour_wins = hour_first_wins + hour_g1_wins  # Apenas 1ª tentativa + G1
-            hour_wr = hour_wins / hour_total * 100 if hour_total > 0 else 0
-            
-            print(f"   {hour:02d}:00-{hour:02d}:59: {hour_total} sinais ({hour_wr:.1f}% WR)")
-        
-        # Período de dados
-        first_signal = df_final['timestamp'].min()
-        last_signal = df_final['timestamp'].max()
-        duration = pd.to_datetime(last_signal) - pd.to_datetime(first_signal)
-        
-        print(f"\n📅 PERÍODO DOS DADOS:")
-        print(f"   Primeiro sinal: {pd.to_datetime(first_signal).strftime('%H:%M:%S')}")
-        print(f"   Último sinal: {pd.to_datetime(last_signal).strftime('%H:%M:%S')}")
-        print(f"   Duração: {duration}")
-        
-        print("=" * 60)
+        print_daily_report(df_final)
     
     async def run_consolidation(self):
         """Executa processo completo de consolidação."""
         self.print_banner()
         
-        # Etapa 1: Carregar dados existentes
-        existing_df, first_timestamp, last_timestamp = self.load_existing_csvs()
+        # Etapa 1: Localizar dados existentes
+        source_files, first_timestamp, last_timestamp = self.load_existing_csvs()
         
         # Etapa 2: Coletar dados faltantes
         new_signals = await self.collect_missing_signals(last_timestamp)
         
-        # Etapa 3: Consolidar todos os dados
-        df_final = self.consolidate_all_data(existing_df, new_signals)
-        
-        # Etapa 4: Salvar arquivo final
-        final_file = self.save_consolidated_data(df_final)
+        # Etapas 3 e 4: Consolidar (merge em streaming) e salvar arquivo final
+        records = self.consolidate_all_data(source_files, new_signals)
+        final_file = self.save_consolidated_data(records)
         
-        # Etapa 5: Gerar relatório
+        # Etapa 5: Gerar relatório a partir do arquivo final
+        df_final = load_signals_frame(final_file) if final_file else None
         self.generate_daily_report(df_final)
         
         if final_file:
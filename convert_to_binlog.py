@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Conversão dos CSVs de sinais para o log binário (data/binlog)
+
+Para cada data, converte o melhor CSV disponível no catálogo (daily ops,
+op time, pre-op time ou live) em `data/binlog/signals_YYYY-MM-DD.bin`,
+substituindo o arquivo do dia. Datas cujo CSV de origem não mudou desde a
+última conversão são puladas.
+
+Uso:
+python convert_to_binlog.py                     # Todas as datas do catálogo
+python convert_to_binlog.py --date 2025-06-27   # Data específica
+python convert_to_binlog.py data/signals_2025-07-02.csv
+python convert_to_binlog.py --force             # Reconverter mesmo sem mudanças
+"""
+
+import sys
+import os
+import argparse
+from pathlib import Path
+
+# Adicionar diretório do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from collector import Config
+from collector.binlog import BinaryLog
+from collector.catalog import DataCatalog, ROLE_BINLOG, DATE_IN_NAME_RE
+
+
+def convert(log, catalog, day, csv_path, force):
+    """Converte um CSV no arquivo binário do dia e registra no catálogo."""
+    if not force and catalog.sources_unchanged(day, ROLE_BINLOG, [csv_path]):
+        print(f"⏭️ {day}: sem mudanças ({csv_path})")
+        return False
+
+    bin_path = log.convert_csv(csv_path, day)
+    entry = catalog.record(bin_path, ROLE_BINLOG, day, sources=[csv_path])
+    print(f"✅ {day}: {entry['rows']} registros -> {bin_path} ({entry['bytes']} bytes)")
+    return True
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Converte CSVs de sinais para o log binário")
+    parser.add_argument("paths", nargs="*", help="CSVs específicos (data inferida do nome)")
+    parser.add_argument("--date", type=str, help="Converter apenas esta data (YYYY-MM-DD)")
+    parser.add_argument("--force", action="store_true", help="Reconverter mesmo sem mudanças")
+    args = parser.parse_args()
+
+    config = Config(require_telegram=False)
+    config.setup_logging()
+
+    catalog = DataCatalog()
+    log = BinaryLog(timezone=config.timezone)
+
+    if args.paths:
+        jobs = []
+        for path in args.paths:
+            match = DATE_IN_NAME_RE.search(Path(path).name)
+            if not match:
+                print(f"⚠️ Data não encontrada no nome: {path}")
+                continue
+            jobs.append((match.group(1), Path(path)))
+    else:
+        if not catalog.dates():
+            catalog.scan()
+        dates = [args.date] if args.date else catalog.dates()
+        jobs = [(day, catalog.resolve(day)) for day in dates]
+
+    converted = 0
+    for day, csv_path in jobs:
+        if csv_path is None:
+            print(f"❌ {day}: nenhum CSV encontrado")
+            continue
+        try:
+            converted += convert(log, catalog, day, csv_path, args.force)
+        except Exception as e:
+            print(f"❌ {day}: erro ao converter {csv_path}: {e}")
+
+    print(f"📦 {converted} dia(s) convertido(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@ import sys
 import os
 from datetime import datetime, timedelta
 import pytz
+import pandas as pd
 
 # Adicionar diretório do projeto ao path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -23,7 +24,10 @@ from collector import Config, AdaptiveStrategy, Storage, LiveTrader
 from collector.runner import Runner
 from collector.parser import Signal, HistoricalParser
 from collector.regex import find_signal
-from collector.adaptive_strategy import StrategyType
+from collector.adaptive_strategy import StrategyType, rates_frame, recommend
+from collector.market_window import SignalCounts
+from collector.live_trader import LOSS_STREAK_ALERT
+from collector.triggers import TriggerEngine
 
 
 class DailyTradingSystem:
@@ -176,40 +180,19 @@ class DailyTradingSystem:
         if not signals:
             return self.adaptive.analyze_market_conditions(signals)
         
-        # Agrupar sinais por operação
-        operations = self.adaptive._group_signals_into_operations(signals)
+        # Contadores por desfecho (cada sinal W/L é uma operação)
+        counts = SignalCounts.from_signals(signals)
         
-        # Calcular métricas detalhadas
-        total_ops = len(operations)
-        first_attempt_wins = sum(1 for op in operations if op['result'] == 'W' and op['attempts'] == 1)
-        g1_recoveries = sum(1 for op in operations if op['result'] == 'W' and op['attempts'] == 2)
-        g2_wins = sum(1 for op in operations if op['result'] == 'W' and op['attempts'] == 3)
-        stops = sum(1 for op in operations if op['result'] == 'L')
-        
-        # Calcular taxas
-        first_attempt_rate = (first_attempt_wins / total_ops * 100) if total_ops > 0 else 0
-        g1_recovery_rate = (g1_recoveries / max(1, total_ops - first_attempt_wins) * 100) if total_ops > first_attempt_wins else 0
-        g2_rate = (g2_wins / total_ops * 100) if total_ops > 0 else 0
-        stop_rate = (stops / total_ops * 100) if total_ops > 0 else 0
-        
-        # Calcular win rate geral (apenas 1ª tentativa + G1 são wins, G2 e STOP são losses)
-        total_wins = first_attempt_wins + g1_recoveries
-        win_rate = (total_wins / total_ops * 100) if total_ops > 0 else 0
-        
-        # Determinar estratégia usando a mesma lógica do AdaptiveStrategy
-        # Calcular G2+STOP rate para consistência
-        g2_stop_rate = g2_rate + stop_rate
-        
-        if total_ops < 10:  # Poucos dados
-            recommended_strategy = StrategyType.PAUSE
-        elif g2_stop_rate > 30:  # Se G2+STOP > 30%, pausar
-            recommended_strategy = StrategyType.PAUSE
-        elif g1_recovery_rate > 65:  # Se G1 recovery > 65%, usar Martingale
-            recommended_strategy = StrategyType.MARTINGALE_CONSERVATIVE
-        elif first_attempt_rate > 60:  # Se 1ª tentativa > 60%, usar Infinity
-            recommended_strategy = StrategyType.INFINITY_CONSERVATIVE
-        else:
-            recommended_strategy = StrategyType.INFINITY_CONSERVATIVE
+        # Taxas e estratégia com a mesma regra do AdaptiveStrategy (apenas
+        # 1ª tentativa e G1 são wins, G2 e STOP são losses)
+        row = recommend(rates_frame(pd.DataFrame([vars(counts)])), self.adaptive.decision_thresholds).iloc[0]
+        total_ops = counts.total
+        first_attempt_rate = row['first_rate']
+        g1_recovery_rate = row['g1_rate']
+        g2_rate = row['g2_rate']
+        stop_rate = row['stop_rate']
+        win_rate = row['win_rate']
+        recommended_strategy = row['strategy']
         
         # Período de análise
         if signals:
@@ -250,23 +233,26 @@ class DailyTradingSystem:
         if len(signals) < 3:
             return
         
-        # Ordenar sinais por timestamp (mais recentes por último)
-        sorted_signals = sorted(signals, key=lambda x: x.timestamp)
+        # Mesma regra do modo live, avaliada em uma passada (G2 e STOP são losses)
+        engine = TriggerEngine([LOSS_STREAK_ALERT])
+        for signal in self._in_time_order(signals):
+            engine.observe(signal)
         
-        # Pegar os últimos 3 sinais finalizados (não intermediários de gales)
-        final_signals = []
-        for signal in reversed(sorted_signals):
-            if signal.result in ['W', 'L']:
-                final_signals.append(signal)
-                if len(final_signals) == 3:
-                    break
-        
-        # Verificar se os 3 últimos foram losses
-        if len(final_signals) == 3 and all(s.result == 'L' for s in final_signals):
+        if engine.evaluate():
             print("\n⚠️ ALERTA: ÚLTIMOS 3 SINAIS FORAM LOSSES CONSECUTIVOS!")
             print("🚨 O mercado pode ter ficado instável no final da última hora")
             print("💡 Considere aguardar estabilização antes de operar")
     
+    @staticmethod
+    def _in_time_order(signals):
+        """Sinais do mais antigo ao mais recente (a coleta vem do mais recente; só ordena se misturado)."""
+        pairs = list(zip(signals, signals[1:]))
+        if all(a.timestamp <= b.timestamp for a, b in pairs):
+            return signals
+        if all(a.timestamp >= b.timestamp for a, b in pairs):
+            return signals[::-1]
+        return sorted(signals, key=lambda x: x.timestamp)
+    
     def _ask_market_condition(self, initial_strategy):
         """Pergunta sobre a condição atual do mercado e ajusta estratégia se necessário."""
         print("\n❓ VERIFICAÇÃO DE CONDIÇÕES DE MERCADO:")
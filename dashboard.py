@@ -11,10 +11,17 @@ import plotly.graph_objects as go
 from pathlib import Path
 from datetime import datetime, date
 import os
-import json
 import shutil
 from collections import defaultdict
 
+from collector.catalog import DataCatalog, ROLE_TRADING_LOG, role_dir, write_frame_atomic
+from collector.query import SignalQuery
+from collector.reports import hourly_analysis as compute_hourly_analysis, load_hourly_table
+from collector.adaptive_strategy import DECISION_THRESHOLDS, rates_frame, recommend
+from collector.analysis_log import AnalysisLog
+from collector.market_window import DEFAULT_HORIZON
+from collector.simulation import MIN_ANALYSIS_SIGNALS, PAUSE, STRATEGY_LABELS, hour_counts, simulate_strategy_result
+
 # Configuração otimizada
 st.set_page_config(
     page_title="📊 Dashboard Trading",
@@ -23,12 +30,9 @@ st.set_page_config(
 )
 
 @st.cache_data
-def load_data(file_path):
-    """Carrega dados com cache para performance."""
-    df = pd.read_csv(file_path)
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df['hour'] = df['timestamp'].dt.hour
-    return df
+def load_data(selected_date, version=None):
+    """Carrega os sinais do dia com cache (version = arquivo, tamanho e mtime; invalida o cache)."""
+    return get_query().frame(selected_date, selected_date)
 
 @st.cache_data
 def calculate_metrics(df):
@@ -71,145 +75,25 @@ def calculate_metrics(df):
 @st.cache_data
 def calculate_hourly_analysis(df):
     """Calcula análise por hora com recomendações de estratégia e simulação de resultados."""
-    hourly_data = []
-    
-    for hour in range(24):
-        hour_df = df[df['hour'] == hour]
-        if len(hour_df) == 0:
-            continue
-            
-        total = len(hour_df)
-        # Conforme estratégias: apenas 1ª tentativa e G1 são wins
-        first_attempt = len(hour_df[(hour_df['result'] == 'W') & (hour_df['attempt'] == 1)])
-        g1_recovery = len(hour_df[(hour_df['result'] == 'W') & (hour_df['attempt'] == 2)])
-        wins = first_attempt + g1_recovery  # Apenas 1ª tentativa + G1
-        win_rate = (wins / total * 100) if total > 0 else 0
-        
-        # Métricas para recomendação
-        losses = len(hour_df[hour_df['result'] == 'L'])
-        
-        first_rate = (first_attempt / total * 100) if total > 0 else 0
-        # G1 rate deve ser taxa de recuperação relativa (dos que não ganharam na primeira)
-        g1_rate = (g1_recovery / max(1, total - first_attempt) * 100) if total > first_attempt else 0
-        loss_rate = (losses / total * 100) if total > 0 else 0
-        
-        # Recomendação de estratégia usando mesma lógica do AdaptiveStrategy
-        # Calcular G2+STOP rate
-        g2_stops = len(hour_df[(hour_df['result'] == 'W') & (hour_df['attempt'] == 3)]) + losses
-        g2_stop_rate = (g2_stops / total * 100) if total > 0 else 0
-        
-        if total < 10:  # Poucos dados (mesmo threshold do AdaptiveStrategy)
-            strategy = "PAUSE"
-        elif g2_stop_rate > 30:  # Se G2+STOP > 30%, pausar
-            strategy = "PAUSE"
-        elif g1_rate > 65:  # Se G1 recovery > 65%, usar Martingale (rate relativa, não absoluta)
-            strategy = "Martingale Conservative"
-        elif first_rate > 60:  # Se 1ª tentativa > 60%, usar Infinity
-            strategy = "Infinity Conservative"
-        else:
-            strategy = "Infinity Conservative"
-        
-        # Simular resultado da estratégia
-        strategy_result = simulate_strategy_result(hour_df, strategy)
-        
-        hourly_data.append({
-            'hour': hour,
-            'total': total,
-            'wins': wins,
-            'win_rate': win_rate,
-            'first_rate': first_rate,
-            'g1_rate': g1_rate,
-            'loss_rate': loss_rate,
-            'strategy': strategy,
-            'strategy_result': strategy_result
-        })
-    
-    return pd.DataFrame(hourly_data)
-
-def simulate_strategy_result(hour_df, strategy):
-    """Simula o resultado da aplicação da estratégia nas operações da hora."""
-    if strategy in ["PAUSE", "Dados Insuficientes", "Aguardar Mais Dados"]:
-        return "Sem Operações"
-    
-    # Ordenar operações por timestamp para simular em ordem cronológica
-    operations = hour_df.sort_values('timestamp')
-    
-    if strategy == "Martingale Conservative":
-        return simulate_martingale_conservative(operations)
-    elif strategy == "Infinity Conservative":
-        return simulate_infinity_conservative(operations)
-    
-    return "N/A"
-
-def simulate_martingale_conservative(operations):
-    """
-    Simula Martingale Conservative:
-    - Vitória: 3 wins seguidos sem nenhum loss entre eles
-    - Derrota: qualquer loss (de primeira ou entre vitórias)
-    """
-    consecutive_wins = 0
-    
-    for _, op in operations.iterrows():
-        if op['result'] == 'W':
-            consecutive_wins += 1
-            if consecutive_wins >= 3:
-                return "Vitória"
-        else:  # Loss
-            return "Derrota"
-    
-    # Se chegou ao fim sem 3 wins consecutivos nem loss
-    if consecutive_wins < 3:
-        return "Incompleto"
-    
-    return "Vitória"
-
-def simulate_infinity_conservative(operations):
-    """
-    Simula Infinity Conservative:
-    - Vitória: 2 ciclos completos vitoriosos (2 vitórias seguidas, duas vezes)
-    - Derrota: falha em completar os ciclos
-    """
-    cycles_completed = 0
-    consecutive_wins = 0
-    
-    for _, op in operations.iterrows():
-        if op['result'] == 'W':
-            consecutive_wins += 1
-            if consecutive_wins >= 2:  # Ciclo completo
-                cycles_completed += 1
-                consecutive_wins = 0  # Reset para próximo ciclo
-                if cycles_completed >= 2:
-                    return "Vitória"
-        else:  # Loss
-            consecutive_wins = 0  # Reset na sequência
-    
-    # Se não completou 2 ciclos
-    if cycles_completed < 2:
-        return "Incompleto"
-    
-    return "Vitória"
+    return compute_hourly_analysis(df)
 
 def recommend_strategy(metrics):
     """Recomenda estratégia usando mesma lógica do AdaptiveStrategy."""
-    total = metrics['total_signals']
-    first_rate = metrics['first_attempt_rate']
-    g1_rate = metrics['g1_recovery_rate']
-    loss_rate = metrics['loss_rate']
-    g2_rate = metrics['g2_recovery_rate']
-    
-    # Calcular G2+STOP rate para consistência com AdaptiveStrategy
-    g2_stop_rate = g2_rate + loss_rate
-    
-    if total < 10:  # Poucos dados
+    # Losses de calculate_metrics já incluem o G2
+    counts = pd.DataFrame([{
+        'total': metrics['total_signals'],
+        'first_attempt': metrics['first_attempt_wins'],
+        'g1': metrics['g1_wins'],
+        'g2': metrics['g2_wins'],
+        'stops': metrics['losses'] - metrics['g2_wins']
+    }])
+    row = recommend(rates_frame(counts)).iloc[0]
+    
+    if row['strategy_code'] != PAUSE:
+        return STRATEGY_LABELS[row['strategy_code']]
+    if row['total'] < DECISION_THRESHOLDS['min_operations']:  # Poucos dados
         return "PAUSE - Dados Insuficientes"
-    elif g2_stop_rate > 30:  # Se G2+STOP > 30%, pausar
-        return "PAUSE - Condições Desfavoráveis"
-    elif g1_rate > 65:  # Se G1 recovery > 65%, usar Martingale
-        return "Martingale Conservative"
-    elif first_rate > 60:  # Se 1ª tentativa > 60%, usar Infinity
-        return "Infinity Conservative"
-    else:
-        return "Infinity Conservative"
+    return "PAUSE - Condições Desfavoráveis"
 
 @st.cache_data
 def calculate_financial_metrics(df, initial_capital=540):
@@ -454,31 +338,15 @@ def simulate_realistic_trading_day(df):
     end_reason = ""
     martingale_daily_losses = 0  # Contador de losses diários para Martingale
     
-    # Calcular estratégias por hora (para usar como referência)
+    # Calcular estratégias por hora (para usar como referência), todas de uma vez
     hourly_strategies = {}
-    for hour in range(24):
-        hour_df = df[df['hour'] == hour]
-        if len(hour_df) < 5:
-            hourly_strategies[hour] = "Dados Insuficientes"
-            continue
-            
-        total = len(hour_df)
-        losses = len(hour_df[hour_df['result'] == 'L'])
-        first_attempt = len(hour_df[(hour_df['result'] == 'W') & (hour_df['attempt'] == 1)])
-        g1_recovery = len(hour_df[(hour_df['result'] == 'W') & (hour_df['attempt'] == 2)])
-        
-        loss_rate = (losses / total * 100)
-        first_rate = (first_attempt / total * 100)
-        g1_rate = (g1_recovery / total * 100)
-        
-        if loss_rate > 30:
-            hourly_strategies[hour] = "PAUSE"
-        elif g1_rate > 15 and first_rate < 60:
-            hourly_strategies[hour] = "Martingale Conservative"
-        elif first_rate > 50:
-            hourly_strategies[hour] = "Infinity Conservative"
-        else:
-            hourly_strategies[hour] = "Aguardar Mais Dados"
+    if len(df) > 0:
+        hours = recommend(rates_frame(hour_counts(df, by=['hour'])))
+        for hour, row in zip(hours.index, hours.itertuples(index=False)):
+            if row.total < MIN_ANALYSIS_SIGNALS:
+                hourly_strategies[hour] = "Dados Insuficientes"
+            else:
+                hourly_strategies[hour] = STRATEGY_LABELS[row.strategy_code]
     
     while current_hour <= END_HOUR and not day_ended:
         # Usar estratégia da hora anterior (ou 16h para primeira operação)
@@ -718,13 +586,35 @@ def simulate_infinity_operations(hour_operations):
     
     return total_ops, wins, losses
 
+@st.cache_data
+def load_analysis_history(selected_date, version=None):
+    """
+    Análises do modo live no dia (horizontes do mercado e ativos), lidas do
+    histórico binário em data/analysis (version = tamanho e mtime do arquivo).
+    """
+    analysis_log = get_analysis_log()
+    return analysis_log.to_frame(analysis_log.read_day(selected_date))
+
 # ==================== SISTEMA DE TRADING LOG REAL ====================
 
+@st.cache_resource
+def get_catalog():
+    """Catálogo dos arquivos de dados (compartilhado entre execuções do app)."""
+    return DataCatalog()
+
+@st.cache_resource
+def get_query():
+    """Consulta por intervalo sobre o catálogo e o log binário."""
+    return SignalQuery(get_catalog())
+
+@st.cache_resource
+def get_analysis_log():
+    """Histórico das análises do modo live (somente leitura no dashboard)."""
+    return AnalysisLog()
+
 def get_trading_log_path(selected_date):
     """Retorna o caminho para o arquivo de trading log da data selecionada."""
-    month_name = selected_date.strftime('%B')
-    day = selected_date.day
-    log_dir = f"data/trading ops/{month_name}/{day}/trading log"
+    log_dir = role_dir(selected_date, ROLE_TRADING_LOG)
     
     # Criar diretório se não existir
     os.makedirs(log_dir, exist_ok=True)
@@ -756,7 +646,8 @@ def save_trading_log(df_log, selected_date):
         shutil.copy2(log_path, backup_path)
     
     # Salvar novo arquivo
-    df_log.to_csv(log_path, index=False)
+    write_frame_atomic(df_log, log_path)
+    get_catalog().record(log_path, ROLE_TRADING_LOG, selected_date, frame=df_log)
     return log_path
 
 def validate_trading_log_data(operations_data, hour_signals):
@@ -1051,45 +942,39 @@ def main():
         else:
             st.info("🔍 Dashboard mostra simulação teórica padrão")
     
-    # Carregar dados - buscar na estrutura de pastas
-    month_name = selected_date.strftime('%B')  # Nome do mês em inglês
-    day = selected_date.day
-    filename = f"signals_{selected_date.strftime('%Y-%m-%d')}.csv"
-    
-    # Tentar diferentes caminhos possíveis
-    possible_paths = [
-        f"data/trading ops/{month_name}/{day}/daily ops/{filename}",
-        f"data/trading ops/{month_name}/{day:02d}/daily ops/{filename}",
-        f"data/trading ops/{month_name}/{day}/06/{filename}",  # Estrutura alternativa
-        f"data/trading ops/{month_name}/{day:02d}/06/{filename}",  # Estrutura alternativa com zero
-        f"data/{filename}",  # Fallback para estrutura antiga
-        f"data/signals_{selected_date.strftime('%Y-%m-%d')}.csv"  # Fallback original
-    ]
+    # Carregar dados - localizar o arquivo do dia pelo catálogo
+    catalog = get_catalog()
+    query = get_query()
+    file_path = query.day_source(selected_date)
     
-    file_path = None
-    for path in possible_paths:
-        if os.path.exists(path):
-            file_path = path
-            break
+    if file_path is None:
+        # Arquivos movidos manualmente ainda não registrados
+        catalog.scan_date(selected_date)
+        file_path = query.day_source(selected_date)
     
     # Verificar se arquivo existe
     if file_path is None:
         st.error(f"❌ Arquivo não encontrado para a data {selected_date.strftime('%d/%m/%Y')}")
         st.info("💡 Execute primeiro o sistema de coleta para gerar os dados.")
         
-        with st.expander("🔍 Ver caminhos verificados"):
-            st.write("O dashboard tentou encontrar o arquivo nos seguintes locais:")
-            for i, path in enumerate(possible_paths, 1):
-                st.write(f"{i}. `{path}`")
+        with st.expander("🔍 Ver detalhes"):
+            st.write(f"Nenhum arquivo de sinais registrado para esta data em `{catalog.manifest_path}`.")
             st.write("\n**💡 Dica:** Os dados são salvos automaticamente na estrutura:")
-            st.code("data/trading ops/{Mês}/{Dia}/daily ops/signals_YYYY-MM-DD.csv")
+            st.code("data/trading ops/YYYY/MM/DD/daily ops/signals_YYYY-MM-DD.csv")
         return
     
     # Carregar dados com base na configuração de operação
     with st.spinner("Carregando dados..."):
-        df = load_data(file_path)
+        # A consulta prefere a cópia binária atualizada (convert_to_binlog.py)
+        stat = file_path.stat()
+        df = load_data(selected_date, (str(file_path), stat.st_size, stat.st_mtime))
         metrics = calculate_metrics(df)
-        hourly_analysis = calculate_hourly_analysis(df)
+        
+        # Tabela por hora pré-calculada pelo nightly_build.py, se ainda valer para o arquivo do dia
+        csv_path = catalog.resolve(selected_date)
+        hourly_analysis = load_hourly_table(selected_date.strftime('%Y-%m-%d'), csv_path) if csv_path else None
+        if hourly_analysis is None:
+            hourly_analysis = calculate_hourly_analysis(df)
         
         # Mostrar dados diferentes baseado no status de operação
         if really_traded == "Não, pausei":
@@ -1210,6 +1095,49 @@ def main():
                 if strategy_used.replace(" ", "_").upper() != strategy.replace(" ", "_").upper():
                     st.warning("⚠️ Diferente da recomendação")
     
+    # Horizontes calculados pelo modo live (sem recalcular aqui)
+    analysis_file = get_analysis_log().path_for(selected_date)
+    if analysis_file.exists():
+        stat = analysis_file.stat()
+        analyses = load_analysis_history(selected_date, (stat.st_size, stat.st_mtime))
+        market = analyses[analyses['asset'].isna()]
+        if not market.empty:
+            last = market[market['timestamp'] == market['timestamp'].iloc[-1]]
+            st.markdown(f"**🕒 Condições por horizonte** (última análise: {last['timestamp'].iloc[0].strftime('%H:%M')})")
+            st.dataframe(
+                last.rename(columns={'horizon': 'horizonte'})[
+                    ['horizonte', 'total_operations', 'win_rate', 'first_attempt_success_rate',
+                     'g1_recovery_rate', 'g2_plus_stop_rate', 'recommended_strategy', 'analysis_period']],
+                hide_index=True,
+                use_container_width=True
+            )
+            
+            # Evolução das análises do dia no horizonte usado para decidir
+            decisions = market[market['horizon'] == DEFAULT_HORIZON]
+            if len(decisions) > 1:
+                evolution = decisions.melt(
+                    id_vars=['timestamp', 'recommended_strategy', 'total_operations'],
+                    value_vars=['win_rate', 'g2_plus_stop_rate'],
+                    var_name='taxa', value_name='valor'
+                )
+                fig_analyses = px.line(
+                    evolution,
+                    x='timestamp',
+                    y='valor',
+                    color='taxa',
+                    hover_data=['recommended_strategy', 'total_operations'],
+                    title=f'Análises do Modo Live ({DEFAULT_HORIZON})',
+                    markers=True
+                )
+                fig_analyses.add_hline(y=DECISION_THRESHOLDS['pause_threshold'], line_dash="dash", line_color="red",
+                                       annotation_text="Pausa")
+                fig_analyses.update_layout(
+                    xaxis_title="Horário da Análise",
+                    yaxis_title="Taxa (%)",
+                    yaxis=dict(range=[0, 100])
+                )
+                st.plotly_chart(fig_analyses, use_container_width=True)
+    
     # === SEÇÃO 4: ANÁLISES DETALHADAS ===
     if st.checkbox("📈 Mostrar Análises Detalhadas", value=True):
         
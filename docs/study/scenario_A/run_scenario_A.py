@@ -1,6 +1,10 @@
+import sys
 import pandas as pd
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from collector.loader import load_signals_frame
+
 DATA_DIR = Path(__file__).resolve().parents[1] / 'study_data'
 FILES = sorted(DATA_DIR.glob('signals_*.csv'))
 
@@ -13,10 +17,6 @@ DAILY_STOP_LOSS_HOURS = 3   # 3 losing hours -> -36
 TRADING_HOURS = range(17, 24)  # 17..23 inclusive
 
 
-def classify(row):
-    return row['result'] == 'W' and row['attempt'] in (1.0, 2.0)
-
-
 def simulate_day(df_day):
     cumulative_pnl = 0
     hour_logs = []
@@ -31,7 +31,7 @@ def simulate_day(df_day):
         wins = 0
         losses = 0
         for _, op in hour_df.iterrows():
-            if classify(op):
+            if op['is_win']:
                 wins += 1
                 pnl_hour += STAKE_WIN
                 if wins == HOURLY_WIN_TARGET:
@@ -51,14 +51,7 @@ def simulate_day(df_day):
 
 
 def main():
-    frames = []
-    for fp in FILES:
-        df = pd.read_csv(fp, dtype={'attempt': 'float'})
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df['date'] = df['timestamp'].dt.date
-        df['hour'] = df['timestamp'].dt.hour
-        frames.append(df)
-    data = pd.concat(frames, ignore_index=True)
+    data = load_signals_frame(FILES)
 
     summary = []
     for date, df_day in data.groupby('date'):
@@ -1,6 +1,10 @@
+import sys
 import pandas as pd
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from collector.loader import load_signals_frame
+
 DATA_DIR = Path(__file__).resolve().parents[1] / 'study_data'
 FILES = sorted(DATA_DIR.glob('signals_*.csv'))
 
@@ -11,10 +15,6 @@ DAILY_STOP = -36 # stop if cumulative <= -36
 TRADING_HOURS = range(17, 24)  # 17..23
 
 
-def is_win(row):
-    return row['result'] == 'W' and row['attempt'] in (1.0, 2.0)
-
-
 def process_day(df_day):
     cum = 0
     logs = []
@@ -24,13 +24,13 @@ def process_day(df_day):
         losses = 0
         pnl_hour = 0
         for _, op in hour_df.iterrows():
-            if is_win(op):
+            if op['is_win']:
                 wins += 1
                 pnl_hour += WIN_PNL
             else:
                 losses += 1
                 pnl_hour += LOSS_PNL
-            cum += WIN_PNL if is_win(op) else LOSS_PNL
+            cum += WIN_PNL if op['is_win'] else LOSS_PNL
             if cum >= DAILY_GOAL or cum <= DAILY_STOP:
                 break  # reach cut-off mid-hour
         logs.append((hour, wins, losses, pnl_hour, cum))
@@ -40,14 +40,7 @@ def process_day(df_day):
 
 
 def main():
-    frames = []
-    for fp in FILES:
-        d = pd.read_csv(fp, dtype={'attempt': 'float'})
-        d['timestamp'] = pd.to_datetime(d['timestamp'])
-        d['date'] = d['timestamp'].dt.date
-        d['hour'] = d['timestamp'].dt.hour
-        frames.append(d)
-    data = pd.concat(frames, ignore_index=True)
+    data = load_signals_frame(FILES)
 
     summary = []
     for date, df_day in data.groupby('date'):
@@ -1,8 +1,14 @@
+import sys
 import pandas as pd
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from collector.loader import load_signals_frame
+from collector.triggers import Trigger, evaluate_periods
+
 DATA_DIR = Path(__file__).resolve().parents[1] / 'study_data'
 FILES = sorted(DATA_DIR.glob('signals_*.csv'))
+SUMMARY_FILE = Path(__file__).with_name('summary.csv')
 
 WIN_PNL = 2
 LOSS_PNL = -6
@@ -12,10 +18,6 @@ TRADING_HOURS = range(17, 24)  # 17-23 inclusive
 WR_THRESHOLD = 80  # pause below/ equal 80
 
 
-def is_win(row):
-    return row['result'] == 'W' and row['attempt'] in (1.0, 2.0)
-
-
 def hour_stats(hour_df):
     total = len(hour_df)
     wins = hour_df['is_win'].sum()
@@ -32,22 +34,15 @@ def hour_stats(hour_df):
     }
 
 
-def should_pause(prev):
-    # Pause if ANY of these conditions are met:
+# Pause the next hour if ANY of these rules fires for the previous hour
+PAUSE_RULES = [
     # 1. Less than 10 signals in previous hour
-    if prev['total'] < 10:
-        return True
-    
+    Trigger('few_signals', 'count', '<', 10),
     # 2. 3 or more losses in last 10 signals of previous hour
-    if prev['losses_last10'] >= 3:
-        return True
-    
+    Trigger('losses_last10', 'losses', '>=', 3, last=10),
     # 3. Previous hour win rate is less than 80%
-    if prev['wr'] < WR_THRESHOLD:
-        return True
-    
-    # If none of the pause conditions are met, continue trading
-    return False
+    Trigger('low_wr', 'win_rate', '<', WR_THRESHOLD),
+]
 
 
 def process_day(df_day):
@@ -58,10 +53,11 @@ def process_day(df_day):
     for h in range(16, 24):
         hour_df = df_day[df_day['hour'] == h]
         stats_by_hour[h] = hour_stats(hour_df)
+    pauses = evaluate_periods(PAUSE_RULES, df_day, by='hour', index=range(16, 24))['fired']
     for hour in TRADING_HOURS:
         prev_stats = stats_by_hour.get(hour - 1, {'total': 0, 'losses': 0, 'loss_pct': 0, 'wr': 0})
         curr_stats = stats_by_hour.get(hour, {'total': 0, 'losses': 0, 'loss_pct': 0, 'wr': 0})
-        if should_pause(prev_stats):
+        if pauses[hour - 1]:
             logs.append((hour, 'PAUSE', 0, 0, 0, cum, prev_stats['wr'], curr_stats['wr']))
         else:
             wins = 0
@@ -84,15 +80,7 @@ def process_day(df_day):
 
 
 def main():
-    frames = []
-    for fp in FILES:
-        df = pd.read_csv(fp, dtype={'attempt': 'float'})
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df['date'] = df['timestamp'].dt.date
-        df['hour'] = df['timestamp'].dt.hour
-        df['is_win'] = df.apply(is_win, axis=1)
-        frames.append(df)
-    data = pd.concat(frames, ignore_index=True)
+    data = load_signals_frame(FILES)
 
     summary = []
     for date, df_day in data.groupby('date'):
@@ -107,7 +95,7 @@ def main():
     total = sum(d['pnl'] for d in summary)
     print("\n======================")
     print("TOTAL P&L across 6 days:", f"${total:+.2f}")
-    pd.DataFrame(summary).to_csv(Path(__file__).with_name('summary.csv'), index=False)
+    pd.DataFrame(summary).to_csv(SUMMARY_FILE, index=False)
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
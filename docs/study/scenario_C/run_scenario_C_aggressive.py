@@ -17,6 +17,8 @@ namespace['WIN_PNL'] = 4
 namespace['LOSS_PNL'] = -12
 # restore daily goal to 24
 namespace['DAILY_GOAL'] = 24
+# keep the conservative summary.csv intact
+namespace['SUMMARY_FILE'] = Path(__file__).with_name('summary_aggressive.csv')
 
 if __name__ == '__main__':
     namespace['main']() 
\ No newline at end of file
@@ -1,6 +1,11 @@
+import sys
 import pandas as pd
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from collector.loader import load_signals_frame
+from collector.triggers import Trigger, evaluate_periods
+
 DATA_DIR = Path(__file__).resolve().parents[1] / 'study_data'
 FILES = sorted(DATA_DIR.glob('signals_*.csv'))
 
@@ -12,10 +17,6 @@ TRADING_HOURS = range(17, 24)
 WR_THRESHOLD = 75  # pause if prev WR <= 75
 
 
-def is_win(row):
-    return row['result'] == 'W' and row['attempt'] in (1.0, 2.0)
-
-
 def stats(hour_df):
     total = len(hour_df)
     wins = hour_df['is_win'].sum()
@@ -32,25 +33,25 @@ def stats(hour_df):
     }
 
 
-def should_pause(prev):
-    if prev['total'] < 10:
-        return True
-    if prev['losses_last10'] >= 3 or prev['loss_pct'] > 30:
-        return True
-    if prev['wr'] <= WR_THRESHOLD:
-        return True
-    return False
+# Pause the next hour if ANY of these rules fires for the previous hour
+PAUSE_RULES = [
+    Trigger('few_signals', 'count', '<', 10),
+    Trigger('losses_last10', 'losses', '>=', 3, last=10),
+    Trigger('high_loss_pct', 'loss_rate', '>', 30),
+    Trigger('low_wr', 'win_rate', '<=', WR_THRESHOLD),
+]
 
 
 def simulate_day(df_day):
     cum = 0
     logs = []
     hour_stats = {h: stats(df_day[df_day['hour'] == h]) for h in range(16, 24)}
+    pauses = evaluate_periods(PAUSE_RULES, df_day, by='hour', index=range(16, 24))['fired']
     for h in TRADING_HOURS:
         prev = hour_stats.get(h - 1, {'total': 0, 'losses': 0, 'loss_pct': 0, 'wr': 0, 'losses_last10': 0})
         curr = hour_stats.get(h, {'total': 0, 'losses': 0, 'loss_pct': 0, 'wr': 0, 'losses_last10': 0})
 
-        if should_pause(prev):
+        if pauses[h - 1]:
             logs.append((h, 'PAUSE', 0, 0, 0, cum, prev['wr'], curr['wr']))
         else:
             wins = losses = 0
@@ -75,15 +76,7 @@ def simulate_day(df_day):
 
 
 def main():
-    frames=[]
-    for fp in FILES:
-        d=pd.read_csv(fp,dtype={'attempt':'float'})
-        d['timestamp']=pd.to_datetime(d['timestamp'])
-        d['date']=d['timestamp'].dt.date
-        d['hour']=d['timestamp'].dt.hour
-        d['is_win']=d.apply(is_win,axis=1)
-        frames.append(d)
-    data=pd.concat(frames,ignore_index=True)
+    data=load_signals_frame(FILES)
 
     total=0
     for date, g in data.groupby('date'):
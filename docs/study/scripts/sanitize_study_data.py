@@ -1,20 +1,23 @@
-import os
+import sys
 import pandas as pd
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from collector.loader import load_signals_frame, to_storage_frame, ATTEMPT_NULL
+from collector.catalog import DataCatalog, ROLE_LIVE, ROLE_STUDY
+
 def sanitize_data():
     """
     Finds specific daily signal files, sanitizes them according to study rules,
     and saves them to a new 'study_data' directory.
     """
     # --- Configuration ---
-    source_root = Path("data/trading ops")
+    catalog = DataCatalog()
     dest_root = Path("data/study_data")
     target_dates = [
         "2025-06-27", "2025-06-28", "2025-06-29", "2025-06-30",
         "2025-07-01", "2025-07-02"
     ]
-    target_files = [f"signals_{date}.csv" for date in target_dates]
 
     # --- Execution ---
     print(f"Starting data sanitization...")
@@ -22,13 +25,14 @@ def sanitize_data():
         print(f"Creating destination directory: {dest_root}")
         dest_root.mkdir(parents=True)
 
-    # Group files by date to handle consolidation
-    files_by_date = {date: [] for date in target_dates}
-    for root, _, files in os.walk(source_root):
-        for file in files:
-            for date in target_dates:
-                if file == f"signals_{date}.csv":
-                    files_by_date[date].append(Path(root) / file)
+    # Look up each date's files in the catalog (first run registers the tree)
+    if not catalog.dates():
+        catalog.scan()
+
+    files_by_date = {
+        date: [path for role, path in sorted(catalog.signal_files(date).items()) if role != ROLE_LIVE]
+        for date in target_dates
+    }
 
     if not any(files_by_date.values()):
         print("Error: No target files found. Please check paths and dates.")
@@ -40,27 +44,28 @@ def sanitize_data():
         if not file_paths:
             continue
 
+        if catalog.sources_unchanged(date, ROLE_STUDY, file_paths):
+            print(f"  - Skipping date: {date} (source files unchanged)")
+            continue
+
         print(f"  - Processing date: {date} ({len(file_paths)} file(s))")
         
         # Consolidate all data for the date into one DataFrame
-        df_list = [pd.read_csv(fp) for fp in file_paths]
-        df = pd.concat(df_list, ignore_index=True)
+        # (the loader already drops the timezone suffix from timestamps)
+        df = load_signals_frame(file_paths)
 
         # 1. Change 'W' on attempt 3 to 'L' and clear attempt field
-        loss_condition = (df['result'] == 'W') & (df['attempt'] == 3.0)
-        df.loc[loss_condition, 'result'] = 'L'
-        df.loc[df['result'] == 'L', 'attempt'] = pd.NA # Use NA for clean handling
-
-        # 2. Clean up timestamp format
-        df['timestamp'] = df['timestamp'].astype(str).str.replace(r'-\d{2}:\d{2}$', '', regex=True)
+        loss_condition = (df['result'] == 'W') & (df['attempt'] == 3)
+        df['result'] = df['result'].where(~loss_condition, 'L')
+        df.loc[df['result'] == 'L', 'attempt'] = ATTEMPT_NULL
 
-        # 3. Sort by timestamp to ensure chronological order
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df = df.sort_values(by='timestamp').reset_index(drop=True)
+        # 2. Sort by timestamp to ensure chronological order
+        df = df.sort_values(by='timestamp', kind='stable').reset_index(drop=True)
         
         # Save the consolidated and cleaned file to the destination
         dest_file_path = dest_root / f"signals_{date}.csv"
-        df.to_csv(dest_file_path, index=False)
+        to_storage_frame(df).to_csv(dest_file_path, index=False)
+        catalog.record(dest_file_path, ROLE_STUDY, date, sources=file_paths)
         print(f"    -> Saved consolidated and sanitized file to: {dest_file_path}")
 
     print("\nSanitization complete. Clean data is ready in 'data/study_data/'.")
@@ -1,6 +1,11 @@
+import sys
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from collector.loader import load_signals_frame
+
 DATA_DIR = Path('docs/strategy/martin gale/study/study_data')
 FILES = sorted(DATA_DIR.glob('signals_*.csv'))
 
@@ -9,24 +14,10 @@ TRADING_END = 23    # inclusive (17:00-23:59)
 PREV_START = 16     # we need previous hour
 
 # Load and concat
-frames = []
-for fp in FILES:
-    df = pd.read_csv(fp, dtype={'attempt': 'float'})
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df['date'] = df['timestamp'].dt.date
-    df['hour'] = df['timestamp'].dt.hour
-    frames.append(df)
-
-df_all = pd.concat(frames, ignore_index=True)
-
-# Define win / loss according to rules
-def classify(row):
-    if row['result'] == 'W' and row['attempt'] in (1.0, 2.0):
-        return 'win'
-    else:
-        return 'loss'
-
-df_all['outcome'] = df_all.apply(classify, axis=1)
+df_all = load_signals_frame(FILES)
+
+# Define win / loss according to rules (1st attempt or G1 = win)
+df_all['outcome'] = np.where(df_all['is_win'], 'win', 'loss')
 
 # Compute WR per date & hour
 wr_stats = (
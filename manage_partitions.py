@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Manutenção das partições mensais da tabela de sinais (PostgreSQL)
+
+Requer PG_DSN configurado e a tabela criada com PG_PARTITIONED=true.
+
+Uso:
+python manage_partitions.py --list
+python manage_partitions.py --detach-before 2025-01-01
+python manage_partitions.py --detach-before 2025-01-01 --archive-dir "data/archive/pg"
+python manage_partitions.py --detach-before 2025-01-01 --archive-dir "data/archive/pg" --drop
+"""
+
+import sys
+import os
+import argparse
+from datetime import datetime
+
+# Adicionar diretório do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from collector import Config, Storage
+
+
+def print_partitions(storage):
+    """Imprime as partições existentes."""
+    partitions = storage.list_partitions()
+
+    if not partitions:
+        print("ℹ️ Nenhuma partição encontrada (tabela não particionada ou vazia)")
+        return
+
+    print("📦 PARTIÇÕES DA TABELA signals:")
+    print("-" * 60)
+    for partition in partitions:
+        print(f"   {partition['name']}: {partition['start'].strftime('%Y-%m-%d')} até "
+              f"{partition['end'].strftime('%Y-%m-%d')} (~{partition['rows']} linhas)")
+    print("-" * 60)
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Manutenção das partições mensais da tabela de sinais")
+    parser.add_argument("--list", action="store_true", help="Listar partições")
+    parser.add_argument("--detach-before", type=str, help="Desanexar meses que terminam até esta data (YYYY-MM-DD)")
+    parser.add_argument("--archive-dir", type=str, help="Exportar partições desanexadas para CSV gzip nesta pasta")
+    parser.add_argument("--drop", action="store_true", help="Remover partições após desanexar")
+    args = parser.parse_args()
+
+    config = Config(require_telegram=False)
+    config.setup_logging()
+
+    if not config.has_postgres:
+        print("❌ PG_DSN não configurado")
+        return
+
+    storage = Storage(config)
+
+    if args.detach_before:
+        cutoff = datetime.strptime(args.detach_before, '%Y-%m-%d').date()
+        processed = storage.detach_partitions_before(cutoff, args.archive_dir, args.drop)
+
+        if processed:
+            print(f"✅ {len(processed)} partição(ões) desanexada(s): {', '.join(processed)}")
+        else:
+            print("ℹ️ Nenhuma partição anterior à data informada")
+
+    if args.list or not args.detach_before:
+        print_partitions(storage)
+
+
+if __name__ == "__main__":
+    main()
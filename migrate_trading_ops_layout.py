@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Migração da árvore de operações para o layout com ano
+
+Move as pastas do layout antigo (sem ano):
+    data/trading ops/June/27/<papel>/...
+para o layout ordenável por ano/mês/dia:
+    data/trading ops/2025/06/27/<papel>/...
+
+O ano de cada pasta é inferido pelas datas nos nomes dos arquivos
+(signals_YYYY-MM-DD.csv, real_trading_log_YYYY-MM-DD.csv); pastas sem
+arquivos datados usam --year. Ao final, o catálogo (data/catalog.json) é
+reescrito com os novos caminhos.
+
+Uso:
+python migrate_trading_ops_layout.py --dry-run
+python migrate_trading_ops_layout.py
+python migrate_trading_ops_layout.py --year 2025
+"""
+
+import sys
+import os
+import argparse
+import calendar
+import shutil
+from pathlib import Path
+
+# Adicionar diretório do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from collector.catalog import DataCatalog, DATA_ROOT, TRADING_OPS_DIR, DATE_IN_NAME_RE
+
+MONTHS = {name: number for number, name in enumerate(calendar.month_name) if name}
+
+
+def infer_year(folder: Path, month: int, day: int):
+    """Infere o ano de uma pasta de dia pelas datas nos nomes dos arquivos."""
+    years = set()
+    for path in folder.rglob('*'):
+        match = DATE_IN_NAME_RE.search(path.name)
+        if match:
+            year, file_month, file_day = (int(part) for part in match.group(1).split('-'))
+            if (file_month, file_day) == (month, day):
+                years.add(year)
+
+    if len(years) > 1:
+        raise ValueError(f"anos conflitantes em {folder}: {sorted(years)}")
+
+    return years.pop() if years else None
+
+
+def plan_moves(ops_root: Path, default_year):
+    """Lista as pastas de dia do layout antigo e seus destinos."""
+    plan = []
+    problems = []
+
+    for month_dir in sorted(ops_root.iterdir()):
+        if not month_dir.is_dir() or month_dir.name not in MONTHS:
+            continue
+
+        month = MONTHS[month_dir.name]
+        for day_folder in sorted(month_dir.iterdir()):
+            if not day_folder.is_dir() or not day_folder.name.isdigit():
+                continue
+
+            day = int(day_folder.name)
+            try:
+                year = infer_year(day_folder, month, day) or default_year
+            except ValueError as e:
+                problems.append(str(e))
+                continue
+
+            if year is None:
+                problems.append(f"ano desconhecido para {day_folder} (use --year)")
+                continue
+
+            target = ops_root / f"{year:04d}" / f"{month:02d}" / f"{day:02d}"
+            plan.append((day_folder, target))
+
+    return plan, problems
+
+
+def move_tree(source: Path, target: Path, moves: dict, conflicts: list) -> None:
+    """Move os arquivos de uma pasta para outra, mesclando com o que já existe."""
+    for path in sorted(p for p in source.rglob('*') if p.is_file()):
+        destination = target / path.relative_to(source)
+        if destination.exists():
+            conflicts.append(f"{path} -> {destination} (destino já existe)")
+            continue
+
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(path), str(destination))
+        moves[path] = destination
+
+
+def remove_empty_dirs(folder: Path) -> None:
+    """Remove pastas vazias de baixo para cima."""
+    for path in sorted((p for p in folder.rglob('*') if p.is_dir()), key=lambda p: len(p.parts), reverse=True):
+        if not any(path.iterdir()):
+            path.rmdir()
+    if folder.exists() and not any(folder.iterdir()):
+        folder.rmdir()
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Migra data/trading ops para o layout YYYY/MM/DD")
+    parser.add_argument("--root", type=str, default=DATA_ROOT, help="Pasta raiz dos dados (padrão: data)")
+    parser.add_argument("--year", type=int, help="Ano para pastas sem arquivos datados")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas mostrar o que seria movido")
+    args = parser.parse_args()
+
+    ops_root = Path(args.root) / TRADING_OPS_DIR
+    if not ops_root.exists():
+        print(f"ℹ️ Pasta não encontrada: {ops_root}")
+        return
+
+    plan, problems = plan_moves(ops_root, args.year)
+
+    if not plan:
+        print("✅ Nenhuma pasta no layout antigo - nada a migrar")
+    else:
+        print(f"📦 {len(plan)} pasta(s) de dia para migrar:")
+        for source, target in plan:
+            print(f"   {source} -> {target}")
+
+    for problem in problems:
+        print(f"⚠️ {problem}")
+
+    if args.dry_run or not plan:
+        return
+
+    moves = {}
+    conflicts = []
+    for source, target in plan:
+        move_tree(source, target, moves, conflicts)
+        remove_empty_dirs(source)
+
+    for month_dir in ops_root.iterdir():
+        if month_dir.is_dir() and month_dir.name in MONTHS:
+            remove_empty_dirs(month_dir)
+
+    # Reescrever o manifesto e registrar o que ainda não estava nele
+    catalog = DataCatalog(args.root)
+    rewritten = catalog.rewrite_paths(moves)
+    registered = catalog.scan()
+
+    print(f"✅ {len(moves)} arquivo(s) movido(s)")
+    print(f"🗂️ Catálogo: {rewritten} caminho(s) reescrito(s), {registered} entrada(s) registrada(s)")
+
+    for conflict in conflicts:
+        print(f"⚠️ Não movido: {conflict}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Build noturno: recalcula apenas os artefatos derivados desatualizados
+
+Artefatos (ver collector/reports.py):
+- relatório do dia e tabela por hora do dashboard, para cada dia do catálogo
+  (data/trading ops/YYYY/MM/DD/reports/);
+- saídas e summary.csv dos scripts de docs/study.
+
+Cada artefato é reconstruído só se suas entradas (checksums), sua receita ou
+suas saídas mudaram desde a última execução (data/build_state.json); os
+independentes rodam em paralelo.
+
+Uso:
+python nightly_build.py                  # Reconstruir o que mudou
+python nightly_build.py --dry-run        # Apenas listar o que seria reconstruído
+python nightly_build.py --jobs 4
+python nightly_build.py --only report/2025-06-27 --force
+python nightly_build.py --no-study       # Só os artefatos dos dias
+"""
+
+import sys
+import os
+import argparse
+import time
+
+# Adicionar diretório do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from collector import Config
+from collector.build import BuildGraph
+from collector.catalog import DataCatalog
+from collector.reports import declare_all
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Recalcula os artefatos derivados desatualizados")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas listar o que seria reconstruído")
+    parser.add_argument("--jobs", type=int, help="Processos em paralelo (padrão: número de CPUs)")
+    parser.add_argument("--only", nargs="+", metavar="PREFIXO",
+                        help="Apenas artefatos cujo nome começa com um dos prefixos (ex.: report/, study/)")
+    parser.add_argument("--force", action="store_true", help="Reconstruir mesmo se atualizado")
+    parser.add_argument("--no-study", action="store_true", help="Ignorar os scripts de docs/study")
+    args = parser.parse_args()
+
+    Config(require_telegram=False).setup_logging()
+
+    catalog = DataCatalog()
+    if not catalog.dates():
+        catalog.scan()
+
+    graph = BuildGraph(catalog.root)
+    declare_all(graph, catalog, study=not args.no_study)
+
+    if args.only:
+        keep = {name for name in graph.artifacts if name.startswith(tuple(args.only))}
+        graph.artifacts = {name: artifact for name, artifact in graph.artifacts.items() if name in keep}
+
+    if args.dry_run:
+        stale = graph.plan()
+        for name, reason in stale:
+            print(f"   {name}: {reason}")
+        print(f"🔍 {len(stale)}/{len(graph.artifacts)} artefato(s) seriam reconstruídos")
+        return
+
+    started = time.perf_counter()
+    summary = graph.run(jobs=args.jobs, force=args.force)
+    elapsed = time.perf_counter() - started
+
+    print(f"🔨 {len(summary['built'])} reconstruído(s), {len(summary['skipped'])} atualizado(s) "
+          f"em {elapsed:.1f}s")
+
+    if summary['failed'] or summary['blocked']:
+        for name, error in summary['failed'].items():
+            print(f"❌ {name}: {error}")
+        for name in summary['blocked']:
+            print(f"⏭️ {name}: dependência falhou")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Otimizador dos critérios de decisão do AdaptiveStrategy
+
+Avalia conjuntos de pause_threshold, martingale_threshold,
+infinity_threshold, min_operations e confidence_threshold contra todo o
+histórico: recomendação por hora + simulação de P&L do dia (ver
+collector/simulation.py). As estatísticas por hora de cada dia do catálogo
+vêm do build noturno (reconstruídas aqui se estiverem desatualizadas), então
+cada candidato custa só aritmética; os candidatos são divididos entre
+processos.
+
+Os últimos dias (--holdout) ficam fora da amostra: a tabela é ordenada pelo
+P&L dentro da amostra e mostra o P&L fora da amostra de cada conjunto. A
+linha `baseline` são os critérios atuais.
+
+Uso:
+python optimize_thresholds.py                          # Grade completa, histórico do catálogo
+python optimize_thresholds.py --search random --samples 5000 --seed 7
+python optimize_thresholds.py --files docs/study/study_data/*.csv --no-catalog
+python optimize_thresholds.py --holdout 0.25 --top 30 --output data/thresholds.csv
+"""
+
+import sys
+import os
+import argparse
+import time
+
+import pandas as pd
+
+# Adicionar diretório do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from collector import Config
+from collector.catalog import DataCatalog, write_frame_atomic
+from collector.loader import load_signals_frame
+from collector.reports import load_catalog_hour_stats
+from collector.simulation import HistoryStats, grid_candidates, hour_stats, optimize, random_candidates
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Otimiza os critérios de decisão do AdaptiveStrategy")
+    parser.add_argument("--search", choices=["grid", "random"], default="grid", help="Tipo de busca")
+    parser.add_argument("--samples", type=int, default=2000, help="Candidatos da busca aleatória")
+    parser.add_argument("--seed", type=int, help="Semente da busca aleatória")
+    parser.add_argument("--holdout", type=float, default=0.3, help="Fração final dos dias fora da amostra")
+    parser.add_argument("--jobs", type=int, help="Processos em paralelo (padrão: número de CPUs)")
+    parser.add_argument("--files", nargs="+", default=[], help="Arquivos de sinais extras")
+    parser.add_argument("--no-catalog", action="store_true", help="Não usar os dias do catálogo")
+    parser.add_argument("--top", type=int, default=20, help="Linhas da tabela")
+    parser.add_argument("--output", help="Gravar a tabela completa em CSV")
+    args = parser.parse_args()
+
+    config = Config(require_telegram=False)
+    config.setup_logging()
+
+    frames = []
+    if not args.no_catalog:
+        catalog = DataCatalog()
+        if not catalog.dates():
+            catalog.scan()
+        frames.append(load_catalog_hour_stats(catalog, jobs=args.jobs))
+    for path in args.files:
+        frames.append(hour_stats(load_signals_frame(path)))
+
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        print("⚠️ Nenhum histórico encontrado")
+        sys.exit(1)
+
+    history = HistoryStats.from_frame(pd.concat(frames, ignore_index=True))
+    if args.search == "grid":
+        candidates = grid_candidates()
+    else:
+        candidates = random_candidates(args.samples, seed=args.seed)
+
+    print(f"📊 {len(history)} dia(s) ({history.days[0]} a {history.days[-1]}), "
+          f"{len(candidates)} candidato(s)")
+
+    started = time.perf_counter()
+    table = optimize(history, candidates, holdout=args.holdout, jobs=args.jobs,
+                     start_hour=config.start_hour, end_hour=config.end_hour)
+    elapsed = time.perf_counter() - started
+    print(f"⚡ {len(table)} candidato(s) avaliados em {elapsed:.1f}s")
+
+    columns = ['rank', 'pause_threshold', 'martingale_threshold', 'infinity_threshold',
+               'min_operations', 'confidence_threshold', 'is_pnl', 'is_worst_day',
+               'oos_pnl', 'oos_pnl_per_day', 'oos_worst_day', 'oos_target_days', 'oos_stop_days', 'baseline']
+    shown = table.head(args.top)
+    if not shown['baseline'].any():
+        shown = pd.concat([shown, table[table['baseline']]])
+    print(shown[columns].to_string(index=False, float_format=lambda x: f"{x:.1f}"))
+
+    if args.output:
+        write_frame_atomic(table, args.output)
+        print(f"💾 Tabela completa: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Testes da recomendação vetorizada (collector/adaptive_strategy.py)
+
+`recommend` / `recommend_arrays` precisam decidir exatamente como
+`AdaptiveStrategy._conditions_from_counts` + `_determine_strategy`, inclusive
+nas fronteiras dos critérios e com critérios diferentes dos padrão.
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from collector.adaptive_strategy import (DECISION_THRESHOLDS, STRATEGY_ORDER, AdaptiveStrategy, rates_frame,
+                                         recommend, recommend_arrays)
+from collector.config import Config
+from collector.market_window import SignalCounts
+
+
+def random_counts(rng: np.random.Generator, rows: int) -> pd.DataFrame:
+    totals = rng.integers(0, 41, rows)
+    parts = np.array([rng.multinomial(total, rng.dirichlet(np.ones(4))) for total in totals]).reshape(rows, 4)
+    return pd.DataFrame({'total': totals, 'first_attempt': parts[:, 0], 'g1': parts[:, 1],
+                         'g2': parts[:, 2], 'stops': parts[:, 3]})
+
+
+def boundary_counts() -> pd.DataFrame:
+    """Contadores que caem exatamente nos critérios padrão (10 ops, 30%, 60%...)."""
+    rows = [
+        (total, first, g1, g2, total - first - g1 - g2)
+        for total in (9, 10, 20)
+        for first, g1, g2 in itertools.product(range(total + 1), repeat=3)
+        if first + g1 + g2 <= total
+    ]
+    return pd.DataFrame(rows, columns=['total', 'first_attempt', 'g1', 'g2', 'stops'])
+
+
+def scalar_conditions(strategy: AdaptiveStrategy, counts: pd.DataFrame):
+    return [
+        strategy._conditions_from_counts(SignalCounts(total=row.total, first_attempt=row.first_attempt,
+                                                      g1=row.g1, g2=row.g2, stops=row.stops), 'teste')
+        for row in counts.itertuples(index=False)
+    ]
+
+
+def thresholds_cases():
+    rng = np.random.default_rng(7)
+    yield dict(DECISION_THRESHOLDS)
+    for _ in range(5):
+        yield dict(DECISION_THRESHOLDS,
+                   pause_threshold=float(rng.choice([10, 20, 25, 30, 40])),
+                   martingale_threshold=float(rng.choice([40, 50, 65, 75])),
+                   infinity_threshold=float(rng.choice([40, 50, 60, 70])),
+                   min_operations=int(rng.choice([1, 5, 10, 15])))
+
+
+@pytest.mark.parametrize('thresholds', list(thresholds_cases()))
+def test_recommend_matches_determine_strategy(thresholds):
+    strategy = AdaptiveStrategy(Config(require_telegram=False))
+    strategy.decision_thresholds = dict(thresholds)
+    counts = pd.concat([random_counts(np.random.default_rng(3), 3000), boundary_counts()], ignore_index=True)
+
+    table = recommend(rates_frame(counts), thresholds)
+    conditions = scalar_conditions(strategy, counts)
+
+    assert list(table['strategy']) == [c.recommended_strategy for c in conditions]
+    assert table['confidence'].tolist() == [c.confidence_level for c in conditions]
+    assert table['first_rate'].tolist() == [c.first_attempt_success_rate for c in conditions]
+    assert table['g1_rate'].tolist() == [c.g1_recovery_rate for c in conditions]
+    assert table['g2_stop_rate'].tolist() == [c.g2_plus_stop_rate for c in conditions]
+    assert table['win_rate'].tolist() == [c.win_rate for c in conditions]
+
+
+def test_recommend_arrays_broadcasts():
+    strategy = AdaptiveStrategy(Config(require_telegram=False))
+    first_rates = np.array([[70.0], [10.0]])
+    g2_stop_rates = np.array([5.0, 30.0, 45.0])
+
+    codes, confidence = recommend_arrays(np.full((2, 3), 20), first_rates, 70.0, g2_stop_rates)
+
+    assert codes.shape == confidence.shape == (2, 3)
+    for i, j in itertools.product(range(2), range(3)):
+        expected_type, expected_confidence = strategy._determine_strategy(20, first_rates[i, 0], 70.0,
+                                                                          g2_stop_rates[j])
+        assert STRATEGY_ORDER[codes[i, j]] == expected_type
+        assert confidence[i, j] == pytest.approx(expected_confidence)
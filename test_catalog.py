@@ -0,0 +1,46 @@
+"""
+Testes do catálogo (data/catalog.json)
+"""
+
+import multiprocessing
+
+import pandas as pd
+
+from collector.catalog import DataCatalog, ROLE_LIVE, file_checksum, write_frame_atomic
+
+WRITERS = 4
+DAYS_PER_WRITER = 10
+
+
+def write_days(root: str, writer: int) -> None:
+    catalog = DataCatalog(root)
+    for index in range(DAYS_PER_WRITER):
+        day = f"2025-{writer + 1:02d}-{index + 1:02d}"
+        path = f"{root}/signals_{day}.csv"
+        frame = pd.DataFrame({'timestamp': [f"{day} 17:00:00"], 'asset': ['EURUSD'],
+                              'result': ['W'], 'attempt': [1]})
+        checksum = write_frame_atomic(frame, path)
+        catalog.record(path, ROLE_LIVE, day, frame=frame, checksum=checksum)
+
+
+def test_concurrent_writers_keep_all_entries(tmp_path):
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=write_days, args=(str(tmp_path), writer)) for writer in range(WRITERS)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    assert len(DataCatalog(tmp_path).dates()) == WRITERS * DAYS_PER_WRITER
+
+
+def test_write_frame_atomic_checksum_matches_file(tmp_path):
+    path = tmp_path / 'signals_2025-07-02.csv'
+    frame = pd.DataFrame({'timestamp': ['2025-07-02 17:00:00'], 'asset': ['EURUSD'], 'result': ['W'], 'attempt': [1]})
+
+    checksum = write_frame_atomic(frame, path)
+    entry = DataCatalog(tmp_path).record(path, ROLE_LIVE, checksum=checksum)
+
+    assert checksum == file_checksum(path) == entry['sha256']
+    assert DataCatalog(tmp_path).is_unchanged(path)
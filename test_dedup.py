@@ -0,0 +1,81 @@
+"""
+Testes da deduplicação de sinais (SignalDeduper e merge k-way)
+"""
+
+from collector.dedup import SignalDeduper
+from collector.merge import iter_csv_records, merge_records, write_records
+
+
+def record(timestamp, asset='EURUSD', result='W', attempt='1', chat_id='', message_id=''):
+    return (f"2025-07-02 {timestamp}", asset, result, attempt, chat_id, message_id)
+
+
+def test_message_id_identifies_signal():
+    seen = SignalDeduper()
+    assert seen.add('17:00:00', 'EURUSD', 'W', -1001, 10)
+    # Mesma chave legada, outra mensagem: sinal legítimo
+    assert seen.add('17:00:00', 'EURUSD', 'W', -1001, 11)
+    # Mesma mensagem, outro timestamp: duplicata
+    assert not seen.add('17:00:05', 'EURUSD', 'W', -1001, 10)
+    # Outro chat com o mesmo message_id
+    assert seen.add('17:00:00', 'EURUSD', 'W', -1002, 10)
+
+
+def test_legacy_key_includes_result():
+    seen = SignalDeduper()
+    assert seen.add('17:00:00', 'EURUSD', 'W')
+    assert seen.add('17:00:00', 'EURUSD', 'L')
+    assert not seen.add('17:00:00', 'EURUSD', 'W')
+
+
+def test_legacy_row_matches_row_with_id():
+    seen = SignalDeduper()
+    assert seen.add('17:00:00', 'EURUSD', 'W')
+    assert not seen.add('17:00:00', 'EURUSD', 'W', -1001, 10)
+
+    seen = SignalDeduper()
+    assert seen.add('17:00:00', 'EURUSD', 'W', -1001, 10)
+    assert not seen.add('17:00:00', 'EURUSD', 'W')
+
+
+def test_clear_legacy_keeps_message_ids():
+    seen = SignalDeduper()
+    seen.add('17:00:00', 'EURUSD', 'W', -1001, 10)
+    seen.add('17:00:00', 'GBPUSD', 'L')
+    seen.clear_legacy()
+    assert seen.add('17:00:00', 'GBPUSD', 'L')
+    assert not seen.add('17:00:09', 'EURUSD', 'W', -1001, 10)
+
+
+def test_merge_dedups_message_ids_across_timestamps():
+    first = [record('17:00:00', chat_id='-1001', message_id='10'),
+             record('17:00:05', 'GBPUSD', 'L', '', '-1001', '11')]
+    # Mesma mensagem 10 com o timestamp arredondado de outra coleta
+    second = [record('17:00:01', chat_id='-1001', message_id='10'),
+              record('17:00:07', 'USDJPY', chat_id='-1001', message_id='12')]
+
+    merged = list(merge_records([iter(first), iter(second)]))
+
+    assert [r[5] for r in merged] == ['10', '11', '12']
+    assert merged[0][0] == '2025-07-02 17:00:00'
+
+
+def test_merge_keeps_first_source_and_legacy_rows():
+    old = [record('17:00:00'), record('17:00:00', result='L', attempt='')]
+    new = [record('17:00:00', chat_id='-1001', message_id='10'),
+           record('17:00:00', 'GBPUSD', chat_id='-1001', message_id='11')]
+
+    merged = list(merge_records([iter(old), iter(new)]))
+
+    # O W sem id coincide com a mensagem 10 pela chave legada
+    assert merged == [old[0], old[1], new[1]]
+
+
+def test_merge_roundtrip_through_csv(tmp_path):
+    path = tmp_path / 'signals.csv'
+    records = [record('17:00:00', chat_id='-1001', message_id='10'), record('17:00:03', 'GBPUSD', 'L', '')]
+
+    summary = write_records(merge_records([iter(records), iter(records)]), path)
+
+    assert summary['rows'] == 2 and summary['sorted']
+    assert list(iter_csv_records(path)) == records
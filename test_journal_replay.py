@@ -0,0 +1,148 @@
+"""
+Testes da recuperação do modo live (journal + CSV em append)
+
+Simulam uma queda no meio do append do CSV do dia: a última linha fica
+incompleta e os sinais voltam pela reaplicação do journal.
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+import pytz
+
+from collector.async_storage import AsyncStorage
+from collector.config import Config
+from collector.journal import SignalJournal
+from collector.loader import load_signals_frame
+from collector.parser import Signal
+from collector.storage import Storage
+
+TZ = pytz.timezone('America/Sao_Paulo')
+CSV_PATH = 'data/signals_2025-07-02.csv'
+
+
+def make_signal(second: int, asset: str = 'EURUSD', result: str = 'W', message_id: int = None) -> Signal:
+    return Signal(
+        timestamp=TZ.localize(datetime(2025, 7, 2, 17, 0, second)),
+        asset=asset,
+        result=result,
+        attempt=1 if result == 'W' else None,
+        message_id=message_id if message_id is not None else 100 + second,
+        chat_id=-1001
+    )
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return Storage(Config(require_telegram=False))
+
+
+def crash_during_append(storage: Storage, signals, torn_tail: str) -> None:
+    """Grava `signals` em append e simula uma queda deixando `torn_tail` no fim."""
+    storage.append_to_csv(signals)
+    for appender in storage._csv_appenders.values():
+        appender.file.close()
+    storage._csv_appenders.clear()
+    with open(CSV_PATH, 'a', newline='') as f:
+        f.write(torn_tail)
+
+
+def replay(storage: Storage, journal_signals) -> None:
+    journal = SignalJournal()
+    journal.path.parent.mkdir(parents=True, exist_ok=True)
+
+    async def write():
+        journal.start()
+        for signal in journal_signals:
+            await journal.append(signal)
+        await journal.close()
+
+    asyncio.run(write())
+    assert journal.replay(lambda signals: storage.recover_signals(signals, 'csv')) == len(journal_signals)
+
+
+@pytest.mark.parametrize('torn_tail', ['2025-07-02 17:00:0', '2025-07-0', '2025-07-02 17:00:02,EURUSD,W,1,-1001,102'])
+def test_replay_discards_torn_csv_line(storage, torn_tail):
+    written = [make_signal(0), make_signal(1, 'GBPUSD', 'L')]
+    journal_signals = written + [make_signal(2)]
+    crash_during_append(storage, written, torn_tail)
+
+    replay(storage, journal_signals)
+
+    frame = load_signals_frame(CSV_PATH)
+    assert len(frame) == 3
+    assert frame['asset'].notna().all()
+    assert list(frame['message_id']) == [100, 101, 102]
+
+    # Próximas inicializações também funcionam
+    replay(storage, journal_signals)
+    assert len(load_signals_frame(CSV_PATH)) == 3
+
+
+def test_append_after_torn_line(storage):
+    crash_during_append(storage, [make_signal(0)], '2025-07-02 17:00:0')
+
+    storage.append_to_csv([make_signal(1)])
+    storage.sync_csv_appends()
+
+    frame = load_signals_frame(CSV_PATH)
+    assert list(frame['message_id']) == [100, 101]
+    assert storage.catalog.is_unchanged(CSV_PATH)
+
+
+def test_torn_header_is_rewritten(storage, tmp_path):
+    (tmp_path / 'data').mkdir()
+    with open(CSV_PATH, 'w', newline='') as f:
+        f.write('timestamp,as')
+
+    storage.append_to_csv([make_signal(0)])
+    storage.sync_csv_appends()
+
+    assert list(load_signals_frame(CSV_PATH)['message_id']) == [100]
+
+
+def test_torn_journal_entry_is_ignored(storage):
+    replay(storage, [make_signal(0)])
+    journal = SignalJournal()
+    with open(journal.path, 'w', encoding='utf-8') as f:
+        f.write('{"timestamp": "2025-07-02T17:00:01-03:00", "asset": "EUR')
+
+    assert journal.read_entries() == []
+
+
+def test_binlog_failure_is_counted(storage, monkeypatch):
+    def fail(signals):
+        raise OSError('disco cheio')
+
+    monkeypatch.setattr(storage.binlog, 'append', fail)
+    store = AsyncStorage(storage, storage.config, 'csv', append_csv=True)
+
+    async def write():
+        store.start()
+        await store.save(make_signal(0))
+        await store.close()
+
+    asyncio.run(write())
+
+    # O CSV foi gravado, mas o lote conta como falho: sem checkpoint do journal
+    assert store.failed_signals == 1
+    assert list(load_signals_frame(CSV_PATH)['message_id']) == [100]
+
+
+def test_catalog_follows_appends(storage):
+    storage.append_to_csv([make_signal(0), make_signal(3)])
+
+    # Entrada atual já durante a sessão, antes de sync_csv_appends
+    assert storage.catalog.is_unchanged(CSV_PATH)
+    entry = storage.catalog.entry_for(CSV_PATH)
+    assert (entry['rows'], entry['min_ts'], entry['max_ts'], entry['sorted']) == \
+        (2, '2025-07-02 17:00:00', '2025-07-02 17:00:03', True)
+
+    storage.append_to_csv([make_signal(1)])
+    storage.sync_csv_appends()
+
+    entry = storage.catalog.entry_for(CSV_PATH)
+    assert storage.catalog.is_unchanged(CSV_PATH)
+    assert (entry['rows'], entry['sorted']) == (3, False)
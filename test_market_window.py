@@ -0,0 +1,129 @@
+"""
+Testes da janela deslizante (collector/market_window.py e signal_window.py)
+
+Fluxos aleatórios com sinais fora de ordem, empates e expirações explícitas
+são conferidos, a cada passo, contra contagens por força bruta.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+import pytz
+
+from collector.market_window import HORIZONS, SESSION, MarketWindow, SignalCounts, SignalTally
+from collector.parser import Signal
+from collector.signal_window import SignalWindow, outcome_code, to_epoch_us
+
+TZ = pytz.timezone('America/Sao_Paulo')
+ASSETS = ['EURUSD', 'GBPUSD', 'USDJPY', 'AUDCAD']
+
+
+def random_signal(rng: random.Random, timestamp: datetime) -> Signal:
+    result = rng.choice(['W'] * 8 + ['L'] * 3 + ['?'])
+    attempt = rng.choice([None, 1, 2, 3, 4]) if result == 'W' else None
+    return Signal(timestamp=timestamp, asset=rng.choice(ASSETS), result=result, attempt=attempt)
+
+
+def random_stream(seed: int, steps: int = 600):
+    """Passos ('add', sinal) ou ('expire', agora), com atrasos de até 3h."""
+    rng = random.Random(seed)
+    clock = TZ.localize(datetime(2025, 7, 2, 17, 0, 0))
+    for _ in range(steps):
+        clock += timedelta(seconds=rng.choice([0, 0, 1, 5, 30, 90, 400]))
+        if rng.random() < 0.1:
+            yield 'expire', clock + timedelta(seconds=rng.randint(0, 1800))
+            continue
+        timestamp = clock
+        if rng.random() < 0.15:
+            timestamp -= timedelta(seconds=rng.randint(1, 3 * 3600))
+        yield 'add', random_signal(rng, timestamp)
+
+
+def brute_counts(signals):
+    counts = SignalCounts.from_signals(signals)
+    by_asset = {}
+    for signal in signals:
+        by_asset.setdefault(signal.asset, SignalCounts()).add(signal)
+    return counts, {asset: c for asset, c in by_asset.items() if c.total > 0}
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_market_window_matches_brute_force(seed):
+    window = MarketWindow()
+    added, accepted = [], []
+    clock_us = None
+
+    for kind, value in random_stream(seed):
+        if kind == 'expire':
+            window.expire(value)
+            now_us = to_epoch_us(value)
+        else:
+            added.append(value)
+            if window.add(value):
+                accepted.append(value)
+            now_us = to_epoch_us(value.timestamp)
+        clock_us = now_us if clock_us is None else max(clock_us, now_us)
+
+        for name, horizon in HORIZONS.items():
+            if horizon is None:
+                inside = added
+            else:
+                cutoff = clock_us - horizon // timedelta(microseconds=1)
+                inside = [s for s in accepted if to_epoch_us(s.timestamp) >= cutoff]
+
+            counts, by_asset = brute_counts(inside)
+            assert window.counts(name) == counts, (name, len(added))
+            assert window.asset_counts(name) == by_asset
+            assert window.count(name) == len(inside)
+            expected_first = min((s.timestamp for s in inside), default=None)
+            assert window.first_timestamp(name) == expected_first
+
+            if horizon is not None:
+                epochs, _, outcomes = window.view(name)
+                assert list(epochs) == sorted(to_epoch_us(s.timestamp) for s in inside)
+                assert sorted(outcomes.tolist()) == sorted(outcome_code(s) for s in inside)
+
+    tally = SignalTally.from_signals(added)
+    assert window.streaks() == tally.streaks
+    assert window.counts(SESSION) == tally.counts
+
+
+def test_market_window_rejects_signals_older_than_longest_horizon():
+    window = MarketWindow()
+    now = TZ.localize(datetime(2025, 7, 2, 20, 0, 0))
+    assert window.add(Signal(now, 'EURUSD', 'W', 1))
+    assert not window.add(Signal(now - timedelta(hours=3), 'EURUSD', 'L', None))
+    assert window.count('120min') == 1
+    assert window.count(SESSION) == 2
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_signal_window_matches_sorted_list(seed):
+    rng = np.random.default_rng(seed)
+    buffer = SignalWindow(capacity=16)
+    model = []  # (epoch, ordem de chegada, ativo, desfecho), ordenado como o buffer
+
+    for arrival in range(3000):
+        if rng.random() < 0.05 and model:
+            cutoff = model[int(rng.integers(0, len(model)))][0]
+            removed = buffer.discard_before(buffer.index_at(cutoff))
+            kept = [item for item in model if item[0] >= cutoff]
+            assert removed == len(model) - len(kept)
+            model = kept
+            continue
+
+        newest = model[-1][0] if model else 0
+        epoch = int(newest + rng.integers(-50, 100)) if model else 1_000
+        asset, outcome = int(rng.integers(0, 4)), int(rng.integers(0, 6))
+        buffer.append(epoch, asset, outcome)
+        # Empates: o mais recente fica depois (searchsorted side='right')
+        model.append((epoch, arrival, asset, outcome))
+        model.sort(key=lambda item: (item[0], item[1]))
+
+        epochs, assets, outcomes = buffer.view()
+        assert len(buffer) == len(model)
+        assert epochs.tolist() == [item[0] for item in model]
+        assert assets.tolist() == [item[2] for item in model]
+        assert outcomes.tolist() == [item[3] for item in model]
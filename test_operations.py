@@ -0,0 +1,66 @@
+"""
+Testes do agrupamento de sinais em operações (collector/operations.py)
+
+As duas implementações são comparadas com a varredura para trás anterior
+(benchmark_grouping.backward_scan), inclusive com timestamps repetidos e
+sinais fora de ordem.
+"""
+
+import pandas as pd
+import pytest
+import pytz
+
+from benchmark_grouping import backward_scan, generate_frame
+from collector.operations import group_operations, group_operations_frame
+from collector.parser import Signal
+
+
+def frame_signals(df: pd.DataFrame):
+    return [
+        Signal(timestamp=ts, asset=asset, result=result, attempt=int(attempt) or None)
+        for ts, asset, result, attempt in zip(df['timestamp'].dt.to_pydatetime(), df['asset'],
+                                              df['result'], df['attempt'])
+    ]
+
+
+@pytest.mark.parametrize('gap', [0.3, 5, 120, 900])
+@pytest.mark.parametrize('seed', range(5))
+def test_two_pointers_match_backward_scan(gap, seed):
+    # Embaralhado: as implementações ordenam por conta própria
+    df = generate_frame(2000, 4, gap, seed).sample(frac=1, random_state=seed)
+    signals = frame_signals(df)
+
+    expected = backward_scan(signals)
+
+    assert group_operations(signals) == expected
+
+    frame = group_operations_frame(df)
+    assert frame['attempts'].tolist() == [op['attempts'] for op in expected]
+    assert frame['asset'].tolist() == [op['asset'] for op in expected]
+    assert frame['result'].tolist() == [op['result'] for op in expected]
+    assert list(frame['timestamp'].dt.to_pydatetime()) == [op['timestamp'] for op in expected]
+
+
+def test_window_edges_and_attempt_cap():
+    tz = pytz.timezone('America/Sao_Paulo')
+    base = pd.Timestamp('2025-07-02 17:00:00', tz=tz)
+    offsets = [0, 0, 300, 600, 601, 1300, 1300, 1301]
+    results = ['W', 'L', 'L', 'L', 'L', 'W', 'L', 'L']
+    df = pd.DataFrame({
+        'timestamp': [base + pd.Timedelta(seconds=s) for s in offsets],
+        'asset': 'EURUSD',
+        'result': results,
+        'attempt': [2 if r == 'W' else 0 for r in results]
+    })
+    signals = frame_signals(df)
+
+    expected = backward_scan(signals)
+
+    assert [op['attempts'] for op in expected] == [2, 2, 3, 3, 3, 2, 2, 3]
+    assert group_operations(signals) == expected
+    assert group_operations_frame(df)['attempts'].tolist() == [op['attempts'] for op in expected]
+
+
+def test_empty_input():
+    assert group_operations([]) == []
+    assert group_operations_frame(pd.DataFrame(columns=['timestamp', 'asset', 'result', 'attempt'])).empty
@@ -0,0 +1,33 @@
+"""
+Os resultados versionados dos estudos (docs/study) batem com os scripts
+
+O build noturno regrava essas saídas; se o texto impresso por um script
+mudar, o arquivo versionado precisa ser regenerado no mesmo commit, senão
+toda execução do build deixa o repositório modificado.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from collector.reports import STUDY_ROOT, STUDY_SCRIPTS
+
+ROOT = Path(__file__).resolve().parent
+
+
+@pytest.mark.parametrize('folder, script, outputs', STUDY_SCRIPTS, ids=[script for _, script, _ in STUDY_SCRIPTS])
+def test_study_outputs_are_up_to_date(folder, script, outputs):
+    folder_path = ROOT / STUDY_ROOT / folder
+    committed = {name: (folder_path / name).read_bytes() for name in outputs}
+
+    # Mesmo ambiente de collector.reports.build_study_scenario
+    env = dict(os.environ, PYTHONIOENCODING='utf-8')
+    printed = subprocess.run([sys.executable, script], cwd=folder_path, env=env,
+                             capture_output=True, check=True).stdout
+
+    assert printed == committed[outputs[0]]
+    for name in outputs[1:]:
+        assert (folder_path / name).read_bytes() == committed[name]
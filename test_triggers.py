@@ -0,0 +1,134 @@
+"""
+Testes dos gatilhos (collector/triggers.py)
+
+O `TriggerEngine` (sinal a sinal, com anéis) e o `evaluate_frame` (somas
+acumuladas sobre o DataFrame do loader) precisam concordar em toda
+operação, para todas as métricas, janelas e escopos.
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from collector.live_trader import LIVE_TRIGGERS
+from collector.loader import ATTEMPT_NULL, combine_signal_frames, frame_to_signals
+from collector.triggers import (ASSET, MARKET, METRICS, PAUSE, Trigger, TriggerEngine, evaluate_empty,
+                                evaluate_frame, evaluate_periods)
+
+ASSETS = ['EURUSD', 'GBPUSD', 'USDJPY']
+
+THRESHOLDS = {
+    'count': [1, 5, 10],
+    'losses': [0, 2, 3],
+    'wins': [1, 4],
+    'loss_rate': [0, 30, 50, 100],
+    'win_rate': [0, 60, 70, 100],
+    'loss_streak': [1, 2, 3],
+}
+
+
+def random_triggers(seed: int):
+    rng = np.random.default_rng(seed)
+    triggers = []
+    for index, (metric, op) in enumerate(itertools.product(METRICS, ['<', '<=', '>', '>=', '=='])):
+        triggers.append(Trigger(
+            f"{metric}_{index}", metric, op,
+            threshold=float(rng.choice(THRESHOLDS[metric])),
+            last=[None, 1, 3, 10][int(rng.integers(0, 4))],
+            scope=MARKET if rng.random() < 0.5 else ASSET,
+            action=PAUSE if rng.random() < 0.3 else 'alert'
+        ))
+    return triggers
+
+
+def random_frame(seed: int, rows: int = 800) -> pd.DataFrame:
+    """Operações (W em 1ª/G1/G2 ou STOP) em ordem, espalhadas por algumas horas."""
+    rng = np.random.default_rng(seed)
+    offsets = np.sort(rng.integers(0, 5 * 3600, rows))
+    results = rng.choice(['W', 'L'], rows, p=[0.75, 0.25])
+    attempts = np.where(results == 'W', rng.integers(1, 4, rows), ATTEMPT_NULL).astype(np.int8)
+    raw = pd.DataFrame({
+        'timestamp': pd.Timestamp('2025-07-02 14:00:00') + pd.to_timedelta(offsets, unit='s'),
+        'asset': rng.choice(ASSETS, rows),
+        'result': results,
+        'attempt': attempts
+    })
+    return combine_signal_frames([raw])
+
+
+def engine_states(triggers, frame: pd.DataFrame, by):
+    """Estado de cada regra e disparos (`observe`) após cada operação, pelo TriggerEngine."""
+    engine = TriggerEngine(triggers)
+    periods = frame[by].itertuples(index=False) if by else itertools.repeat(None)
+    states, edges, period = [], [], object()
+
+    for signal, key in zip(frame_to_signals(frame), periods):
+        if key != period:
+            engine.reset()
+            period = key
+        fired = engine.observe(signal)
+        current = {firing.trigger.name for firing in engine.evaluate()}
+        current |= {firing.trigger.name for firing in engine.evaluate(signal.asset)}
+        states.append({trigger.name: trigger.name in current for trigger in triggers})
+        edges.append({(firing.trigger.name, firing.asset) for firing in fired})
+
+    return pd.DataFrame(states, index=frame.index, columns=[t.name for t in triggers]), edges
+
+
+def expected_edges(triggers, frame: pd.DataFrame, states: pd.DataFrame, by):
+    """Bordas de subida de cada regra dentro do período (e do ativo)."""
+    edges = [set() for _ in range(len(frame))]
+    for trigger in triggers:
+        keys = list(by) + (['asset'] if trigger.scope == ASSET else [])
+        column = states[trigger.name]
+        previous = column.groupby([frame[k] for k in keys], observed=True).shift(fill_value=False) if keys \
+            else column.shift(fill_value=False)
+        for position in np.flatnonzero(column.to_numpy() & ~previous.to_numpy(dtype=bool)):
+            edges[position].add((trigger.name, frame['asset'].iloc[position] if trigger.scope == ASSET else None))
+    return edges
+
+
+@pytest.mark.parametrize('by', [[], ['hour']], ids=['sessao', 'hora'])
+@pytest.mark.parametrize('seed', range(4))
+def test_engine_matches_evaluate_frame(seed, by):
+    triggers = random_triggers(seed)
+    frame = random_frame(seed)
+
+    expected = evaluate_frame(triggers, frame, by)
+    states, edges = engine_states(triggers, frame, by)
+
+    pd.testing.assert_frame_equal(states, expected[states.columns])
+    assert edges == expected_edges(triggers, frame, expected, by)
+
+
+def test_live_triggers_match_evaluate_frame():
+    frame = random_frame(11, rows=2000)
+
+    states, _ = engine_states(LIVE_TRIGGERS, frame, [])
+
+    pd.testing.assert_frame_equal(states, evaluate_frame(LIVE_TRIGGERS, frame)[states.columns])
+    assert states.any().all()
+
+
+def test_evaluate_periods_is_state_at_end_of_each_hour():
+    triggers = [t for t in random_triggers(5) if t.scope == MARKET]
+    frame = random_frame(5)
+    # Uma hora sem operações
+    frame = frame[frame['hour'] != 16]
+    hours = range(14, 20)
+
+    periods = evaluate_periods(triggers, frame, 'hour', index=hours)
+
+    engine = TriggerEngine(triggers)
+    for hour in hours:
+        engine.reset()
+        for signal in frame_to_signals(frame[frame['hour'] == hour]):
+            engine.observe(signal)
+        current = {firing.trigger.name for firing in engine.evaluate()}
+        assert current == {t.name for t in triggers if periods.loc[hour, t.name]}, hour
+        assert periods.loc[hour, 'fired'] == bool(current)
+
+    assert {t.name for t in triggers if periods.loc[16, t.name]} == \
+        {name for name, value in evaluate_empty(triggers).items() if value}